@@ -3,8 +3,11 @@
 from fastapi import APIRouter
 
 from app.api.absences import router as absences_router
+from app.api.analytics import router as analytics_router
 from app.api.completions import router as completions_router
+from app.api.events import router as events_router
 from app.api.habits import router as habits_router
+from app.api.progress import router as progress_router
 
 router = APIRouter()
 
@@ -19,3 +22,6 @@ async def root() -> dict[str, str]:
 router.include_router(habits_router)
 router.include_router(completions_router)
 router.include_router(absences_router)
+router.include_router(analytics_router)
+router.include_router(events_router)
+router.include_router(progress_router)
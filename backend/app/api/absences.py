@@ -2,10 +2,13 @@
 
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cached_response, data_versions, response_cache
 from app.core.database import get_db
+from app.core.serialization import dump_json
+from app.core.tenancy import current_tenant
 from app.schemas.absence import (
     AbsenceCreate,
     AbsenceItem,
@@ -43,7 +46,7 @@ async def create_absence(
             detail="Habit not found",
         )
     return AbsenceResponse(
-        habit_id=absence.habit_id,
+        habit_id=habit_id,
         date=absence.absence_date,
         reason=absence.reason,
     )
@@ -51,27 +54,46 @@ async def create_absence(
 
 @router.get("/{habit_id}/absences", response_model=AbsencesListResponse)
 async def get_absences(
+    request: Request,
     habit_id: str,
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
     db: AsyncSession = Depends(get_db),
-) -> AbsencesListResponse:
-    """Get absence history for a habit."""
-    service = HabitService(db)
-
-    # Verify habit exists
-    habit = await service.get_habit(habit_id)
-    if not habit:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Habit not found",
+) -> Response:
+    """Get absence history for a habit.
+
+    Encoded bodies are cached per habit, range and data version, so repeated
+    reads of unchanged history never reach the database.
+    """
+    key = (
+        current_tenant.get(),
+        "absences",
+        start_date,
+        end_date,
+        data_versions.get(habit_id),
+    )
+    entry = response_cache.get(habit_id, key)
+    if entry is None:
+        service = HabitService(db)
+
+        # Verify habit exists
+        if not await service.habit_exists(habit_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habit not found",
+            )
+
+        absences = await service.get_absences(habit_id, start_date, end_date)
+        body = dump_json(
+            AbsencesListResponse(
+                habit_id=habit_id,
+                absences=[AbsenceItem(date=d, reason=r) for d, r in absences],
+            ),
+            AbsencesListResponse,
         )
+        entry = response_cache.put(habit_id, key, body)
 
-    absences = await service.get_absences(habit_id, start_date, end_date)
-    return AbsencesListResponse(
-        habit_id=habit_id,
-        absences=[AbsenceItem(date=d, reason=r) for d, r in absences],
-    )
+    return cached_response(entry, request.headers.get("accept-encoding"))
 
 
 @router.delete(
@@ -87,8 +109,7 @@ async def delete_absence(
     service = HabitService(db)
 
     # Verify habit exists
-    habit = await service.get_habit(habit_id)
-    if not habit:
+    if not await service.habit_exists(habit_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Habit not found",
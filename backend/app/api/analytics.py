@@ -0,0 +1,66 @@
+"""Habit analytics API endpoints."""
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cached_response, data_versions, response_cache
+from app.core.database import get_db
+from app.core.serialization import dump_json
+from app.core.tenancy import current_tenant
+from app.schemas.analytics import HabitAnalyticsResponse
+from app.services.analytics_service import MAX_ANALYTICS_DAYS, AnalyticsService
+
+router = APIRouter(prefix="/habits", tags=["analytics"])
+
+
+@router.get("/{habit_id}/analytics", response_model=HabitAnalyticsResponse)
+async def get_habit_analytics(
+    request: Request,
+    habit_id: str,
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Get weekday, heatmap, rolling rate, gap and streak analytics for a habit.
+
+    Defaults to the habit's whole life, up to ``MAX_ANALYTICS_DAYS`` days,
+    and ends no later than today. Cached like the history endpoints;
+    today's date is part of the key because the default range ends today.
+    """
+    today = date.today()
+    if end_date and end_date > today:
+        end_date = today
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
+    if start_date and ((end_date or today) - start_date).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must not exceed {MAX_ANALYTICS_DAYS} days",
+        )
+
+    key = (
+        current_tenant.get(),
+        "analytics",
+        start_date,
+        end_date,
+        today,
+        data_versions.get(habit_id),
+    )
+    entry = response_cache.get(habit_id, key)
+    if entry is None:
+        service = AnalyticsService(db)
+        analytics = await service.get_habit_analytics(habit_id, start_date, end_date)
+        if not analytics:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habit not found",
+            )
+        body = dump_json(analytics, HabitAnalyticsResponse)
+        entry = response_cache.put(habit_id, key, body)
+
+    return cached_response(entry, request.headers.get("accept-encoding"))
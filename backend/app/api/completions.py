@@ -2,10 +2,13 @@
 
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cached_response, data_versions, response_cache
 from app.core.database import get_db
+from app.core.serialization import dump_json
+from app.core.tenancy import current_tenant
 from app.schemas.completion import (
     CompletionCreate,
     CompletionResponse,
@@ -40,7 +43,7 @@ async def complete_habit(
             detail="Habit not found",
         )
     return CompletionResponse(
-        habit_id=completion.habit_id,
+        habit_id=habit_id,
         date=completion.completed_date,
         completed=True,
     )
@@ -48,24 +51,43 @@ async def complete_habit(
 
 @router.get("/{habit_id}/completions", response_model=CompletionsListResponse)
 async def get_completions(
+    request: Request,
     habit_id: str,
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
     db: AsyncSession = Depends(get_db),
-) -> CompletionsListResponse:
-    """Get completion history for a habit."""
-    service = HabitService(db)
-
-    # Verify habit exists
-    habit = await service.get_habit(habit_id)
-    if not habit:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Habit not found",
+) -> Response:
+    """Get completion history for a habit.
+
+    Encoded bodies are cached per habit, range and data version, so repeated
+    reads of unchanged history never reach the database.
+    """
+    key = (
+        current_tenant.get(),
+        "completions",
+        start_date,
+        end_date,
+        data_versions.get(habit_id),
+    )
+    entry = response_cache.get(habit_id, key)
+    if entry is None:
+        service = HabitService(db)
+
+        # Verify habit exists
+        if not await service.habit_exists(habit_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habit not found",
+            )
+
+        completions = await service.get_completions(habit_id, start_date, end_date)
+        body = dump_json(
+            CompletionsListResponse(habit_id=habit_id, completions=completions),
+            CompletionsListResponse,
         )
+        entry = response_cache.put(habit_id, key, body)
 
-    completions = await service.get_completions(habit_id, start_date, end_date)
-    return CompletionsListResponse(habit_id=habit_id, completions=completions)
+    return cached_response(entry, request.headers.get("accept-encoding"))
 
 
 @router.delete(
@@ -81,8 +103,7 @@ async def delete_completion(
     service = HabitService(db)
 
     # Verify habit exists
-    habit = await service.get_habit(habit_id)
-    if not habit:
+    if not await service.habit_exists(habit_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Habit not found",
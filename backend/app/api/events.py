@@ -0,0 +1,38 @@
+"""Server-Sent Events change stream endpoint."""
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import get_tenant
+from app.core.events import event_broker, event_stream
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_events(
+    tenant_id: str = Depends(get_tenant),
+    last_event_id: str | None = Header(None),
+) -> StreamingResponse:
+    """Stream change events for the caller's habits.
+
+    Events name what changed (``habit.created``, ``completion.added``, ...)
+    together with the habit id, its new data version and the affected date.
+    Reconnecting clients send ``Last-Event-ID`` to replay what they missed;
+    a ``reset`` event means the gap could not be replayed and the client
+    should refetch.
+    """
+    resume_from = (
+        int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    )
+    return StreamingResponse(
+        event_stream(
+            event_broker,
+            tenant_id,
+            resume_from,
+            settings.events_heartbeat_seconds,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
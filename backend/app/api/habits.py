@@ -1,24 +1,71 @@
 """Habit CRUD API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import data_versions
+from app.core.config import Settings
+from app.core.database import get_db, get_session_factory, get_settings
+from app.core.serialization import dump_json
+from app.core.single_flight import single_flight
+from app.core.tenancy import current_tenant
 from app.schemas.habit import HabitCreate, HabitResponse, HabitUpdate
 from app.schemas.stats import HabitWithStatsResponse
 from app.services.habit_service import HabitService
-from app.services.stats_service import StatsService
+from app.services.stats_service import StatsService, parse_windows
 
 router = APIRouter(prefix="/habits", tags=["habits"])
 
 
 @router.get("", response_model=list[HabitWithStatsResponse])
 async def list_habits(
-    db: AsyncSession = Depends(get_db),
-) -> list[HabitWithStatsResponse]:
-    """Get all habits with computed statistics."""
-    service = StatsService(db)
-    return await service.get_all_habits_with_stats()
+    windows: str | None = Query(
+        None, description='Extra rate windows, e.g. "90,ytd,all,2026-01-01..2026-03-31"'
+    ),
+    start: date | None = Query(None, description="Start of a custom rate window"),
+    end: date | None = Query(None, description="End of a custom rate window"),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> Response:
+    """Get all habits with computed statistics.
+
+    Rates over the requested windows are returned in
+    ``completion_rate.windows``; ``start``/``end`` add the window
+    ``START..END``. Concurrent requests for the same data share one
+    computation.
+    """
+    specs = [windows] if windows else []
+    if start or end:
+        specs.append(f"{start or ''}..{end or ''}")
+    try:
+        rate_windows = parse_windows(",".join(specs)) if specs else None
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    async def compute() -> bytes:
+        """Compute and encode the response body.
+
+        The computation is shared and may outlive the request that started
+        it, so it opens its own session rather than using that request's.
+        """
+        async with session_factory() as session:
+            stats = StatsService(session)
+            habits = await stats.get_all_habits_with_stats(rate_windows)
+        return dump_json(habits, list[HabitWithStatsResponse])
+
+    key = (
+        current_tenant.get(),
+        "habits",
+        tuple(rate_windows or ()),
+        date.today(),
+        data_versions.total(),
+    )
+    body = await single_flight.run(key, compute)
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("", response_model=HabitResponse, status_code=status.HTTP_201_CREATED)
@@ -69,10 +116,11 @@ async def update_habit(
 async def delete_habit(
     habit_id: str,
     db: AsyncSession = Depends(get_db),
+    app_settings: Settings = Depends(get_settings),
 ) -> None:
     """Delete a habit."""
     service = HabitService(db)
-    deleted = await service.delete_habit(habit_id)
+    deleted = await service.delete_habit(habit_id, soft=app_settings.soft_delete_habits)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
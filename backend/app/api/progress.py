@@ -0,0 +1,60 @@
+"""Cross-habit daily progress API endpoints."""
+
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import data_versions
+from app.core.database import get_session_factory
+from app.core.serialization import dump_json
+from app.core.single_flight import single_flight
+from app.core.tenancy import current_tenant
+from app.schemas.stats import DailyProgress
+from app.services.stats_service import StatsService
+
+router = APIRouter(prefix="/progress", tags=["progress"])
+
+# Upper bound on the number of days returned by one request
+MAX_PROGRESS_DAYS = 3660
+
+
+@router.get("", response_model=list[DailyProgress])
+async def get_daily_progress(
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> Response:
+    """Get completed/applicable habit counts per day (defaults to the last 30 days)."""
+    if end_date is None:
+        end_date = date.today()
+    if start_date is None:
+        start_date = end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date",
+        )
+    if (end_date - start_date).days + 1 > MAX_PROGRESS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must not exceed {MAX_PROGRESS_DAYS} days",
+        )
+
+    async def compute() -> bytes:
+        """Compute and encode the response body in a session of its own."""
+        async with session_factory() as session:
+            stats = StatsService(session)
+            progress = await stats.get_daily_progress(start_date, end_date)
+        return dump_json(progress, list[DailyProgress])
+
+    # Concurrent requests for the same range and data share one computation
+    key = (
+        current_tenant.get(),
+        "progress",
+        start_date,
+        end_date,
+        data_versions.total(),
+    )
+    body = await single_flight.run(key, compute)
+    return Response(content=body, media_type="application/json")
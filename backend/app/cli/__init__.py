@@ -0,0 +1 @@
+"""Offline command-line tools, run with ``python -m app.cli.<tool>``."""
@@ -0,0 +1,45 @@
+"""Archive completion and absence history older than the archive horizon.
+
+The background scheduler runs this daily when ``ARCHIVE_ENABLED`` is set;
+run it by hand to archive immediately, optionally as of another date:
+
+    python -m app.cli.archive [--today 2026-01-01]
+"""
+
+import argparse
+import asyncio
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine, prepare_database
+from app.services.archive import archive_enabled, archive_history
+
+
+async def run(database_url: str, today: date | None) -> None:
+    """Archive every habit's old history, one habit per transaction."""
+    if not archive_enabled():
+        print("Archiving is disabled; set ARCHIVE_ENABLED with row storage")
+        return
+    engine = build_engine(database_url)
+    try:
+        await prepare_database(engine)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession)
+        moved = await archive_history(session_factory, today)
+        print(f"Archived {moved} rows")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the archival."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--today", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.today))
+
+
+if __name__ == "__main__":
+    main()
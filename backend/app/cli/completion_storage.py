@@ -0,0 +1,65 @@
+"""Convert stored completions between the row and run layouts.
+
+Stop the API first, then run from the backend directory:
+
+    python -m app.cli.completion_storage runs   # per-day rows -> runs
+    python -m app.cli.completion_storage rows   # runs -> per-day rows
+
+and set ``COMPLETION_STORAGE`` to match before restarting. The API must
+not keep running across a conversion: its caches and history indexes are
+only invalidated by writes made in its own process.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine, prepare_database
+from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
+from app.services.completion_runs import convert_rows_to_runs, convert_runs_to_rows
+
+
+async def convert(database_url: str, layout: str) -> None:
+    """Convert every habit's completions to ``layout`` in one transaction."""
+    engine = build_engine(database_url)
+    await prepare_database(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+    try:
+        async with session_factory() as session:
+            print(await _convert(session, layout))
+    finally:
+        await engine.dispose()
+
+
+async def _convert(session: AsyncSession, layout: str) -> str:
+    """Convert within one session and return a summary line."""
+    rows = (await session.execute(select(func.count(Completion.id)))).scalar_one()
+    runs = (await session.execute(select(func.count(CompletionRun.id)))).scalar_one()
+    if layout == "runs":
+        if rows == 0:
+            return f"No completion rows to convert ({runs} runs stored)"
+        created = await convert_rows_to_runs(session)
+        await session.commit()
+        return f"Converted {rows} completion rows into {created} runs"
+    if runs == 0:
+        return f"No completion runs to convert ({rows} rows stored)"
+    created = await convert_runs_to_rows(session)
+    await session.commit()
+    return f"Expanded {runs} completion runs into {created} rows"
+
+
+def main() -> None:
+    """Parse arguments and run the conversion."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("layout", choices=["runs", "rows"], help="target layout")
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+    asyncio.run(convert(args.database_url, args.layout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Report query plans that scan history, and indexes that are never needed.
+
+Seeds a scratch database with the current schema, runs every
+``HabitService`` and ``StatsService`` method against it and prints the
+statements whose plans scan a history table (missing index candidates) or
+sort into a temporary B-tree. The indexes of ``--database-url`` are then
+checked for ones another index already covers. Run from the backend
+directory:
+
+    python -m app.cli.index_advisor
+    python -m app.cli.index_advisor --plans   # print every plan
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine, prepare_database
+from app.core.query_plans import (
+    QueryPlan,
+    QueryRecorder,
+    explain,
+    list_indexes,
+    redundant_indexes,
+)
+from app.core.rate_index import rate_index
+from app.core.streak_index import streak_index
+from app.models import Absence, Completion
+from app.schemas.habit import HabitCreate, HabitUpdate
+from app.services.habit_service import HabitService
+from app.services.stats_service import StatsService
+
+SEED_HABITS = 5
+SEED_DAYS = 120
+
+ServiceCall = Callable[[HabitService, StatsService, str], Awaitable[object]]
+
+# Every service method, in an order where the writes leave the reads valid
+_TODAY = date.today()
+WORKLOAD: dict[str, ServiceCall] = {
+    "HabitService.habit_exists": lambda h, s, habit_id: h.habit_exists(habit_id),
+    "HabitService.get_habit": lambda h, s, habit_id: h.get_habit(habit_id),
+    "HabitService.get_all_habits": lambda h, s, habit_id: h.get_all_habits(),
+    "HabitService.get_completion": lambda h, s, habit_id: h.get_completion(
+        habit_id, _TODAY - timedelta(days=1)
+    ),
+    "HabitService.get_completions": lambda h, s, habit_id: h.get_completions(
+        habit_id, _TODAY - timedelta(days=30), _TODAY
+    ),
+    "HabitService.get_absence": lambda h, s, habit_id: h.get_absence(
+        habit_id, _TODAY - timedelta(days=3)
+    ),
+    "HabitService.get_absences": lambda h, s, habit_id: h.get_absences(
+        habit_id, _TODAY - timedelta(days=30), _TODAY
+    ),
+    "StatsService.calculate_current_streak": (
+        lambda h, s, habit_id: s.calculate_current_streak(habit_id)
+    ),
+    "StatsService.calculate_best_streak": (
+        lambda h, s, habit_id: s.calculate_best_streak(habit_id)
+    ),
+    "StatsService.calculate_completion_rate": (
+        lambda h, s, habit_id: s.calculate_completion_rate(habit_id)
+    ),
+    "StatsService.calculate_window_rates": (
+        lambda h, s, habit_id: s.calculate_window_rates(habit_id, ["90", "ytd"])
+    ),
+    "StatsService.is_completed_today": (
+        lambda h, s, habit_id: s.is_completed_today(habit_id)
+    ),
+    "StatsService.get_habit_with_stats": (
+        lambda h, s, habit_id: s.get_habit_with_stats(habit_id)
+    ),
+    "StatsService.get_all_habits_with_stats": (
+        lambda h, s, habit_id: s.get_all_habits_with_stats()
+    ),
+    "StatsService.get_daily_progress": lambda h, s, habit_id: s.get_daily_progress(
+        _TODAY - timedelta(days=30), _TODAY
+    ),
+    "HabitService.complete_habit": lambda h, s, habit_id: h.complete_habit(
+        habit_id, _TODAY
+    ),
+    "HabitService.delete_completion": lambda h, s, habit_id: h.delete_completion(
+        habit_id, _TODAY
+    ),
+    "HabitService.create_absence": lambda h, s, habit_id: h.create_absence(
+        habit_id, _TODAY
+    ),
+    "HabitService.delete_absence": lambda h, s, habit_id: h.delete_absence(
+        habit_id, _TODAY
+    ),
+    "HabitService.update_habit": lambda h, s, habit_id: h.update_habit(
+        habit_id, HabitUpdate(name="Renamed", description=None)
+    ),
+    "HabitService.delete_habit": lambda h, s, habit_id: h.delete_habit(habit_id),
+}
+
+
+async def seed(session: AsyncSession) -> str:
+    """Add habits with a few months of history and return one habit's id."""
+    habits = [
+        await HabitService(session).create_habit(
+            HabitCreate(name=f"Habit {number}", description=None)
+        )
+        for number in range(SEED_HABITS)
+    ]
+    for habit in habits:
+        habit.created_at = habit.created_at - timedelta(days=SEED_DAYS)
+        for offset in range(1, SEED_DAYS):
+            day = _TODAY - timedelta(days=offset)
+            if offset % 7 == 3:
+                session.add(Absence(habit_pk=habit.pk, absence_date=day))
+            elif offset % 5:
+                session.add(Completion(habit_pk=habit.pk, completed_date=day))
+    await session.commit()
+    return habits[0].id
+
+
+async def capture_service_plans(engine: AsyncEngine) -> dict[str, list[QueryPlan]]:
+    """Seed ``engine``'s database and return the plans each method uses."""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    plans: dict[str, list[QueryPlan]] = {}
+    async with session_factory() as session:
+        habit_id = await seed(session)
+        habits, stats = HabitService(session), StatsService(session)
+        for label, call in WORKLOAD.items():
+            # Plan each method's history loads rather than an earlier one's
+            rate_index.clear()
+            streak_index.clear()
+            with QueryRecorder(engine) as recorder:
+                await call(habits, stats, habit_id)
+            conn = await session.connection()
+            plans[label] = [
+                await explain(conn, statement, parameters)
+                for statement, parameters in recorder.statements
+            ]
+    return plans
+
+
+async def run(database_url: str, show_plans: bool) -> None:
+    """Print plan findings for the services and redundant indexes."""
+    scratch = build_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        await prepare_database(scratch)
+        plans = await capture_service_plans(scratch)
+    finally:
+        await scratch.dispose()
+
+    findings = 0
+    for label, method_plans in plans.items():
+        for plan in method_plans:
+            problems = plan.full_scans() + plan.temp_sorts()
+            if not (problems or show_plans):
+                continue
+            findings += bool(problems)
+            print(f"{label}: {' '.join(plan.statement.split())}")
+            for detail in plan.details:
+                marker = "!" if detail in problems else " "
+                print(f"  {marker} {detail}")
+    if not findings:
+        print("No service query scans a history table or sorts in a temp B-tree")
+
+    engine = build_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            indexes = await conn.run_sync(list_indexes)
+    finally:
+        await engine.dispose()
+    redundant = redundant_indexes(indexes)
+    for index, covered_by in redundant:
+        print(
+            f"Redundant index {index.name} on {index.table}"
+            f"({', '.join(index.columns)}): covered by {covered_by.name}"
+        )
+    if not redundant:
+        print("No redundant indexes")
+
+
+def main() -> None:
+    """Parse arguments and run the advisor."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--plans", action="store_true", help="print every plan")
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.plans))
+
+
+if __name__ == "__main__":
+    main()
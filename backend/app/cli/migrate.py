@@ -0,0 +1,55 @@
+"""Apply pending schema migrations.
+
+The API applies migrations at startup unless ``MIGRATE_ON_STARTUP`` is off.
+For long migrations on large databases, stop the API and run them from the
+backend directory instead:
+
+    python -m app.cli.migrate            # apply pending migrations
+    python -m app.cli.migrate --status   # show the version and pending list
+"""
+
+import argparse
+import asyncio
+
+import app.models  # noqa: F401  (registers every table on the metadata)
+from app.core.config import settings
+from app.core.database import Base, build_engine
+from app.core.migrations import current_version, pending_migrations, upgrade_database
+
+
+async def run(database_url: str, batch_size: int, status_only: bool) -> None:
+    """Show the schema status or bring the database up to date."""
+    engine = build_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            version = await conn.run_sync(current_version)
+            pending = await conn.run_sync(pending_migrations)
+        if version is None:
+            print("Empty database; the current schema will be created")
+        else:
+            print(f"Schema version: {version}")
+            for migration in pending:
+                print(f"  pending: v{migration.version:04d}_{migration.name}")
+        if status_only or not pending:
+            return
+        applied = await upgrade_database(engine, Base.metadata, batch_size)
+        if not applied:
+            print("Created the current schema")
+        for migration in applied:
+            print(f"  applied: v{migration.version:04d}_{migration.name}")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the migrations."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--batch-size", type=int, default=settings.migration_batch_size)
+    parser.add_argument("--status", action="store_true", help="only show status")
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.batch_size, args.status))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Recompute every habit's statistics from full history in parallel processes.
+
+Run from the backend directory after a migration, import or rule change.
+Each chunk of habits is read through its own read-only connection in a
+worker process and written to ``OUTPUT/chunk-NNNNN.jsonl``; with
+``--verify`` those files list where served stats differ instead:
+
+    python -m app.cli.rebuild_stats --output stats-rebuild [--verify]
+
+An interrupted run resumes from ``OUTPUT/checkpoint.json`` when started
+again with the same output directory; ``--restart`` discards it. Served
+stats are as of the current day, so a verification can only resume on the
+day it started.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine, prepare_database
+from app.services.stats_rebuild import RebuildCheckpoint, chunk_bounds, run_chunk
+
+
+async def plan_chunks(database_url: str, chunk_size: int) -> list[list[str]]:
+    """Bring the schema up to date and split live habits into chunks."""
+    engine = build_engine(database_url)
+    try:
+        await prepare_database(engine)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession)
+        async with session_factory() as session:
+            return await chunk_bounds(session, chunk_size)
+    finally:
+        await engine.dispose()
+
+
+def chunk_path(output: Path, index: int) -> Path:
+    """Return the file a chunk's records are written to."""
+    return output / f"chunk-{index:05d}.jsonl"
+
+
+def rebuild(
+    database_url: str,
+    output: Path,
+    workers: int,
+    chunk_size: int,
+    today: date,
+    verify: bool,
+    restart: bool,
+) -> int:
+    """Rebuild every pending chunk and return the number of habits processed."""
+    output.mkdir(parents=True, exist_ok=True)
+    checkpoint = RebuildCheckpoint(output / "checkpoint.json")
+    if checkpoint.exists() and not restart:
+        checkpoint.load()
+        if checkpoint.verify and checkpoint.today != date.today():
+            raise ValueError(
+                f"The verification started on {checkpoint.today} cannot resume "
+                "on another day; run again with --restart"
+            )
+        print(
+            f"Resuming: {len(checkpoint.done)} of {len(checkpoint.chunks)} "
+            f"chunks already done"
+        )
+    else:
+        for stale in output.glob("chunk-*.jsonl"):
+            stale.unlink()
+        checkpoint.today, checkpoint.verify = today, verify
+        checkpoint.chunks = asyncio.run(plan_chunks(database_url, chunk_size))
+        checkpoint.done = set()
+        checkpoint.save()
+
+    pending = checkpoint.pending()
+    total = len(checkpoint.chunks)
+    habits = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures: dict[Future[int], int] = {
+            executor.submit(
+                run_chunk,
+                database_url,
+                checkpoint.chunks[index][0],
+                checkpoint.chunks[index][1],
+                checkpoint.today,
+                checkpoint.verify,
+                chunk_path(output, index),
+            ): index
+            for index in pending
+        }
+        for future in as_completed(futures):
+            habits += future.result()
+            checkpoint.done.add(futures[future])
+            checkpoint.save()
+            elapsed = time.perf_counter() - started
+            print(
+                f"  chunk {len(checkpoint.done)}/{total}: {habits} habits, "
+                f"{habits / elapsed:.0f} habits/s"
+            )
+    return habits
+
+
+def count_records(output: Path) -> int:
+    """Return the number of records written across every chunk file."""
+    count = 0
+    for path in output.glob("chunk-*.jsonl"):
+        with path.open() as records:
+            count += sum(1 for _ in records)
+    return count
+
+
+def main() -> None:
+    """Parse arguments and run the rebuild."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="report where served stats differ instead of writing them",
+    )
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        habits = rebuild(
+            args.database_url,
+            args.output,
+            args.workers,
+            args.chunk_size,
+            date.today(),
+            args.verify,
+            args.restart,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    records = count_records(args.output)
+    if args.verify:
+        print(f"Verified {habits} habits: {records} differing fields")
+    else:
+        print(f"Rebuilt stats for {habits} habits into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Rebuild monthly rollups from raw completion and absence history.
+
+Run from the backend directory after enabling ``MONTHLY_ROLLUPS_ENABLED``,
+or any time the rollups may have drifted:
+
+    python -m app.cli.rollups
+
+A running API keeps serving rates and cached responses computed from the
+old rollups, so restart it afterwards.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine, prepare_database
+from app.services.rollups import rebuild_rollups
+
+
+async def rebuild(database_url: str) -> None:
+    """Rebuild every rollup in one transaction."""
+    engine = build_engine(database_url)
+    try:
+        await prepare_database(engine)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession)
+        async with session_factory() as session:
+            count = await rebuild_rollups(session)
+            await session.commit()
+        print(f"Rebuilt {count} monthly rollups; restart the API to drop its caches")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the rebuild."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.database_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""In-memory data versions and serialized response cache."""
+
+import gzip
+from collections import OrderedDict, defaultdict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from fastapi import Response
+
+from app.core.config import settings
+
+
+class DataVersions:
+    """Monotonic per-habit data version counters.
+
+    Every committed write to a habit or its history bumps the habit's
+    version, so anything derived from that data can key on the version
+    instead of tracking invalidation itself.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty version table."""
+        self._versions: dict[str, int] = defaultdict(int)
+        self._total = 0
+
+    def get(self, habit_id: str) -> int:
+        """Return the current version of a habit's data."""
+        return self._versions.get(habit_id, 0)
+
+    def bump(self, habit_id: str) -> int:
+        """Advance and return the version of a habit's data."""
+        self._versions[habit_id] += 1
+        self._total += 1
+        return self._versions[habit_id]
+
+    def total(self) -> int:
+        """Return a version that advances with every habit's data."""
+        return self._total
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    """Encoded JSON body with an optional precompressed gzip variant."""
+
+    body: bytes
+    gzip_body: bytes | None = None
+
+
+class ResponseCache:
+    """LRU cache of encoded response bodies, grouped by habit.
+
+    Keys should include the habit's data version so that a write racing
+    with a read can never make a stale body reachable.
+    """
+
+    def __init__(self, max_entries: int = 1024, min_gzip_size: int = 1024) -> None:
+        """Initialize cache limits."""
+        self.max_entries = max_entries
+        self.min_gzip_size = min_gzip_size
+        self._entries: OrderedDict[tuple[str, Hashable], CachedBody] = OrderedDict()
+        self._keys_by_habit: dict[str, set[Hashable]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        """Return number of cached bodies."""
+        return len(self._entries)
+
+    def get(self, habit_id: str, key: Hashable) -> CachedBody | None:
+        """Return a cached body and mark it recently used."""
+        entry = self._entries.get((habit_id, key))
+        if entry is not None:
+            self._entries.move_to_end((habit_id, key))
+        return entry
+
+    def put(self, habit_id: str, key: Hashable, body: bytes) -> CachedBody:
+        """Store a body, precompressing it when large enough to benefit."""
+        gzip_body = None
+        if len(body) >= self.min_gzip_size:
+            gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        entry = CachedBody(body=body, gzip_body=gzip_body)
+
+        if self.max_entries <= 0:
+            return entry
+        self._entries[(habit_id, key)] = entry
+        self._entries.move_to_end((habit_id, key))
+        self._keys_by_habit[habit_id].add(key)
+        while len(self._entries) > self.max_entries:
+            (old_habit_id, old_key), _ = self._entries.popitem(last=False)
+            self._discard_key(old_habit_id, old_key)
+        return entry
+
+    def invalidate(self, habit_id: str) -> None:
+        """Drop every cached body for a habit."""
+        for key in self._keys_by_habit.pop(habit_id, ()):
+            self._entries.pop((habit_id, key), None)
+
+    def clear(self) -> None:
+        """Drop all cached bodies."""
+        self._entries.clear()
+        self._keys_by_habit.clear()
+
+    def _discard_key(self, habit_id: str, key: Hashable) -> None:
+        """Remove a key from the per-habit index."""
+        keys = self._keys_by_habit.get(habit_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_habit[habit_id]
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Return True if an Accept-Encoding header allows gzip."""
+    if not accept_encoding:
+        return False
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            return not params or float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def cached_response(entry: CachedBody, accept_encoding: str | None) -> Response:
+    """Build a JSON response, serving the gzip variant when negotiated."""
+    headers = {"Vary": "Accept-Encoding"}
+    if entry.gzip_body is not None and accepts_gzip(accept_encoding):
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=entry.gzip_body, media_type="application/json", headers=headers
+        )
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+data_versions = DataVersions()
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    min_gzip_size=settings.response_cache_min_gzip_bytes,
+)
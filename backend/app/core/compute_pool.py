@@ -0,0 +1,127 @@
+"""Worker pool for CPU-bound computations over a habit's history.
+
+Day-by-day loops over years of history would hold the event loop, stalling
+every other request. ``ComputePool.run`` calls small jobs inline, where a
+hand-off would cost more than it saves, and sends larger ones to a thread
+or process pool. Functions sent to a process pool must be module-level and
+take and return picklable values.
+"""
+
+import asyncio
+import functools
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Literal, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class ComputePoolStats:
+    """Counters describing pool use and saturation."""
+
+    inline: int = 0
+    submitted: int = 0
+    completed: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    # Jobs submitted while every worker was already busy
+    saturated: int = 0
+    # Time from submission until a worker started the job
+    total_queue_wait_ms: float = 0.0
+    max_queue_wait_ms: float = 0.0
+
+
+def _timed_call(
+    func: Callable[..., T], args: tuple[Any, ...], submitted_at: float
+) -> tuple[float, T]:
+    """Run a job in a worker and return how long it waited to start."""
+    return time.time() - submitted_at, func(*args)
+
+
+class ComputePool:
+    """Runs CPU-bound functions off the event loop above a size threshold."""
+
+    def __init__(
+        self,
+        kind: Literal["thread", "process"] = "thread",
+        workers: int = 2,
+        threshold: int = 2000,
+    ) -> None:
+        """Initialize pool settings; workers start on first use."""
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.threshold = threshold
+        self.stats = ComputePoolStats()
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        """Return the executor, starting it if needed."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="compute"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, size: int) -> T:
+        """Return ``func(*args)``, computed in the pool when ``size`` is large.
+
+        ``size`` is the number of days or rows the function will walk; a
+        threshold of zero or less computes everything inline.
+        """
+        if self.threshold <= 0 or size < self.threshold:
+            self.stats.inline += 1
+            return func(*args)
+
+        stats = self.stats
+        stats.submitted += 1
+        if stats.in_flight >= self.workers:
+            stats.saturated += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        call = functools.partial(_timed_call, func, args, time.time())
+        try:
+            waited, result = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), call
+            )
+        finally:
+            stats.in_flight -= 1
+        stats.completed += 1
+        waited_ms = max(waited, 0.0) * 1000
+        stats.total_queue_wait_ms += waited_ms
+        stats.max_queue_wait_ms = max(stats.max_queue_wait_ms, waited_ms)
+        return result
+
+    def report(self) -> dict[str, Any]:
+        """Return the pool's settings and counters, with the mean queue wait."""
+        stats = self.stats
+        mean_wait = (
+            stats.total_queue_wait_ms / stats.completed if stats.completed else 0
+        )
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "threshold": self.threshold,
+            **asdict(stats),
+            "mean_queue_wait_ms": mean_wait,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers; the next job starts them again."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+compute_pool = ComputePool(
+    kind=settings.compute_pool_kind,
+    workers=settings.compute_pool_workers,
+    threshold=settings.compute_pool_threshold,
+)
@@ -1,5 +1,9 @@
 """Application configuration."""
 
+from datetime import time
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,9 +18,88 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./prd_twin.db"
+    sqlite_wal: bool = True
+    # Apply pending schema migrations at startup; if off, run app.cli.migrate
+    migrate_on_startup: bool = True
+    migration_batch_size: int = 50_000
+    # "rows" stores one completion per day, "runs" stores consecutive-day runs
+    completion_storage: Literal["rows", "runs"] = "rows"
+    # Move history older than the horizon (whole years) into compressed archives
+    archive_enabled: bool = False
+    archive_horizon_days: int = 730
+    archive_interval_seconds: float = 24 * 3600.0
+    # Keep per-month counts for long-range rates; run app.cli.rollups after enabling
+    monthly_rollups_enabled: bool = False
+
+    # Database-per-tenant routing
+    multi_tenant: bool = False
+    tenant_header: str = "X-Tenant-ID"
+    tenant_database_url_template: str = "sqlite+aiosqlite:///./tenants/{tenant}.db"
+    tenant_max_open_engines: int = 32
+    tenant_idle_seconds: float = 600.0
+
+    # Background maintenance
+    maintenance_enabled: bool = True
+    maintenance_jitter_seconds: float = 30.0
+    wal_checkpoint_interval_seconds: float = 300.0
+    optimize_interval_seconds: float = 6 * 3600.0
+    incremental_vacuum_interval_seconds: float = 3600.0
+    incremental_vacuum_pages: int = 1000
+    # Local time of the daily stats refresh, just after the date rolls over
+    daily_stats_refresh_at: time = time(0, 5)
+    # Soft-delete habits and purge their history in chunks in the background
+    soft_delete_habits: bool = False
+    purge_interval_seconds: float = 60.0
+    purge_batch_size: int = 5000
+
+    # Serialized response cache for history endpoints (0 disables)
+    response_cache_max_entries: int = 1024
+    response_cache_min_gzip_bytes: int = 1024
+
+    # Share one computation among concurrent identical cross-habit reads
+    single_flight_enabled: bool = True
+
+    # Habits whose cumulative day counts are kept for O(1) rates (0 disables)
+    rate_index_max_habits: int = 10000
+
+    # Habits whose streak segment trees are kept for O(log n) updates (0 disables);
+    # a tree over three years of history takes about 55 KB
+    streak_index_max_habits: int = 1000
+
+    # Run streak and analytics loops over at least this many history days in a
+    # "thread" or "process" pool instead of on the event loop (0 keeps inline)
+    compute_pool_kind: Literal["thread", "process"] = "thread"
+    compute_pool_workers: int = 2
+    compute_pool_threshold: int = 2000
+
+    # Group commit: coalesce concurrent completion writes into one transaction
+    group_commit_enabled: bool = False
+    group_commit_window_ms: float = 5.0
+    group_commit_max_batch: int = 64
+
+    # Server-Sent Events change stream
+    events_replay_size: int = 1000
+    events_heartbeat_seconds: float = 15.0
+
+    # Logging
+    log_json: bool = False
+    log_level: str = "INFO"
+    # Keep rate per event name for high-volume events, e.g. {"habit_completed": 0.1}
+    log_sample_rates: dict[str, float] = {}
 
     # CORS
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
+    # Profiling
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    # The header only triggers a profile when its value equals the token
+    profiling_header: str | None = "X-Profile"
+    profiling_token: str | None = None
+    profiling_dir: str = "./profiles"
+    # Profiling stops once this process has written this many files or bytes
+    profiling_max_files: int = 100
+    profiling_max_bytes: int = 100 * 1024 * 1024
+
 
 settings = Settings()
@@ -1,11 +1,29 @@
 """Database configuration and session management."""
 
 from collections.abc import AsyncGenerator
+from functools import partial
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.migrations import upgrade_database
+from app.core.tenancy import (
+    DEFAULT_TENANT,
+    InvalidTenantError,
+    TenantDatabase,
+    TenantEngineCache,
+    current_tenant,
+    validate_tenant_id,
+)
 
 
 class Base(DeclarativeBase):
@@ -14,25 +32,170 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-)
+def _set_sqlite_pragmas(
+    wal: bool, dbapi_connection: Any, connection_record: Any
+) -> None:
+    """Configure every new SQLite connection.
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+    Incremental auto-vacuum only takes effect on a new database file and lets
+    the maintenance scheduler return free pages in small steps. WAL lets
+    readers proceed while a write is in progress. Foreign keys are enforced
+    so deleting a habit cascades to its history inside SQLite.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    if wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for getting async database sessions."""
-    async with AsyncSessionLocal() as session:
-        yield session
+def build_engine(database_url: str, app_settings: Settings = settings) -> AsyncEngine:
+    """Create an async engine with the application's connection settings."""
+    new_engine = create_async_engine(database_url, echo=app_settings.debug)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(
+            new_engine.sync_engine,
+            "connect",
+            partial(_set_sqlite_pragmas, app_settings.sqlite_wal),
+        )
+    return new_engine
+
+
+def build_read_only_engine(database_url: str) -> AsyncEngine:
+    """Create an async engine that can only read an existing SQLite file.
+
+    Used by offline tools that read in many processes next to a running
+    application; the connection pragmas are skipped because they write.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        raise ValueError(f"Read-only engines need a SQLite file: {database_url}")
+    return create_async_engine(
+        url.set(database=f"file:{url.database}", query={"mode": "ro", "uri": "true"})
+    )
+
+
+async def prepare_database(
+    database_engine: AsyncEngine, app_settings: Settings = settings
+) -> None:
+    """Create or migrate a database's schema to the current version."""
+    await upgrade_database(
+        database_engine,
+        Base.metadata,
+        batch_size=app_settings.migration_batch_size,
+        allow_migrations=app_settings.migrate_on_startup,
+    )
+
+
+class Databases:
+    """An application's databases, with engines created on first use.
+
+    Building the default engine is deferred until a request, job or startup
+    step needs it, so creating an application is cheap and several
+    applications with different settings can live in one process.
+    """
+
+    def __init__(self, app_settings: Settings) -> None:
+        """Initialize from settings without opening anything."""
+        self.settings = app_settings
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.tenant_engines = TenantEngineCache(
+            url_template=app_settings.tenant_database_url_template,
+            engine_factory=partial(build_engine, app_settings=app_settings),
+            prepare=self.prepare,
+            max_engines=app_settings.tenant_max_open_engines,
+        )
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Return the default database's engine, creating it if needed."""
+        if self._engine is None:
+            self._engine = build_engine(self.settings.database_url, self.settings)
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Return the default database's session factory."""
+        if self._session_factory is None:
+            self._session_factory = async_sessionmaker(
+                self.engine, class_=AsyncSession, expire_on_commit=False
+            )
+        return self._session_factory
 
+    async def prepare(self, database_engine: AsyncEngine) -> None:
+        """Create or migrate a database with these settings."""
+        await prepare_database(database_engine, self.settings)
 
-async def create_tables() -> None:
-    """Create all database tables."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    def active(self) -> list[TenantDatabase]:
+        """Return every database currently open by this application."""
+        if self.settings.multi_tenant:
+            return self.tenant_engines.open_databases()
+        return [TenantDatabase(DEFAULT_TENANT, self.engine, self.session_factory)]
+
+    async def dispose(self) -> None:
+        """Close every engine this application opened."""
+        await self.tenant_engines.dispose_all()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+
+
+def _databases(request: Request) -> Databases:
+    """Return the databases of the application serving a request."""
+    databases: Databases = request.app.state.databases
+    return databases
+
+
+async def get_settings(request: Request) -> Settings:
+    """Dependency returning the settings of the application serving a request."""
+    return _databases(request).settings
+
+
+async def get_tenant(request: Request) -> str:
+    """Dependency resolving the tenant a request belongs to.
+
+    Always the default tenant unless multi-tenant mode is enabled, in which
+    case the tenant header is required.
+    """
+    app_settings = _databases(request).settings
+    if not app_settings.multi_tenant:
+        return DEFAULT_TENANT
+    try:
+        tenant_id = validate_tenant_id(request.headers.get(app_settings.tenant_header))
+    except InvalidTenantError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    current_tenant.set(tenant_id)
+    return tenant_id
+
+
+async def get_session_factory(
+    request: Request,
+    tenant_id: str = Depends(get_tenant),
+) -> async_sessionmaker[AsyncSession]:
+    """Dependency returning the session factory of the request's database.
+
+    For work that may outlive the request's own session, such as a
+    computation shared with concurrent requests.
+    """
+    databases = _databases(request)
+    if not databases.settings.multi_tenant:
+        return databases.session_factory
+    database = await databases.tenant_engines.get(tenant_id)
+    return database.session_factory
+
+
+async def get_db(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting async database sessions.
+
+    In multi-tenant mode the session is opened on the tenant's own database.
+    """
+    async with session_factory() as session:
+        yield session
@@ -0,0 +1,164 @@
+"""In-process pub/sub of data change events for the SSE stream."""
+
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date as date_type
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEvent:
+    """A committed change to a habit or its history."""
+
+    id: int
+    type: str
+    tenant: str
+    habit_id: str
+    version: int
+    date: date_type | None = None
+
+    def encode(self) -> bytes:
+        """Encode the event as a Server-Sent Events message."""
+        data: dict[str, object] = {"habit_id": self.habit_id, "version": self.version}
+        if self.date is not None:
+            data["date"] = self.date.isoformat()
+        return (
+            f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(data)}\n\n"
+        ).encode()
+
+
+HEARTBEAT_MESSAGE = b": ping\n\n"
+
+
+@dataclass(slots=True, eq=False)
+class Subscription:
+    """A subscriber's queue of events for one tenant."""
+
+    tenant: str
+    queue: asyncio.Queue[ChangeEvent]
+    backlog: list[ChangeEvent] = field(default_factory=list)
+    needs_reset: bool = False
+
+
+class EventBroker:
+    """Fans committed change events out to subscribers.
+
+    The most recent ``replay_size`` events are kept so that a reconnecting
+    client can resume from its ``Last-Event-ID``. Event ids start from the
+    process start time, so ids from a previous process are never mistaken for
+    current ones. A subscriber that falls too far behind is told to reset,
+    meaning refetch everything, instead of blocking publishers.
+    """
+
+    def __init__(self, replay_size: int = 1000, queue_size: int = 256) -> None:
+        """Initialize broker with replay buffer and per-subscriber queue sizes."""
+        self.queue_size = queue_size
+        self._next_id = time.time_ns() // 1_000_000
+        self._replay: deque[ChangeEvent] = deque(maxlen=replay_size)
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Return the number of connected subscribers."""
+        return len(self._subscribers)
+
+    def publish(
+        self,
+        type_: str,
+        tenant: str,
+        habit_id: str,
+        version: int,
+        date: date_type | None = None,
+    ) -> ChangeEvent:
+        """Record an event and deliver it to the tenant's subscribers."""
+        self._next_id += 1
+        event = ChangeEvent(self._next_id, type_, tenant, habit_id, version, date)
+        self._replay.append(event)
+        for subscription in self._subscribers:
+            if subscription.tenant != tenant or subscription.needs_reset:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.needs_reset = True
+                logger.warning("event_subscriber_overflowed", tenant=tenant)
+        return event
+
+    def reset_message(self) -> bytes:
+        """Encode a reset event carrying the latest event id.
+
+        The id lets the client resume from here after it has refetched.
+        """
+        return f"id: {self._next_id}\nevent: reset\ndata: {{}}\n\n".encode()
+
+    @contextmanager
+    def subscribe(
+        self, tenant: str, last_event_id: int | None = None
+    ) -> Iterator[Subscription]:
+        """Register a subscriber, collecting events missed since ``last_event_id``.
+
+        If the missed events are no longer in the replay buffer the
+        subscription starts with ``needs_reset`` set.
+        """
+        subscription = Subscription(tenant, asyncio.Queue(maxsize=self.queue_size))
+        if last_event_id is not None:
+            oldest = self._replay[0].id if self._replay else self._next_id + 1
+            if last_event_id < oldest - 1 or last_event_id > self._next_id:
+                subscription.needs_reset = True
+            else:
+                subscription.backlog = [
+                    event
+                    for event in self._replay
+                    if event.id > last_event_id and event.tenant == tenant
+                ]
+        self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+
+
+async def event_stream(
+    broker: EventBroker,
+    tenant: str,
+    last_event_id: int | None,
+    heartbeat_seconds: float,
+) -> AsyncIterator[bytes]:
+    """Yield SSE messages for a tenant until the client disconnects."""
+    with broker.subscribe(tenant, last_event_id) as subscription:
+        if subscription.needs_reset:
+            subscription.needs_reset = False
+            yield broker.reset_message()
+        for event in subscription.backlog:
+            yield event.encode()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=heartbeat_seconds
+                )
+            except TimeoutError:
+                yield HEARTBEAT_MESSAGE
+                continue
+
+            if subscription.needs_reset:
+                # Events were dropped; discard the rest and ask for a refetch
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.needs_reset = False
+                yield broker.reset_message()
+                continue
+            yield event.encode()
+
+
+event_broker = EventBroker(replay_size=settings.events_replay_size)
@@ -0,0 +1,104 @@
+"""Version-tagged in-memory indexes over each habit's day history."""
+
+from collections import OrderedDict
+from datetime import date
+from typing import Generic, Protocol, TypeVar
+
+COMPLETED = 1
+ABSENT = 2
+
+# Flag changes carried by each history event: (flag, set or cleared)
+EVENT_CHANGES = {
+    "completion.added": (COMPLETED, True),
+    "completion.removed": (COMPLETED, False),
+    "absence.added": (ABSENT, True),
+    "absence.removed": (ABSENT, False),
+}
+
+# Events after which an entry must be rebuilt rather than updated in place
+DROPPING_EVENTS = {"habit.deleted", "history.rewritten"}
+
+
+class DayIndex(Protocol):
+    """A structure over one habit's days that can take single-day changes."""
+
+    def covers(self, day: date) -> bool:
+        """Return True if a change on the day can be applied in place."""
+        ...
+
+    def set_flag(self, day: date, flag: int, value: bool) -> None:
+        """Mark or clear a day's completion or absence."""
+        ...
+
+
+T = TypeVar("T", bound=DayIndex)
+
+
+class HistoryIndex(Generic[T]):
+    """LRU of habits' day indexes, each tagged with the data version it is at.
+
+    An entry is only returned while its version matches the habit's current
+    data version. Committed history changes are applied in place and advance
+    the entry's version when it was current before the change; otherwise
+    the entry is dropped and rebuilt on the next read.
+    """
+
+    def __init__(self, max_habits: int = 10000) -> None:
+        """Initialize an empty index holding at most ``max_habits`` habits."""
+        self.max_habits = max_habits
+        self._entries: OrderedDict[tuple[str, str], tuple[int, T]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of indexed habits."""
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if reads should be answered from the index."""
+        return self.max_habits > 0
+
+    def get(self, tenant_id: str, habit_id: str, version: int) -> T | None:
+        """Return a habit's entry if it is at ``version``."""
+        entry = self._entries.get((tenant_id, habit_id))
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end((tenant_id, habit_id))
+        return entry[1]
+
+    def put(self, tenant_id: str, habit_id: str, version: int, index: T) -> None:
+        """Store a habit's entry as of ``version``."""
+        if not self.enabled:
+            return
+        self._entries[(tenant_id, habit_id)] = (version, index)
+        self._entries.move_to_end((tenant_id, habit_id))
+        while len(self._entries) > self.max_habits:
+            self._entries.popitem(last=False)
+
+    def record(
+        self,
+        tenant_id: str,
+        habit_id: str,
+        version: int,
+        event_type: str,
+        day: date | None,
+    ) -> None:
+        """Bring a habit's entry forward to ``version`` after a change."""
+        key = (tenant_id, habit_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry_version, index = entry
+        change = EVENT_CHANGES.get(event_type)
+        if event_type in DROPPING_EVENTS or entry_version != version - 1:
+            del self._entries[key]
+            return
+        if change is not None and day is not None:
+            if not index.covers(day):
+                del self._entries[key]
+                return
+            index.set_flag(day, *change)
+        self._entries[key] = (version, index)
+
+    def clear(self) -> None:
+        """Drop every habit's entry."""
+        self._entries.clear()
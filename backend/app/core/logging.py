@@ -1,31 +1,175 @@
 """Structured logging configuration."""
 
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import uuid
+from collections.abc import Mapping
+from typing import Any
 
 import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+_listener: logging.handlers.QueueListener | None = None
+
+
+class EventSampler:
+    """Structlog processor that keeps only a fraction of selected events.
+
+    ``rates`` maps event names to the probability of keeping them. Only
+    debug and info entries are sampled; warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        """Initialize sampler with per-event keep rates."""
+        self.rates = dict(rates)
+
+    def __call__(
+        self, logger: Any, method_name: str, event_dict: structlog.types.EventDict
+    ) -> structlog.types.EventDict:
+        """Drop the event unless it is selected by its sampling rate."""
+        if method_name in ("debug", "info"):
+            rate = self.rates.get(event_dict.get("event", ""))
+            if rate is not None and random.random() >= rate:
+                raise structlog.DropEvent
+        return event_dict
+
+
+def setup_logging(
+    json_logs: bool = False,
+    level: str = "INFO",
+    sample_rates: Mapping[str, float] | None = None,
+) -> None:
+    """Configure structured logging with structlog.
+
+    The default console mode renders colourised output for development. JSON
+    mode renders one JSON object per line and hands it to a queue; a
+    background listener thread does the actual write, so the event loop never
+    blocks on stdout. Calling it again replaces the previous configuration,
+    stopping the listener a previous JSON setup started.
+    """
+    log_level = logging.getLevelName(level.upper())
+    shutdown_logging()
+
+    processors: list[structlog.types.Processor] = [
+        structlog.contextvars.merge_contextvars,
+    ]
+    if sample_rates:
+        processors.append(EventSampler(sample_rates))
+    processors += [
+        structlog.processors.add_log_level,
+        structlog.processors.StackInfoRenderer(),
+    ]
+
+    if not json_logs:
+        structlog.configure(
+            processors=[
+                *processors,
+                structlog.dev.set_exc_info,
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.dev.ConsoleRenderer(),
+            ],
+            wrapper_class=structlog.make_filtering_bound_logger(log_level),
+            context_class=dict,
+            logger_factory=structlog.PrintLoggerFactory(),
+            cache_logger_on_first_use=True,
+        )
+
+        # Configure standard library logging to use structlog, dropping the
+        # queue handler of a previous JSON setup
+        root = logging.getLogger()
+        root.handlers = [
+            handler
+            for handler in root.handlers
+            if not isinstance(handler, logging.handlers.QueueHandler)
+        ]
+        logging.basicConfig(
+            format="%(message)s",
+            stream=sys.stdout,
+            level=log_level,
+        )
+        return
 
-def setup_logging() -> None:
-    """Configure structured logging with structlog."""
     structlog.configure(
         processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer(),
+            *processors,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(),
         ],
-        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
+    _install_queue_handler(log_level)
+
+
+def _install_queue_handler(log_level: int) -> None:
+    """Route all standard library logging through a queue listener thread."""
+    global _listener
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(log_level)
 
-    # Configure standard library logging to use structlog
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
     )
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Stop the queue listener, flushing any pending log records."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Registered once; the hook stops whichever listener is current at exit
+atexit.register(shutdown_logging)
+
+
+class RequestContextMiddleware:
+    """ASGI middleware binding a request id to the structlog context.
+
+    Reuses the caller's ``X-Request-ID`` header when present, otherwise
+    generates one, and echoes it on the response.
+    """
+
+    header = b"x-request-id"
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Bind the request id for the duration of the request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = uuid.uuid4().hex
+        for name, value in scope["headers"]:
+            if name == self.header and value:
+                request_id = value.decode("latin-1")[:64]
+                break
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        with structlog.contextvars.bound_contextvars(request_id=request_id):
+            await self.app(scope, receive, send_with_request_id)
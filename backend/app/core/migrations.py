@@ -0,0 +1,155 @@
+"""Versioned schema migrations.
+
+Migrations are the ``vNNNN_<name>`` modules of the ``app.migrations``
+package, applied in version order. Each defines::
+
+    def upgrade(conn: Connection, metadata: MetaData, batch_size: int) -> None
+
+and may commit between batches of a long data copy, so it must be safe to
+run again after an interruption. Applied versions are recorded in the
+``schema_migrations`` table, which makes the startup check a single query.
+
+A database with no tables is created from the models and stamped with the
+latest version. A database created before versioning has tables but no
+``schema_migrations`` table and is brought forward from version 0.
+"""
+
+import importlib
+import pkgutil
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy import Connection, MetaData, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import app.migrations
+
+logger = structlog.get_logger()
+
+SCHEMA_TABLE = "schema_migrations"
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """Raised when a database needs migrations that may not run automatically."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One versioned schema change."""
+
+    version: int
+    name: str
+    upgrade: Callable[[Connection, MetaData, int], None]
+
+
+def load_migrations() -> list[Migration]:
+    """Return every migration in the package, in version order."""
+    migrations = []
+    for module_info in pkgutil.iter_modules(app.migrations.__path__):
+        prefix, _, name = module_info.name.partition("_")
+        if not (prefix.startswith("v") and prefix[1:].isdigit()):
+            continue
+        module = importlib.import_module(f"app.migrations.{module_info.name}")
+        migrations.append(Migration(int(prefix[1:]), name, module.upgrade))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def current_version(conn: Connection) -> int | None:
+    """Return the schema version, 0 if unversioned, or None if empty."""
+    tables = set(
+        conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ).scalars()
+    )
+    if SCHEMA_TABLE in tables:
+        version = conn.execute(text(f"SELECT max(version) FROM {SCHEMA_TABLE}"))
+        return int(version.scalar_one() or 0)
+    return 0 if tables else None
+
+
+def _create_schema_table(conn: Connection) -> None:
+    """Create the version table if it does not exist."""
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} ("
+            "version INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+            "applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    """Record a migration as applied."""
+    conn.execute(
+        text(f"INSERT INTO {SCHEMA_TABLE} (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+
+
+def pending_migrations(conn: Connection) -> list[Migration]:
+    """Return migrations not yet applied; all of them for an empty database."""
+    version = current_version(conn) or 0
+    return [m for m in load_migrations() if m.version > version]
+
+
+def apply_migrations(
+    conn: Connection, metadata: MetaData, batch_size: int
+) -> list[Migration]:
+    """Bring the database up to the latest version; return what was applied."""
+    migrations = load_migrations()
+    version = current_version(conn)
+    if version is None:
+        # Nothing to migrate: build the current schema and stamp it
+        metadata.create_all(conn)
+        _create_schema_table(conn)
+        if migrations:
+            _record(conn, migrations[-1])
+        conn.commit()
+        return []
+
+    applied = []
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        start = time.perf_counter()
+        migration.upgrade(conn, metadata, batch_size)
+        _create_schema_table(conn)
+        _record(conn, migration)
+        conn.commit()
+        applied.append(migration)
+        logger.info(
+            "migration_applied",
+            version=migration.version,
+            migration=migration.name,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+        )
+    return applied
+
+
+async def upgrade_database(
+    engine: AsyncEngine,
+    metadata: MetaData,
+    batch_size: int,
+    allow_migrations: bool = True,
+) -> list[Migration]:
+    """Check the schema version and apply pending migrations.
+
+    With ``allow_migrations`` False an existing database that is behind
+    raises ``SchemaOutOfDateError`` instead, so long migrations can be run
+    offline with ``python -m app.cli.migrate``.
+    """
+    async with engine.connect() as conn:
+        pending = await conn.run_sync(pending_migrations)
+        if not pending:
+            await conn.rollback()
+            return []
+        version = await conn.run_sync(current_version)
+        if version is not None and not allow_migrations:
+            names = ", ".join(f"v{m.version:04d}_{m.name}" for m in pending)
+            raise SchemaOutOfDateError(
+                f"Database needs migrations {names}; run python -m app.cli.migrate"
+            )
+        return await conn.run_sync(apply_migrations, metadata, batch_size)
@@ -0,0 +1,128 @@
+"""Opt-in per-request profiling middleware."""
+
+import asyncio
+import cProfile
+import hmac
+import random
+import re
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import structlog
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = structlog.get_logger()
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that runs selected requests under cProfile.
+
+    A request is profiled when it is sampled (``sample_rate``) or when it
+    carries the trigger header with the configured ``token`` as its value;
+    without a token the header is ignored, so clients cannot force profiles.
+    Unsampled requests pay a single ``random.random()`` call, so low
+    sampling rates are safe to leave on. Once ``max_files`` profiles or
+    ``max_bytes`` of them have been written, profiling stops until restart.
+
+    Profiles are written in pstats format, which ``snakeviz``, ``gprof2dot``
+    and ``flameprof`` turn into call graphs and flamegraphs. File names carry
+    the method, route template and wall-clock duration.
+
+    cProfile records everything run on the event loop thread while it is
+    enabled, and the profiled request awaits, so a profile also contains the
+    coroutines of any requests served concurrently with it, and its
+    duration includes their time. Attribution to the route is only exact on
+    an otherwise idle process; under load, read profiles as samples of the
+    whole process taken while that route was in flight.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: str | Path,
+        sample_rate: float = 0.0,
+        header: str | None = "x-profile",
+        token: str | None = None,
+        max_files: int = 100,
+        max_bytes: int = 100 * 1024 * 1024,
+    ) -> None:
+        """Initialize middleware with output directory and trigger rules."""
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode() if header and token else None
+        self.token = token.encode() if token else b""
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        # Profiles written by this process, counted against the limits
+        self.files_written = 0
+        self.bytes_written = 0
+        # cProfile hooks the whole interpreter, so only one profile may run
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Profile the request if it is selected, otherwise pass it through."""
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._lock.acquire(blocking=False):
+            # Another request is already being profiled
+            await self.app(scope, receive, send)
+            return
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.disable()
+        finally:
+            self._lock.release()
+            duration_ms = (time.perf_counter() - start) * 1000
+            # Writing the file would block every other request on the loop
+            await asyncio.to_thread(self._dump, profiler, scope, duration_ms)
+
+    def _should_profile(self, scope: Scope) -> bool:
+        """Decide whether this request should be profiled."""
+        if self.files_written >= self.max_files or self.bytes_written >= self.max_bytes:
+            return False
+        if self.header is not None:
+            for name, value in scope["headers"]:
+                if name == self.header and hmac.compare_digest(value, self.token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _dump(
+        self, profiler: cProfile.Profile, scope: Scope, duration_ms: float
+    ) -> None:
+        """Write the collected profile to the output directory."""
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or scope["path"]
+        slug = _UNSAFE_FILENAME_CHARS.sub("_", route_path.strip("/")) or "root"
+        timestamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        filename = f"{timestamp}_{scope['method']}_{slug}_{duration_ms:.0f}ms.prof"
+
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / filename
+            profiler.dump_stats(path)
+            self.files_written += 1
+            self.bytes_written += path.stat().st_size
+        except OSError:
+            logger.exception("profile_write_failed", route=route_path)
+            return
+
+        logger.info(
+            "request_profiled",
+            route=route_path,
+            method=scope["method"],
+            duration_ms=round(duration_ms, 1),
+            path=str(path),
+        )
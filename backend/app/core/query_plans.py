@@ -0,0 +1,158 @@
+"""Query plan capture and index advice for SQLite.
+
+``QueryRecorder`` collects the statements an engine executes and counts
+how many were compiled from SQLAlchemy's statement cache; ``explain``
+turns each into its ``EXPLAIN QUERY PLAN`` details, where a ``SCAN`` of a
+history table is a full table or index scan and ``USE TEMP B-TREE`` is a
+sort the indexes could not provide. ``redundant_indexes`` finds indexes
+whose columns are a leading prefix of another index on the same table,
+which cost a write each and are never needed for reads.
+"""
+
+import re
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Self
+
+from sqlalchemy import Connection, Engine, event, text
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# Tables that grow with every check-in; scanning one is a regression
+HISTORY_TABLES = frozenset(
+    {"completions", "absences", "completion_runs", "monthly_rollups", "habit_archives"}
+)
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+_PLANNED = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """A statement and the details of its query plan."""
+
+    statement: str
+    details: tuple[str, ...]
+
+    def full_scans(self, tables: frozenset[str] = HISTORY_TABLES) -> list[str]:
+        """Return plan steps that scan a whole table from ``tables``."""
+        return [
+            detail
+            for detail in self.details
+            if (match := _SCAN.match(detail)) and match.group(1) in tables
+        ]
+
+    def temp_sorts(self) -> list[str]:
+        """Return plan steps that sort into a temporary B-tree."""
+        return [detail for detail in self.details if "USE TEMP B-TREE" in detail]
+
+
+@dataclass
+class QueryRecorder:
+    """Context manager recording statements an engine executes."""
+
+    engine: Engine | AsyncEngine
+    statements: list[tuple[str, Any]] = field(default_factory=list)
+    # Every statement executed, not only those recorded for their plans
+    executed: int = 0
+    cache_hits: int = 0
+
+    @property
+    def _sync_engine(self) -> Engine:
+        """Return the engine events are registered on."""
+        if isinstance(self.engine, AsyncEngine):
+            return self.engine.sync_engine
+        return self.engine
+
+    def _record(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Count cache hits and keep statements with a plan worth checking."""
+        self.executed += 1
+        if getattr(context, "cache_hit", None) is CacheStats.CACHE_HIT:
+            self.cache_hits += 1
+        if statement.lstrip().upper().startswith(_PLANNED) and not executemany:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self) -> Self:
+        """Start recording."""
+        event.listen(self._sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop recording."""
+        event.remove(self._sync_engine, "before_cursor_execute", self._record)
+
+
+async def explain(
+    conn: AsyncConnection, statement: str, parameters: Any = ()
+) -> QueryPlan:
+    """Return the query plan SQLite chooses for a statement."""
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return QueryPlan(statement, tuple(result.scalars(3).all()))
+
+
+@dataclass(frozen=True)
+class IndexInfo:
+    """An index and the columns it covers, in order."""
+
+    table: str
+    name: str
+    columns: tuple[str, ...]
+    unique: bool
+
+
+def list_indexes(conn: Connection) -> list[IndexInfo]:
+    """Return every index on every table, including constraint indexes."""
+    tables = conn.execute(
+        text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%'"
+        )
+    ).scalars()
+    indexes = []
+    for table in tables.all():
+        for row in conn.execute(text(f"PRAGMA index_list('{table}')")).all():
+            name, unique = row[1], bool(row[2])
+            columns = conn.execute(text(f"PRAGMA index_info('{name}')")).all()
+            indexes.append(
+                IndexInfo(table, name, tuple(column[2] for column in columns), unique)
+            )
+    return indexes
+
+
+def redundant_indexes(indexes: list[IndexInfo]) -> list[tuple[IndexInfo, IndexInfo]]:
+    """Return ``(index, covered_by)`` pairs where ``index`` is never needed.
+
+    An index is redundant when its columns lead another index on the same
+    table, unless it enforces a uniqueness the other does not.
+    """
+    redundant = []
+    for index in indexes:
+        for other in indexes:
+            if other is index or other.table != index.table:
+                continue
+            if other.columns[: len(index.columns)] != index.columns:
+                continue
+            if index.unique and not (other.unique and other.columns == index.columns):
+                continue
+            if other.columns == index.columns and (other.unique, other.name) < (
+                index.unique,
+                index.name,
+            ):
+                # Of two identical indexes, report only one
+                continue
+            redundant.append((index, other))
+            break
+    return redundant
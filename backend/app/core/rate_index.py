@@ -0,0 +1,96 @@
+"""Per-habit cumulative day counts for completion rates over any window."""
+
+from array import array
+from datetime import date, timedelta
+
+from app.core.config import settings
+from app.core.history_index import ABSENT, COMPLETED, HistoryIndex
+
+
+class PrefixCounts:
+    """Completed and absent day counts of one habit, as prefix sums.
+
+    Entry ``i`` of each prefix array counts the days before
+    ``first_day + i``, so the count over any range is two lookups and a
+    subtraction. Each day's flags are kept too, which makes applying a
+    change idempotent: marking a day already marked changes nothing.
+    """
+
+    def __init__(
+        self,
+        first_day: date,
+        last_day: date,
+        completions: set[date],
+        absences: set[date],
+    ) -> None:
+        """Build the counts of every day from ``first_day`` to ``last_day``."""
+        self.first_day = first_day
+        self._flags = bytearray()
+        self._completed = array("l", [0])
+        self._absent = array("l", [0])
+        self._extend_to(last_day)
+        for day in completions:
+            self._flags[(day - first_day).days] |= COMPLETED
+        for day in absences:
+            self._flags[(day - first_day).days] |= ABSENT
+        completed = absent = 0
+        for index, flags in enumerate(self._flags, start=1):
+            completed += flags & COMPLETED
+            absent += (flags & ABSENT) >> 1
+            self._completed[index] = completed
+            self._absent[index] = absent
+
+    @property
+    def last_day(self) -> date:
+        """Return the last day covered."""
+        return self.first_day + timedelta(days=len(self._flags) - 1)
+
+    def counts(self, start_date: date, end_date: date) -> tuple[int, int]:
+        """Return completed and absent days in a range.
+
+        Days outside the covered span have no history and count as neither.
+        """
+        start = max((start_date - self.first_day).days, 0)
+        end = min((end_date - self.first_day).days + 1, len(self._flags))
+        if start >= end:
+            return 0, 0
+        return (
+            self._completed[end] - self._completed[start],
+            self._absent[end] - self._absent[start],
+        )
+
+    def covers(self, day: date) -> bool:
+        """Return True if a change on the day can be applied in place."""
+        return day >= self.first_day
+
+    def set_flag(self, day: date, flag: int, value: bool) -> None:
+        """Mark or clear a day's completion or absence.
+
+        Only the prefix entries after the day change, so writes to recent
+        days, the common case, are cheap.
+        """
+        if day > self.last_day:
+            self._extend_to(day)
+        index = (day - self.first_day).days
+        if bool(self._flags[index] & flag) == value:
+            return
+        if value:
+            self._flags[index] |= flag
+        else:
+            self._flags[index] &= ~flag
+        prefix = self._completed if flag == COMPLETED else self._absent
+        delta = 1 if value else -1
+        for position in range(index + 1, len(prefix)):
+            prefix[position] += delta
+
+    def _extend_to(self, day: date) -> None:
+        """Cover every day up to ``day`` with no history."""
+        missing = (day - self.first_day).days + 1 - len(self._flags)
+        if missing <= 0:
+            return
+        self._flags.extend(bytes(missing))
+        self._completed.extend([self._completed[-1]] * missing)
+        self._absent.extend([self._absent[-1]] * missing)
+
+
+rate_index = HistoryIndex[PrefixCounts](max_habits=settings.rate_index_max_habits)
@@ -0,0 +1,147 @@
+"""In-process async scheduler for periodic background jobs."""
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from datetime import time as time_of_day
+
+import structlog
+
+logger = structlog.get_logger()
+
+JobFunc = Callable[[], Awaitable[object]]
+
+
+@dataclass(slots=True)
+class JobStats:
+    """Timing metrics for a scheduled job."""
+
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_started_at: datetime | None = None
+    last_duration_ms: float | None = None
+    total_duration_ms: float = 0.0
+
+
+@dataclass(slots=True)
+class Job:
+    """A periodic job run either every ``interval`` seconds or daily ``at``."""
+
+    name: str
+    func: JobFunc
+    interval: float | None = None
+    at: time_of_day | None = None
+    jitter: float = 0.0
+    stats: JobStats = field(default_factory=JobStats)
+
+    def next_delay(self, now: datetime) -> float:
+        """Return seconds until the next run, including random jitter."""
+        if self.at is not None:
+            target = datetime.combine(now.date(), self.at)
+            if target <= now:
+                target += timedelta(days=1)
+            delay = (target - now).total_seconds()
+        else:
+            assert self.interval is not None
+            delay = self.interval
+        return delay + random.uniform(0, self.jitter)
+
+
+class Scheduler:
+    """Runs registered jobs on their schedules until stopped.
+
+    Each job gets a timer task. A run that is still in progress when its next
+    tick arrives causes that tick to be skipped, so a job never overlaps with
+    itself. ``stop`` cancels timers and any in-flight runs.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty scheduler."""
+        self.jobs: dict[str, Job] = {}
+        self._timers: list[asyncio.Task[None]] = []
+        self._running: dict[str, asyncio.Task[None]] = {}
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        *,
+        interval: float | None = None,
+        at: time_of_day | None = None,
+        jitter: float = 0.0,
+    ) -> Job:
+        """Register a job with exactly one of ``interval`` or ``at``."""
+        if (interval is None) == (at is None):
+            raise ValueError("Job needs exactly one of interval or at")
+        if name in self.jobs:
+            raise ValueError(f"Job {name!r} is already registered")
+        job = Job(name=name, func=func, interval=interval, at=at, jitter=jitter)
+        self.jobs[name] = job
+        return job
+
+    @property
+    def started(self) -> bool:
+        """Return True if the scheduler's timers are running."""
+        return bool(self._timers)
+
+    def start(self) -> None:
+        """Start a timer task for every registered job."""
+        if self.started:
+            return
+        self._timers = [
+            asyncio.create_task(self._timer(job), name=f"scheduler:{job.name}")
+            for job in self.jobs.values()
+        ]
+        logger.info("scheduler_started", jobs=sorted(self.jobs))
+
+    async def stop(self) -> None:
+        """Cancel timers and in-flight runs, waiting for them to finish."""
+        tasks = [*self._timers, *self._running.values()]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._timers = []
+        self._running.clear()
+        logger.info("scheduler_stopped")
+
+    def run_now(self, name: str) -> asyncio.Task[None] | None:
+        """Start a run of a job immediately unless one is in progress."""
+        job = self.jobs[name]
+        if name in self._running:
+            job.stats.skipped += 1
+            logger.warning("job_skipped_overlap", job=name)
+            return None
+        task = asyncio.create_task(self._run(job), name=f"job:{name}")
+        self._running[name] = task
+        task.add_done_callback(lambda _: self._running.pop(name, None))
+        return task
+
+    async def _timer(self, job: Job) -> None:
+        """Sleep until each scheduled tick and start the job."""
+        while True:
+            await asyncio.sleep(job.next_delay(datetime.now()))
+            self.run_now(job.name)
+
+    async def _run(self, job: Job) -> None:
+        """Run a job once, recording timing and failures."""
+        stats = job.stats
+        stats.last_started_at = datetime.now()
+        start = time.perf_counter()
+        try:
+            await job.func()
+        except Exception:
+            stats.failures += 1
+            logger.exception("job_failed", job=job.name)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            stats.runs += 1
+            stats.last_duration_ms = duration_ms
+            stats.total_duration_ms += duration_ms
+            logger.info("job_finished", job=job.name, duration_ms=round(duration_ms, 1))
@@ -0,0 +1,37 @@
+"""Fast JSON serialization for trusted response payloads."""
+
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=64)
+def _adapter(type_: Any) -> TypeAdapter[Any]:
+    """Return a cached TypeAdapter for a response type."""
+    return TypeAdapter(type_)
+
+
+def dump_json(content: Any, type_: Any) -> bytes:
+    """Serialize content to JSON bytes using pydantic-core's encoder.
+
+    Content is not validated again; callers pass models the service layer
+    has already built.
+    """
+    return _adapter(type_).dump_json(content)
+
+
+def json_response(
+    content: Any, type_: Any, status_code: int = status.HTTP_200_OK
+) -> Response:
+    """Build a response that serializes content once and skips revalidation.
+
+    FastAPI returns ``Response`` instances as-is, so the route's
+    ``response_model`` only documents the schema.
+    """
+    return Response(
+        content=dump_json(content, type_),
+        status_code=status_code,
+        media_type="application/json",
+    )
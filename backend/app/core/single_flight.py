@@ -0,0 +1,54 @@
+"""Coalescing of concurrent identical reads into one computation."""
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs one computation per key at a time and shares its result.
+
+    The first caller for a key starts the computation as a task; callers
+    arriving while it is in flight await the same task instead of starting
+    their own, and receive its result or exception. Keys should include the
+    data version, so a read that starts after a write never joins a
+    computation that may predate it. Nothing is kept once a task finishes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with nothing in flight."""
+        self._tasks: dict[Hashable, asyncio.Task[Any]] = {}
+        # Computations started, for observing how well reads coalesce
+        self.computations = 0
+
+    def __len__(self) -> int:
+        """Return number of computations in flight."""
+        return len(self._tasks)
+
+    async def run(
+        self, key: Hashable, compute: Callable[[], Coroutine[Any, Any, T]]
+    ) -> T:
+        """Return the result of ``compute``, shared with concurrent callers."""
+        if not settings.single_flight_enabled:
+            return await compute()
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(compute())
+            self.computations += 1
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # A caller that is cancelled must not cancel the others' computation
+        result: T = await asyncio.shield(task)
+        return result
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        """Drop a finished task so the next caller computes afresh."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+
+single_flight = SingleFlight()
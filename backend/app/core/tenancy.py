@@ -0,0 +1,144 @@
+"""Database-per-tenant routing with a bounded LRU of open engines."""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+logger = structlog.get_logger()
+
+DEFAULT_TENANT = "default"
+
+# Tenant ids become file names, so only a conservative character set is allowed
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Tenant of the request being handled, for keying in-memory caches
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+
+class InvalidTenantError(ValueError):
+    """Raised when a tenant id is missing or malformed."""
+
+
+def validate_tenant_id(tenant_id: str | None) -> str:
+    """Return the tenant id if it is safe to use, otherwise raise."""
+    if not tenant_id or not TENANT_ID_PATTERN.fullmatch(tenant_id):
+        raise InvalidTenantError("Missing or invalid tenant id")
+    return tenant_id
+
+
+@dataclass(slots=True)
+class TenantDatabase:
+    """An open database together with its session factory."""
+
+    tenant_id: str
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession]
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class TenantEngineCache:
+    """Lazily opens one SQLite database per tenant.
+
+    At most ``max_engines`` engines stay open; the least recently used one is
+    disposed when another tenant needs a slot. ``prepare`` creates or migrates
+    the schema the first time a tenant's database is opened by this process.
+    """
+
+    def __init__(
+        self,
+        url_template: str,
+        engine_factory: Callable[[str], AsyncEngine],
+        prepare: Callable[[AsyncEngine], Awaitable[None]],
+        max_engines: int = 32,
+    ) -> None:
+        """Initialize cache with a ``{tenant}`` URL template."""
+        self.url_template = url_template
+        self.engine_factory = engine_factory
+        self.prepare = prepare
+        self.max_engines = max(1, max_engines)
+        self._databases: OrderedDict[str, TenantDatabase] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        """Return number of open tenant engines."""
+        return len(self._databases)
+
+    def open_databases(self) -> list[TenantDatabase]:
+        """Return the currently open tenant databases."""
+        return list(self._databases.values())
+
+    async def get(self, tenant_id: str) -> TenantDatabase:
+        """Return the tenant's database, opening it if needed."""
+        tenant_id = validate_tenant_id(tenant_id)
+        database = self._databases.get(tenant_id)
+        if database is None:
+            async with self._locks.setdefault(tenant_id, asyncio.Lock()):
+                database = self._databases.get(tenant_id)
+                if database is None:
+                    database = await self._open(tenant_id)
+        self._databases.move_to_end(tenant_id)
+        database.last_used = time.monotonic()
+        return database
+
+    async def _open(self, tenant_id: str) -> TenantDatabase:
+        """Create the tenant's engine and schema, evicting if over capacity."""
+        url = make_url(self.url_template.format(tenant=tenant_id))
+        if url.get_backend_name() == "sqlite" and url.database not in (
+            None,
+            ":memory:",
+        ):
+            Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+        engine = self.engine_factory(url.render_as_string(hide_password=False))
+        await self.prepare(engine)
+        database = TenantDatabase(
+            tenant_id=tenant_id,
+            engine=engine,
+            session_factory=async_sessionmaker(
+                engine, class_=AsyncSession, expire_on_commit=False
+            ),
+        )
+        self._databases[tenant_id] = database
+        logger.info("tenant_database_opened", tenant=tenant_id)
+
+        while len(self._databases) > self.max_engines:
+            _, evicted = self._databases.popitem(last=False)
+            await self._dispose(evicted)
+        return database
+
+    async def dispose_idle(self, max_idle_seconds: float) -> int:
+        """Dispose engines unused for longer than ``max_idle_seconds``."""
+        cutoff = time.monotonic() - max_idle_seconds
+        idle = [db for db in self._databases.values() if db.last_used < cutoff]
+        disposed = 0
+        for database in idle:
+            if self._databases.get(database.tenant_id) is database:
+                del self._databases[database.tenant_id]
+                await self._dispose(database)
+                disposed += 1
+        return disposed
+
+    async def dispose_all(self) -> None:
+        """Dispose every open tenant engine."""
+        databases = list(self._databases.values())
+        self._databases.clear()
+        for database in databases:
+            await self._dispose(database)
+
+    async def _dispose(self, database: TenantDatabase) -> None:
+        """Close a tenant engine's pooled connections.
+
+        Connections checked out by in-flight requests are closed when they
+        are returned, so eviction never breaks a running request.
+        """
+        self._locks.pop(database.tenant_id, None)
+        await database.engine.dispose()
+        logger.info("tenant_database_closed", tenant=database.tenant_id)
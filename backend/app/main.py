@@ -2,49 +2,117 @@
 
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import router
-from app.core.config import settings
-from app.core.database import create_tables
-from app.core.logging import setup_logging
+from app.core.compute_pool import compute_pool
+from app.core.config import Settings, settings
+from app.core.database import Databases
+from app.core.logging import RequestContextMiddleware, setup_logging
 
-# Setup structured logging
-setup_logging()
 
+def create_app(app_settings: Settings | None = None) -> FastAPI:
+    """Create an application configured by ``app_settings``.
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Application lifespan context manager."""
-    # Startup: create database tables
-    await create_tables()
-    yield
-    # Shutdown: cleanup if needed
+    Nothing is opened here: the database engine is created on first use and
+    optional subsystems (profiling, background maintenance) are only
+    imported when enabled.
 
+    ``app_settings`` decides the application's databases and their
+    connection pragmas, tenancy, migrations, background maintenance, soft
+    deletes, profiling and CORS. Everything shared by the applications in
+    a process follows the global settings instead: logging, the compute
+    pool, group commit, the in-memory caches and indexes, and the storage
+    layout (``completion_storage``, ``archive_enabled`` and
+    ``monthly_rollups_enabled``), which every code path reading history
+    must agree on.
+    """
+    app_settings = app_settings or settings
+    databases = Databases(app_settings)
 
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.version,
-    description="Prd_Twin Backend API",
-    lifespan=lifespan,
-)
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+        """Application lifespan context manager."""
+        # Startup: create or migrate the schema and start background maintenance
+        if not app_settings.multi_tenant:
+            await databases.prepare(databases.engine)
+        scheduler = None
+        if app_settings.maintenance_enabled:
+            from app.services.maintenance import build_maintenance_scheduler
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+            scheduler = build_maintenance_scheduler(
+                databases.active,
+                app_settings,
+                tenant_engines=(
+                    databases.tenant_engines if app_settings.multi_tenant else None
+                ),
+            )
+            scheduler.start()
+        yield
+        # Shutdown: stop maintenance jobs, then close pooled connections. The
+        # compute pool is shared with other applications and left running.
+        if scheduler is not None:
+            await scheduler.stop()
+        await databases.dispose()
+
+    app = FastAPI(
+        title=app_settings.app_name,
+        version=app_settings.version,
+        description="Prd_Twin Backend API",
+        lifespan=lifespan,
+    )
+    app.state.databases = databases
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=app_settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Bind a request id to every log event
+    app.add_middleware(RequestContextMiddleware)
+
+    # Per-request profiling (opt-in)
+    if app_settings.profiling_enabled:
+        from app.core.profiling import ProfilingMiddleware
 
-# Include API routes
-app.include_router(router, prefix="/api")
+        app.add_middleware(
+            ProfilingMiddleware,
+            output_dir=app_settings.profiling_dir,
+            sample_rate=app_settings.profiling_sample_rate,
+            header=app_settings.profiling_header,
+            token=app_settings.profiling_token,
+            max_files=app_settings.profiling_max_files,
+            max_bytes=app_settings.profiling_max_bytes,
+        )
 
+    # Include API routes
+    app.include_router(router, prefix="/api")
 
-@app.get("/health")
-async def health_check() -> dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    @app.get("/health")
+    async def health_check() -> dict[str, str]:
+        """Health check endpoint."""
+        return {"status": "healthy"}
+
+    @app.get("/health/compute")
+    async def compute_pool_health() -> dict[str, Any]:
+        """Compute pool counters, showing when CPU-bound work waits for workers."""
+        return compute_pool.report()
+
+    return app
+
+
+# Logging is process-wide, so it is configured once here rather than by
+# each application
+setup_logging(
+    json_logs=settings.log_json,
+    level=settings.log_level,
+    sample_rates=settings.log_sample_rates,
+)
+app = create_app()
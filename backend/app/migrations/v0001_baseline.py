@@ -0,0 +1,25 @@
+"""Create the tables that existed when versioning was introduced.
+
+Databases created before versioning were built by ``create_all`` and may
+lack tables added since. Existing tables are left as they are.
+"""
+
+from sqlalchemy import Connection, MetaData
+
+BASELINE_TABLES = (
+    "habits",
+    "completions",
+    "completion_runs",
+    "absences",
+    "monthly_rollups",
+    "habit_archives",
+    "habit_archive_summaries",
+    "habit_purges",
+)
+
+
+def upgrade(conn: Connection, metadata: MetaData, batch_size: int) -> None:
+    """Create any missing baseline table."""
+    metadata.create_all(
+        conn, tables=[metadata.tables[name] for name in BASELINE_TABLES]
+    )
@@ -0,0 +1,113 @@
+"""Rebuild completions and absences with integer primary keys.
+
+Databases created before integer keys store a random 36-character id on
+every row. Each table is renamed aside, recreated as it was at this
+version and copied back in habit and date order, ``batch_size`` rows per
+transaction. An interrupted copy resumes after the last row already copied.
+"""
+
+from sqlalchemy import Connection, MetaData, text
+
+# Table name -> the unique columns it is copied in order of
+HISTORY_TABLES = {
+    "completions": ("habit_id", "completed_date"),
+    "absences": ("habit_id", "absence_date"),
+}
+
+# The tables as this migration creates them; later migrations change them
+TABLE_SCHEMAS = {
+    "completions": """CREATE TABLE completions (
+        id INTEGER NOT NULL,
+        habit_id VARCHAR(36) NOT NULL,
+        completed_date DATE NOT NULL,
+        created_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_habit_date UNIQUE (habit_id, completed_date),
+        FOREIGN KEY(habit_id) REFERENCES habits (id) ON DELETE CASCADE
+    )""",
+    "absences": """CREATE TABLE absences (
+        id INTEGER NOT NULL,
+        habit_id VARCHAR(36) NOT NULL,
+        absence_date DATE NOT NULL,
+        reason VARCHAR(100),
+        created_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_habit_absence_date UNIQUE (habit_id, absence_date),
+        FOREIGN KEY(habit_id) REFERENCES habits (id) ON DELETE CASCADE
+    )""",
+}
+
+
+def _exists(conn: Connection, name: str) -> bool:
+    """Return True if a table exists."""
+    result = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": name},
+    )
+    return result.first() is not None
+
+
+def _move_aside(conn: Connection, name: str, old_name: str) -> bool:
+    """Rename a UUID-keyed table and create the new one; False if not needed."""
+    id_type = conn.execute(
+        text("SELECT type FROM pragma_table_info(:table) WHERE name = 'id'"),
+        {"table": name},
+    ).scalar_one_or_none()
+    if id_type is None or id_type.upper() == "INTEGER":
+        return False
+    conn.execute(text(f"ALTER TABLE {name} RENAME TO {old_name}"))
+    # Named indexes follow the renamed table; only its unique index is needed
+    indexes = conn.execute(
+        text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = :table AND sql IS NOT NULL"
+        ),
+        {"table": old_name},
+    )
+    for index in indexes.scalars().all():
+        conn.execute(text(f"DROP INDEX {index}"))
+    conn.execute(text(TABLE_SCHEMAS[name]))
+    conn.commit()
+    return True
+
+
+def _copy(
+    conn: Connection, name: str, old_name: str, key: tuple[str, str], batch_size: int
+) -> None:
+    """Copy rows across in key order, committing every ``batch_size`` rows."""
+    names = conn.execute(
+        text("SELECT name FROM pragma_table_info(:table) WHERE name != 'id'"),
+        {"table": name},
+    )
+    columns = ", ".join(names.scalars().all())
+    order = ", ".join(key)
+    while True:
+        last = conn.execute(
+            text(f"SELECT {order} FROM {name} ORDER BY id DESC LIMIT 1")
+        ).first()
+        after = "" if last is None else f"WHERE ({order}) > (:last_habit, :last_date)"
+        copied = conn.execute(
+            text(
+                f"INSERT INTO {name} ({columns}) SELECT {columns} "
+                f"FROM {old_name} {after} ORDER BY {order} LIMIT :limit"
+            ),
+            {
+                "limit": batch_size,
+                "last_habit": last[0] if last else None,
+                "last_date": last[1] if last else None,
+            },
+        ).rowcount
+        conn.commit()
+        if copied < batch_size:
+            return
+
+
+def upgrade(conn: Connection, metadata: MetaData, batch_size: int) -> None:
+    """Rebuild each history table that still has UUID keys."""
+    for name, key in HISTORY_TABLES.items():
+        old_name = f"{name}_uuid"
+        if not _exists(conn, old_name) and not _move_aside(conn, name, old_name):
+            continue
+        _copy(conn, name, old_name, key, batch_size)
+        conn.execute(text(f"DROP TABLE {old_name}"))
+        conn.commit()
@@ -0,0 +1,15 @@
+"""Drop habit/date indexes that duplicate the unique constraints.
+
+``uq_habit_date`` and ``uq_habit_absence_date`` already index the same
+columns, so the extra indexes only slowed every write.
+"""
+
+from sqlalchemy import Connection, MetaData, text
+
+DUPLICATE_INDEXES = ("idx_completions_habit_date", "idx_absences_habit_date")
+
+
+def upgrade(conn: Connection, metadata: MetaData, batch_size: int) -> None:
+    """Drop the duplicate indexes if present."""
+    for index in DUPLICATE_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
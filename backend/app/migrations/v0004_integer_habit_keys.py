@@ -0,0 +1,138 @@
+"""Key habits by an integer rowid and point history rows at it.
+
+Completions and absences referenced their habit by its 36-character UUID,
+repeated in every row and in both unique indexes. Habits gain an integer
+``pk`` primary key, keeping the UUID as a unique column, and each history
+table is rebuilt with a ``habit_pk`` column in its place.
+
+SQLite cannot change a primary key in place, so each table is created
+under a new name, filled, and swapped in with foreign key checks off. The
+habits table is copied in one transaction; history tables are copied in
+habit and date order, ``batch_size`` rows per transaction, and an
+interrupted copy resumes after the last row already copied.
+"""
+
+from sqlalchemy import Connection, MetaData, text
+
+HABITS_SCHEMA = """CREATE TABLE habits_new (
+    pk INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    description VARCHAR(500),
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (pk),
+    UNIQUE (id)
+)"""
+
+HABIT_COLUMNS = "name, description, id, created_at, updated_at"
+
+# Table name -> (its date column, its other columns, its new schema)
+HISTORY_TABLES = {
+    "completions": (
+        "completed_date",
+        "created_at",
+        """CREATE TABLE IF NOT EXISTS completions_new (
+            id INTEGER NOT NULL,
+            habit_pk INTEGER NOT NULL,
+            completed_date DATE NOT NULL,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_habit_date UNIQUE (habit_pk, completed_date),
+            FOREIGN KEY(habit_pk) REFERENCES habits (pk) ON DELETE CASCADE
+        )""",
+    ),
+    "absences": (
+        "absence_date",
+        "reason, created_at",
+        """CREATE TABLE IF NOT EXISTS absences_new (
+            id INTEGER NOT NULL,
+            habit_pk INTEGER NOT NULL,
+            absence_date DATE NOT NULL,
+            reason VARCHAR(100),
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_habit_absence_date UNIQUE (habit_pk, absence_date),
+            FOREIGN KEY(habit_pk) REFERENCES habits (pk) ON DELETE CASCADE
+        )""",
+    ),
+}
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    """Return whether a table has the named column."""
+    result = conn.execute(
+        text("SELECT 1 FROM pragma_table_info(:table) WHERE name = :column"),
+        {"table": table, "column": column},
+    )
+    return result.first() is not None
+
+
+def _rebuild_habits(conn: Connection) -> None:
+    """Swap in a habits table keyed by integer, numbered in creation order."""
+    # The driver does not open transactions for DDL, so the swap opens its own
+    conn.execute(text("BEGIN"))
+    conn.execute(text(HABITS_SCHEMA))
+    conn.execute(
+        text(
+            f"INSERT INTO habits_new ({HABIT_COLUMNS}) SELECT {HABIT_COLUMNS} "
+            "FROM habits ORDER BY created_at, id"
+        )
+    )
+    conn.execute(text("DROP TABLE habits"))
+    # References to "habits" from other tables are left as they are
+    conn.execute(text("ALTER TABLE habits_new RENAME TO habits"))
+    conn.commit()
+
+
+def _rebuild_history(
+    conn: Connection, name: str, day: str, others: str, schema: str, batch_size: int
+) -> None:
+    """Copy a history table into one keyed by habit_pk and swap it in."""
+    new_name = f"{name}_new"
+    conn.execute(text(schema))
+    while True:
+        last = conn.execute(
+            text(
+                f"SELECT habit_pk, {day} FROM {new_name} "
+                f"ORDER BY habit_pk DESC, {day} DESC LIMIT 1"
+            )
+        ).first()
+        after = "" if last is None else f"WHERE (h.pk, t.{day}) > (:last_pk, :last_day)"
+        selected = ", ".join(f"t.{column}" for column in others.split(", "))
+        copied = conn.execute(
+            text(
+                f"INSERT INTO {new_name} (id, habit_pk, {day}, {others}) "
+                f"SELECT t.id, h.pk, t.{day}, {selected} "
+                f"FROM {name} t JOIN habits h ON h.id = t.habit_id "
+                f"{after} ORDER BY h.pk, t.{day} LIMIT :limit"
+            ),
+            {
+                "limit": batch_size,
+                "last_pk": last[0] if last else None,
+                "last_day": last[1] if last else None,
+            },
+        ).rowcount
+        conn.commit()
+        if copied < batch_size:
+            break
+    conn.execute(text("BEGIN"))
+    conn.execute(text(f"DROP TABLE {name}"))
+    conn.execute(text(f"ALTER TABLE {new_name} RENAME TO {name}"))
+    conn.commit()
+
+
+def upgrade(conn: Connection, metadata: MetaData, batch_size: int) -> None:
+    """Rebuild habits and each history table still keyed by UUID."""
+    # The pragma is ignored inside a transaction
+    conn.commit()
+    conn.execute(text("PRAGMA foreign_keys=OFF"))
+    try:
+        if not _has_column(conn, "habits", "pk"):
+            _rebuild_habits(conn)
+        for name, (day, others, schema) in HISTORY_TABLES.items():
+            if not _has_column(conn, name, "habit_pk"):
+                _rebuild_history(conn, name, day, others, schema, batch_size)
+    finally:
+        conn.commit()
+        conn.execute(text("PRAGMA foreign_keys=ON"))
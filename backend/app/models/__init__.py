@@ -2,6 +2,19 @@
 
 from app.models.absence import Absence
 from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
 from app.models.habit import Habit
+from app.models.habit_archive import HabitArchive, HabitArchiveSummary
+from app.models.habit_purge import HabitPurge
+from app.models.monthly_rollup import MonthlyRollup
 
-__all__ = ["Habit", "Completion", "Absence"]
+__all__ = [
+    "Habit",
+    "Completion",
+    "CompletionRun",
+    "Absence",
+    "MonthlyRollup",
+    "HabitArchive",
+    "HabitArchiveSummary",
+    "HabitPurge",
+]
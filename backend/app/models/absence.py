@@ -3,7 +3,7 @@
 from datetime import UTC, date, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy import Date, ForeignKey, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -22,17 +22,14 @@ class Absence(Base):
 
     __tablename__ = "absences"
     __table_args__ = (
-        UniqueConstraint("habit_id", "absence_date", name="uq_habit_absence_date"),
-        Index("idx_absences_habit_date", "habit_id", "absence_date"),
+        UniqueConstraint("habit_pk", "absence_date", name="uq_habit_absence_date"),
     )
 
-    id: Mapped[str] = mapped_column(
-        String(36),
-        primary_key=True,
-    )
-    habit_id: Mapped[str] = mapped_column(
-        String(36),
-        ForeignKey("habits.id", ondelete="CASCADE"),
+    # An integer key is SQLite's rowid, so rows are appended in key order
+    # and need no separate primary key index
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    habit_pk: Mapped[int] = mapped_column(
+        ForeignKey("habits.pk", ondelete="CASCADE"),
         nullable=False,
     )
     absence_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -43,4 +40,4 @@ class Absence(Base):
 
     def __repr__(self) -> str:
         """Return string representation of Absence."""
-        return f"<Absence(habit_id={self.habit_id}, date={self.absence_date})>"
+        return f"<Absence(habit_pk={self.habit_pk}, date={self.absence_date})>"
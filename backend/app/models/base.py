@@ -13,11 +13,12 @@ def utc_now() -> datetime:
 
 
 class UUIDMixin:
-    """Mixin providing UUID primary key."""
+    """Mixin providing a unique public UUID."""
 
     id: Mapped[str] = mapped_column(
         String(36),
-        primary_key=True,
+        unique=True,
+        nullable=False,
         default=lambda: str(uuid.uuid4()),
     )
 
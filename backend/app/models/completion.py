@@ -3,7 +3,7 @@
 from datetime import UTC, date, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy import Date, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -22,17 +22,14 @@ class Completion(Base):
 
     __tablename__ = "completions"
     __table_args__ = (
-        UniqueConstraint("habit_id", "completed_date", name="uq_habit_date"),
-        Index("idx_completions_habit_date", "habit_id", "completed_date"),
+        UniqueConstraint("habit_pk", "completed_date", name="uq_habit_date"),
     )
 
-    id: Mapped[str] = mapped_column(
-        String(36),
-        primary_key=True,
-    )
-    habit_id: Mapped[str] = mapped_column(
-        String(36),
-        ForeignKey("habits.id", ondelete="CASCADE"),
+    # An integer key is SQLite's rowid, so rows are appended in key order
+    # and need no separate primary key index
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    habit_pk: Mapped[int] = mapped_column(
+        ForeignKey("habits.pk", ondelete="CASCADE"),
         nullable=False,
     )
     completed_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -42,4 +39,4 @@ class Completion(Base):
 
     def __repr__(self) -> str:
         """Return string representation of Completion."""
-        return f"<Completion(habit_id={self.habit_id}, date={self.completed_date})>"
+        return f"<Completion(habit_pk={self.habit_pk}, date={self.completed_date})>"
@@ -0,0 +1,49 @@
+"""Completion run SQLAlchemy model."""
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import CheckConstraint, Date, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+if TYPE_CHECKING:
+    from app.models.habit import Habit
+
+
+class CompletionRun(Base):
+    """SQLAlchemy model for a run of consecutive completed days.
+
+    Used instead of one ``Completion`` row per day when completion storage
+    is set to ``runs``. Runs of a habit never overlap.
+    """
+
+    __tablename__ = "completion_runs"
+    __table_args__ = (
+        UniqueConstraint("habit_id", "start_date", name="uq_habit_run_start"),
+        CheckConstraint("start_date <= end_date", name="ck_run_order"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    habit_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[date] = mapped_column(Date, nullable=False)
+
+    habit: Mapped["Habit"] = relationship("Habit", back_populates="completion_runs")
+
+    @property
+    def length(self) -> int:
+        """Return the number of days in the run."""
+        return (self.end_date - self.start_date).days + 1
+
+    def __repr__(self) -> str:
+        """Return string representation of CompletionRun."""
+        return (
+            f"<CompletionRun(habit_id={self.habit_id}, "
+            f"start={self.start_date}, end={self.end_date})>"
+        )
@@ -11,6 +11,10 @@ from app.models.base import TimestampMixin, UUIDMixin
 if TYPE_CHECKING:
     from app.models.absence import Absence
     from app.models.completion import Completion
+    from app.models.completion_run import CompletionRun
+    from app.models.habit_archive import HabitArchive, HabitArchiveSummary
+    from app.models.habit_purge import HabitPurge
+    from app.models.monthly_rollup import MonthlyRollup
 
 
 class Habit(UUIDMixin, TimestampMixin, Base):
@@ -18,6 +22,9 @@ class Habit(UUIDMixin, TimestampMixin, Base):
 
     __tablename__ = "habits"
 
+    # The public id is a UUID; completions and absences refer to this
+    # integer key, SQLite's rowid, instead of repeating 36 characters per row
+    pk: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
@@ -25,12 +32,49 @@ class Habit(UUIDMixin, TimestampMixin, Base):
         "Completion",
         back_populates="habit",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    completion_runs: Mapped[list["CompletionRun"]] = relationship(
+        "CompletionRun",
+        back_populates="habit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     absences: Mapped[list["Absence"]] = relationship(
         "Absence",
         back_populates="habit",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    monthly_rollups: Mapped[list["MonthlyRollup"]] = relationship(
+        "MonthlyRollup",
+        back_populates="habit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    archives: Mapped[list["HabitArchive"]] = relationship(
+        "HabitArchive",
+        back_populates="habit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    archive_summary: Mapped["HabitArchiveSummary | None"] = relationship(
+        "HabitArchiveSummary",
+        back_populates="habit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    purge: Mapped["HabitPurge | None"] = relationship(
+        "HabitPurge",
+        back_populates="habit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self) -> str:
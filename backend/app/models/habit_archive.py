@@ -0,0 +1,65 @@
+"""Archived history SQLAlchemy models."""
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Date, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+if TYPE_CHECKING:
+    from app.models.habit import Habit
+
+
+class HabitArchive(Base):
+    """SQLAlchemy model for one habit-year of compressed archived history."""
+
+    __tablename__ = "habit_archives"
+
+    habit_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    completions: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    absences: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    completion_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    absence_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    habit: Mapped["Habit"] = relationship("Habit", back_populates="archives")
+
+    def __repr__(self) -> str:
+        """Return string representation of HabitArchive."""
+        return f"<HabitArchive(habit_id={self.habit_id}, year={self.year})>"
+
+
+class HabitArchiveSummary(Base):
+    """SQLAlchemy model for a habit's archive boundary and streak checkpoints.
+
+    Everything dated before ``archived_until`` lives in ``habit_archives``.
+    ``trailing_streak`` is the streak running at the end of the archived
+    history, so streak scans can start at the boundary instead of the
+    first completion.
+    """
+
+    __tablename__ = "habit_archive_summaries"
+
+    habit_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    archived_until: Mapped[date] = mapped_column(Date, nullable=False)
+    best_streak: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    trailing_streak: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    habit: Mapped["Habit"] = relationship("Habit", back_populates="archive_summary")
+
+    def __repr__(self) -> str:
+        """Return string representation of HabitArchiveSummary."""
+        return (
+            f"<HabitArchiveSummary(habit_id={self.habit_id}, "
+            f"until={self.archived_until})>"
+        )
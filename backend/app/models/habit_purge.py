@@ -0,0 +1,40 @@
+"""Habit purge SQLAlchemy model."""
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+if TYPE_CHECKING:
+    from app.models.habit import Habit
+
+
+def utc_now() -> datetime:
+    """Return current UTC datetime."""
+    return datetime.now(UTC)
+
+
+class HabitPurge(Base):
+    """SQLAlchemy model marking a soft-deleted habit awaiting purge.
+
+    A habit with a row here is hidden from every read; the purge job deletes
+    its history in chunks and then the habit itself.
+    """
+
+    __tablename__ = "habit_purges"
+
+    habit_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    deleted_at: Mapped[datetime] = mapped_column(default=utc_now)
+
+    habit: Mapped["Habit"] = relationship("Habit", back_populates="purge")
+
+    def __repr__(self) -> str:
+        """Return string representation of HabitPurge."""
+        return f"<HabitPurge(habit_id={self.habit_id}, deleted_at={self.deleted_at})>"
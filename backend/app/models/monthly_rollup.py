@@ -0,0 +1,36 @@
+"""Monthly rollup SQLAlchemy model."""
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+if TYPE_CHECKING:
+    from app.models.habit import Habit
+
+
+class MonthlyRollup(Base):
+    """SQLAlchemy model for a habit's completion and absence counts in a month."""
+
+    __tablename__ = "monthly_rollups"
+
+    habit_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    completions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    absences: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    habit: Mapped["Habit"] = relationship("Habit", back_populates="monthly_rollups")
+
+    def __repr__(self) -> str:
+        """Return string representation of MonthlyRollup."""
+        return (
+            f"<MonthlyRollup(habit_id={self.habit_id}, "
+            f"month={self.year}-{self.month:02d})>"
+        )
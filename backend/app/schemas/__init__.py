@@ -6,13 +6,20 @@ from app.schemas.absence import (
     AbsenceResponse,
     AbsencesListResponse,
 )
+from app.schemas.analytics import (
+    HabitAnalyticsResponse,
+    HeatmapYear,
+    RollingRate,
+    StreakBucket,
+    WeekdayStat,
+)
 from app.schemas.completion import (
     CompletionCreate,
     CompletionResponse,
     CompletionsListResponse,
 )
 from app.schemas.habit import HabitCreate, HabitResponse, HabitUpdate
-from app.schemas.stats import CompletionRate, HabitWithStatsResponse
+from app.schemas.stats import CompletionRate, DailyProgress, HabitWithStatsResponse
 
 __all__ = [
     "HabitCreate",
@@ -27,4 +34,10 @@ __all__ = [
     "AbsencesListResponse",
     "CompletionRate",
     "HabitWithStatsResponse",
+    "DailyProgress",
+    "HabitAnalyticsResponse",
+    "WeekdayStat",
+    "HeatmapYear",
+    "RollingRate",
+    "StreakBucket",
 ]
@@ -0,0 +1,53 @@
+"""Pydantic schemas for habit analytics responses."""
+
+from datetime import date as date_type
+
+from pydantic import BaseModel, Field
+
+
+class WeekdayStat(BaseModel):
+    """Completion counts for one day of the week."""
+
+    weekday: int = Field(description="0 = Monday ... 6 = Sunday")
+    completed: int
+    applicable: int
+    rate: float
+
+
+class HeatmapYear(BaseModel):
+    """Day-by-day status for one calendar year of the range."""
+
+    year: int
+    start: date_type = Field(description="Date of the first value")
+    days: list[int] = Field(description="1 = completed, 0 = missed, -1 = absent")
+
+
+class RollingRate(BaseModel):
+    """Trailing completion rates ending on a date."""
+
+    date: date_type
+    week: float | None
+    month: float | None
+
+
+class StreakBucket(BaseModel):
+    """Number of streaks of a given length."""
+
+    length: int
+    count: int
+
+
+class HabitAnalyticsResponse(BaseModel):
+    """Schema for a habit's analytics over a date range."""
+
+    habit_id: str
+    start_date: date_type
+    end_date: date_type
+    completed: int
+    applicable: int
+    rate: float
+    weekdays: list[WeekdayStat]
+    heatmap: list[HeatmapYear]
+    rolling: list[RollingRate]
+    longest_gap: int
+    streaks: list[StreakBucket]
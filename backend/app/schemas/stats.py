@@ -1,5 +1,6 @@
 """Pydantic schemas for statistics responses."""
 
+from datetime import date as date_type
 from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict
@@ -11,6 +12,8 @@ class CompletionRate(BaseModel):
     week: float
     month: float
     all_time: float
+    # Rates over requested windows, keyed by the window as requested
+    windows: dict[str, float] | None = None
 
 
 class HabitWithStatsResponse(BaseModel):
@@ -27,3 +30,11 @@ class HabitWithStatsResponse(BaseModel):
     best_streak: int
     completion_rate: CompletionRate
     completed_today: bool
+
+
+class DailyProgress(BaseModel):
+    """Completed and applicable habit counts across all habits for a day."""
+
+    date: date_type
+    completed: int
+    applicable: int
@@ -0,0 +1,194 @@
+"""Per-habit analytics computed in one pass over the habit's history."""
+
+from datetime import date, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.compute_pool import compute_pool
+from app.schemas.analytics import (
+    HabitAnalyticsResponse,
+    HeatmapYear,
+    RollingRate,
+    StreakBucket,
+    WeekdayStat,
+)
+from app.services.habit_service import HabitService
+
+WEEK_DAYS = 7
+MONTH_DAYS = 30
+# Longest range analysed in one request, about ten years
+MAX_ANALYTICS_DAYS = 3660
+
+
+def _rate(completed: int, applicable: int) -> float | None:
+    """Return a percentage rounded like CompletionRate, or None if undefined."""
+    if applicable <= 0:
+        return None
+    return round(completed / applicable * 100, 1)
+
+
+def compute_analytics(
+    habit_id: str,
+    start_date: date,
+    end_date: date,
+    created_date: date,
+    completions: set[date],
+    absences: set[date],
+) -> HabitAnalyticsResponse:
+    """Compute every analytic for a range in a single pass over its days.
+
+    Follows the streak and rate rules of ``StatsService``: an absence day is
+    not applicable, so it is left out of a rate's denominator and neither
+    breaks a streak nor ends a gap. A day that has both a completion and an
+    absence is still not applicable, but its completion counts, as in
+    ``completion_percentage``, and it extends a streak. Days before the
+    habit was created are never applicable, so rolling windows near the
+    creation date are shorter.
+
+    ``completions`` and ``absences`` must cover the 29 days before
+    ``start_date`` as well, so that the first rolling rates are complete.
+    """
+    start_date = max(start_date, created_date)
+    window_start = max(created_date, start_date - timedelta(days=MONTH_DAYS - 1))
+
+    completed_flags: list[bool] = []
+    applicable_flags: list[bool] = []
+    week_done = week_applicable = month_done = month_applicable = 0
+
+    total_done = total_applicable = 0
+    weekday_done = [0] * 7
+    weekday_applicable = [0] * 7
+    heatmap: list[HeatmapYear] = []
+    rolling: list[RollingRate] = []
+    streak_counts: dict[int, int] = {}
+    streak = gap = longest_gap = 0
+
+    day = window_start
+    index = 0
+    while day <= end_date:
+        completed = day in completions
+        applicable = day not in absences
+        completed_flags.append(completed)
+        applicable_flags.append(applicable)
+
+        # Slide the trailing windows forward by one day
+        week_done += completed
+        week_applicable += applicable
+        month_done += completed
+        month_applicable += applicable
+        if index >= WEEK_DAYS:
+            week_done -= completed_flags[index - WEEK_DAYS]
+            week_applicable -= applicable_flags[index - WEEK_DAYS]
+        if index >= MONTH_DAYS:
+            month_done -= completed_flags[index - MONTH_DAYS]
+            month_applicable -= applicable_flags[index - MONTH_DAYS]
+
+        if day >= start_date:
+            rolling.append(
+                RollingRate(
+                    date=day,
+                    week=_rate(week_done, week_applicable),
+                    month=_rate(month_done, month_applicable),
+                )
+            )
+
+            if not heatmap or heatmap[-1].year != day.year:
+                heatmap.append(HeatmapYear(year=day.year, start=day, days=[]))
+            heatmap[-1].days.append(1 if completed else 0 if applicable else -1)
+
+            if applicable:
+                total_applicable += 1
+                weekday_applicable[day.weekday()] += 1
+            if completed:
+                total_done += 1
+                weekday_done[day.weekday()] += 1
+                streak += 1
+                gap = 0
+            elif applicable:
+                if streak:
+                    streak_counts[streak] = streak_counts.get(streak, 0) + 1
+                streak = 0
+                gap += 1
+                longest_gap = max(longest_gap, gap)
+
+        day += timedelta(days=1)
+        index += 1
+
+    if streak:
+        streak_counts[streak] = streak_counts.get(streak, 0) + 1
+
+    return HabitAnalyticsResponse(
+        habit_id=habit_id,
+        start_date=start_date,
+        end_date=end_date,
+        completed=total_done,
+        applicable=total_applicable,
+        rate=_rate(total_done, total_applicable) or 0.0,
+        weekdays=[
+            WeekdayStat(
+                weekday=weekday,
+                completed=weekday_done[weekday],
+                applicable=weekday_applicable[weekday],
+                rate=_rate(weekday_done[weekday], weekday_applicable[weekday]) or 0.0,
+            )
+            for weekday in range(7)
+        ],
+        heatmap=heatmap,
+        rolling=rolling,
+        longest_gap=longest_gap,
+        streaks=[
+            StreakBucket(length=length, count=count)
+            for length, count in sorted(streak_counts.items())
+        ],
+    )
+
+
+class AnalyticsService:
+    """Service for per-habit analytics."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize service with database session."""
+        self.session = session
+
+    async def get_habit_analytics(
+        self,
+        habit_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> HabitAnalyticsResponse | None:
+        """Get analytics for a habit between optional bounds.
+
+        Defaults to the habit's whole life, from creation to today, or its
+        last ``MAX_ANALYTICS_DAYS`` days. The end is clamped to today, since
+        later days have no history. Returns None if the habit doesn't exist.
+        """
+        habits = HabitService(self.session)
+        habit = await habits.get_habit(habit_id)
+        if not habit:
+            return None
+
+        created_date = habit.created_at.date()
+        today = date.today()
+        end_date = min(end_date, today) if end_date else today
+        if start_date is None:
+            if (end_date - created_date).days < MAX_ANALYTICS_DAYS:
+                start_date = created_date
+            else:
+                start_date = end_date - timedelta(days=MAX_ANALYTICS_DAYS - 1)
+        # Days before creation are never applicable, and stepping back from
+        # the creation date rather than any requested start cannot underflow
+        start_date = max(start_date, created_date)
+        history_start = max(created_date, start_date - timedelta(days=MONTH_DAYS - 1))
+
+        completions = await habits.get_completions(habit_id, history_start, end_date)
+        absences = await habits.get_absences(habit_id, history_start, end_date)
+        return await compute_pool.run(
+            compute_analytics,
+            habit_id,
+            start_date,
+            end_date,
+            created_date,
+            set(completions),
+            {absence_date for absence_date, _ in absences},
+            size=(end_date - history_start).days,
+        )
@@ -0,0 +1,392 @@
+"""Archival of old completion and absence history.
+
+With ``archive_enabled`` a background job moves rows dated before the
+archive cutoff (the start of the year ``archive_horizon_days`` ago) out of
+``completions`` and ``absences`` into one ``habit_archives`` row per
+habit-year. Completions are stored as a compressed day-of-year bitmap and
+absences as compressed JSON, with per-year counts kept alongside.
+
+Each archived habit has a ``habit_archive_summaries`` row recording the
+boundary and best/trailing streak checkpoints, so streaks can be computed
+from hot rows alone. History reads only touch the archive when the
+requested range starts before the boundary, and writes to archived dates
+edit the archive in place, so the archived and hot tables never overlap.
+
+Archival is not used with ``completion_storage = "runs"``, where history
+is already compact.
+"""
+
+import json
+import zlib
+from collections import defaultdict
+from datetime import date, timedelta
+
+import structlog
+from sqlalchemy import delete, select, union
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.models.habit_archive import HabitArchive, HabitArchiveSummary
+from app.services import completion_runs, statements
+from app.services.changes import record_change
+
+logger = structlog.get_logger()
+
+ONE_DAY = timedelta(days=1)
+# One bit per day of the year, including 31 December of leap years
+BITMAP_BYTES = 46
+
+
+def archive_enabled() -> bool:
+    """Return True if old history is archived and read through."""
+    return settings.archive_enabled and not completion_runs.runs_enabled()
+
+
+def archive_cutoff(today: date, horizon_days: int) -> date:
+    """Return the first day that stays hot: 1 January of the horizon's year."""
+    return date((today - timedelta(days=horizon_days)).year, 1, 1)
+
+
+def encode_days(year: int, days: set[date]) -> bytes:
+    """Encode the year's days as a compressed bitmap."""
+    bitmap = bytearray(BITMAP_BYTES)
+    for day in days:
+        if day.year == year:
+            index = day.timetuple().tm_yday - 1
+            bitmap[index // 8] |= 1 << (index % 8)
+    return zlib.compress(bytes(bitmap), 9)
+
+
+def decode_days(year: int, blob: bytes) -> set[date]:
+    """Decode a compressed bitmap into the days it contains."""
+    bitmap = zlib.decompress(blob)
+    first = date(year, 1, 1)
+    return {
+        first + timedelta(days=byte_index * 8 + bit)
+        for byte_index, byte in enumerate(bitmap)
+        if byte
+        for bit in range(8)
+        if byte & (1 << bit)
+    }
+
+
+def encode_absences(year: int, absences: dict[date, str | None]) -> bytes:
+    """Encode the year's absences and reasons as compressed JSON."""
+    items = sorted(
+        (day.timetuple().tm_yday, reason)
+        for day, reason in absences.items()
+        if day.year == year
+    )
+    return zlib.compress(json.dumps(items, separators=(",", ":")).encode(), 9)
+
+
+def decode_absences(year: int, blob: bytes) -> dict[date, str | None]:
+    """Decode compressed absences into a date -> reason mapping."""
+    first = date(year, 1, 1)
+    return {
+        first + timedelta(days=day_of_year - 1): reason
+        for day_of_year, reason in json.loads(zlib.decompress(blob))
+    }
+
+
+def streak_checkpoints(
+    completions: set[date], absences: set[date], until: date
+) -> tuple[int, int]:
+    """Return the best streak before ``until`` and the streak running into it.
+
+    Uses the same rules as ``StatsService.calculate_best_streak``.
+    """
+    if not completions:
+        return 0, 0
+    best = current = 0
+    day = min(completions)
+    while day < until:
+        if day in completions:
+            current += 1
+            best = max(best, current)
+        elif day not in absences:
+            current = 0
+        day += ONE_DAY
+    return best, current
+
+
+async def get_summary(
+    session: AsyncSession, habit_id: str
+) -> HabitArchiveSummary | None:
+    """Return the habit's archive summary, or None if nothing is archived."""
+    if not archive_enabled():
+        return None
+    return await session.get(HabitArchiveSummary, habit_id)
+
+
+def archived_part(
+    summary: HabitArchiveSummary | None,
+    start_date: date | None,
+    end_date: date | None,
+) -> tuple[date | None, date] | None:
+    """Return the part of a range that lies in the archive, if any."""
+    if summary is None:
+        return None
+    if start_date is not None and start_date >= summary.archived_until:
+        return None
+    last = summary.archived_until - ONE_DAY
+    if end_date is not None:
+        last = min(last, end_date)
+    if start_date is not None and start_date > last:
+        return None
+    return start_date, last
+
+
+async def _load_archives(
+    session: AsyncSession, habit_id: str, start_date: date | None, end_date: date
+) -> list[HabitArchive]:
+    """Return the habit's archive rows for the years a range touches."""
+    query = select(HabitArchive).where(
+        HabitArchive.habit_id == habit_id, HabitArchive.year <= end_date.year
+    )
+    if start_date is not None:
+        query = query.where(HabitArchive.year >= start_date.year)
+    result = await session.execute(query.order_by(HabitArchive.year))
+    return list(result.scalars().all())
+
+
+def _in_range(day: date, start_date: date | None, end_date: date) -> bool:
+    """Return True if a day falls within an optionally open-started range."""
+    return (start_date is None or day >= start_date) and day <= end_date
+
+
+async def read_completions(
+    session: AsyncSession, habit_id: str, start_date: date | None, end_date: date
+) -> list[date]:
+    """Return archived completion dates in a range, in order."""
+    days: list[date] = []
+    for archive in await _load_archives(session, habit_id, start_date, end_date):
+        days.extend(
+            day
+            for day in sorted(decode_days(archive.year, archive.completions))
+            if _in_range(day, start_date, end_date)
+        )
+    return days
+
+
+async def read_absences(
+    session: AsyncSession, habit_id: str, start_date: date | None, end_date: date
+) -> list[tuple[date, str | None]]:
+    """Return archived absences and reasons in a range, in order."""
+    items: list[tuple[date, str | None]] = []
+    for archive in await _load_archives(session, habit_id, start_date, end_date):
+        absences = decode_absences(archive.year, archive.absences)
+        items.extend(
+            (day, absences[day])
+            for day in sorted(absences)
+            if _in_range(day, start_date, end_date)
+        )
+    return items
+
+
+async def count_days(
+    session: AsyncSession, habit_id: str, start_date: date | None, end_date: date
+) -> tuple[int, int]:
+    """Count archived completions and absences in a range.
+
+    Whole years use the stored counts; only partial years are decoded.
+    """
+    completed = absent = 0
+    for archive in await _load_archives(session, habit_id, start_date, end_date):
+        whole_year = (
+            start_date is None or start_date <= date(archive.year, 1, 1)
+        ) and (end_date >= date(archive.year, 12, 31))
+        if whole_year:
+            completed += archive.completion_count
+            absent += archive.absence_count
+            continue
+        completed += sum(
+            _in_range(day, start_date, end_date)
+            for day in decode_days(archive.year, archive.completions)
+        )
+        absent += sum(
+            _in_range(day, start_date, end_date)
+            for day in decode_absences(archive.year, archive.absences)
+        )
+    return completed, absent
+
+
+async def covers(session: AsyncSession, habit_id: str, day: date) -> bool:
+    """Return True if writes for this day belong in the archive."""
+    summary = await get_summary(session, habit_id)
+    return summary is not None and day < summary.archived_until
+
+
+async def _archive_for(session: AsyncSession, habit_id: str, year: int) -> HabitArchive:
+    """Return the habit-year archive row, creating an empty one if needed."""
+    archive = await session.get(HabitArchive, (habit_id, year))
+    if archive is None:
+        archive = HabitArchive(
+            habit_id=habit_id,
+            year=year,
+            completions=encode_days(year, set()),
+            absences=encode_absences(year, {}),
+            completion_count=0,
+            absence_count=0,
+        )
+        session.add(archive)
+    return archive
+
+
+async def set_completed(
+    session: AsyncSession, habit_id: str, day: date, completed: bool
+) -> bool:
+    """Add or remove an archived completion; return False if unchanged."""
+    archive = await _archive_for(session, habit_id, day.year)
+    days = decode_days(day.year, archive.completions)
+    if (day in days) == completed:
+        return False
+    if completed:
+        days.add(day)
+    else:
+        days.discard(day)
+    archive.completions = encode_days(day.year, days)
+    archive.completion_count = len(days)
+    await refresh_summary(session, habit_id)
+    return True
+
+
+async def add_absence(
+    session: AsyncSession, habit_id: str, day: date, reason: str | None
+) -> tuple[str | None, bool]:
+    """Add an archived absence; return its stored reason and whether it is new."""
+    archive = await _archive_for(session, habit_id, day.year)
+    absences = decode_absences(day.year, archive.absences)
+    if day in absences:
+        return absences[day], False
+    absences[day] = reason
+    archive.absences = encode_absences(day.year, absences)
+    archive.absence_count = len(absences)
+    await refresh_summary(session, habit_id)
+    return reason, True
+
+
+async def remove_absence(session: AsyncSession, habit_id: str, day: date) -> bool:
+    """Remove an archived absence; return False if there was none."""
+    archive = await _archive_for(session, habit_id, day.year)
+    absences = decode_absences(day.year, archive.absences)
+    if day not in absences:
+        return False
+    del absences[day]
+    archive.absences = encode_absences(day.year, absences)
+    archive.absence_count = len(absences)
+    await refresh_summary(session, habit_id)
+    return True
+
+
+async def refresh_summary(
+    session: AsyncSession, habit_id: str, archived_until: date | None = None
+) -> None:
+    """Recompute the habit's streak checkpoints, optionally moving the boundary."""
+    summary = await session.get(HabitArchiveSummary, habit_id)
+    if summary is None:
+        assert archived_until is not None
+        summary = HabitArchiveSummary(habit_id=habit_id, archived_until=archived_until)
+        session.add(summary)
+    elif archived_until is not None:
+        summary.archived_until = archived_until
+
+    completions: set[date] = set()
+    absences: set[date] = set()
+    archives = await session.execute(
+        select(HabitArchive).where(HabitArchive.habit_id == habit_id)
+    )
+    for archive in archives.scalars():
+        completions |= decode_days(archive.year, archive.completions)
+        absences |= set(decode_absences(archive.year, archive.absences))
+    summary.best_streak, summary.trailing_streak = streak_checkpoints(
+        completions, absences, summary.archived_until
+    )
+
+
+async def archive_habit(session: AsyncSession, habit_id: str, cutoff: date) -> int:
+    """Move a habit's hot rows dated before ``cutoff`` into its archive.
+
+    Returns the number of rows moved. The caller commits, then calls
+    ``record_change`` for the habit.
+    """
+    habit_pk = await statements.habit_pk(session, habit_id)
+    completed = await session.execute(
+        select(Completion.completed_date).where(
+            Completion.habit_pk == habit_pk, Completion.completed_date < cutoff
+        )
+    )
+    absent = await session.execute(
+        select(Absence.absence_date, Absence.reason).where(
+            Absence.habit_pk == habit_pk, Absence.absence_date < cutoff
+        )
+    )
+    completions_by_year: defaultdict[int, set[date]] = defaultdict(set)
+    absences_by_year: defaultdict[int, dict[date, str | None]] = defaultdict(dict)
+    moved = 0
+    for (day,) in completed.all():
+        completions_by_year[day.year].add(day)
+        moved += 1
+    for day, reason in absent.all():
+        absences_by_year[day.year][day] = reason
+        moved += 1
+
+    for year in completions_by_year.keys() | absences_by_year.keys():
+        archive = await _archive_for(session, habit_id, year)
+        days = decode_days(year, archive.completions) | completions_by_year[year]
+        absences = decode_absences(year, archive.absences) | absences_by_year[year]
+        archive.completions = encode_days(year, days)
+        archive.absences = encode_absences(year, absences)
+        archive.completion_count = len(days)
+        archive.absence_count = len(absences)
+
+    await session.execute(
+        delete(Completion).where(
+            Completion.habit_pk == habit_pk, Completion.completed_date < cutoff
+        )
+    )
+    await session.execute(
+        delete(Absence).where(
+            Absence.habit_pk == habit_pk, Absence.absence_date < cutoff
+        )
+    )
+    await refresh_summary(session, habit_id, archived_until=cutoff)
+    return moved
+
+
+async def archive_history(
+    session_factory: async_sessionmaker[AsyncSession], today: date | None = None
+) -> int:
+    """Archive every habit's rows older than the cutoff, one habit per transaction.
+
+    Returns the number of rows moved.
+    """
+    if not archive_enabled():
+        return 0
+    cutoff = archive_cutoff(today or date.today(), settings.archive_horizon_days)
+    async with session_factory() as session:
+        result = await session.execute(
+            union(
+                select(Habit.id)
+                .join(Completion, Completion.habit_pk == Habit.pk)
+                .where(Completion.completed_date < cutoff),
+                select(Habit.id)
+                .join(Absence, Absence.habit_pk == Habit.pk)
+                .where(Absence.absence_date < cutoff),
+            )
+        )
+        habit_ids = list(result.scalars().all())
+
+    moved = 0
+    for habit_id in habit_ids:
+        async with session_factory() as session:
+            moved += await archive_habit(session, habit_id, cutoff)
+            await session.commit()
+        record_change(habit_id)
+    logger.info(
+        "history_archived", habits=len(habit_ids), rows=moved, cutoff=str(cutoff)
+    )
+    return moved
@@ -0,0 +1,36 @@
+"""Invalidation of in-memory state after committed changes to habit data.
+
+Every path that commits a change to a habit or its history, including
+background rewrites such as archival and purging, calls ``record_change``
+once the transaction has committed. The in-memory state it invalidates
+lives in the process that calls it, so command line tools that rewrite
+history in their own process leave a running server's caches stale; the
+server must be restarted after running them.
+"""
+
+from datetime import date
+
+from app.core.cache import data_versions, response_cache
+from app.core.rate_index import rate_index
+from app.core.streak_index import streak_index
+from app.core.tenancy import current_tenant
+
+# Event recorded for bulk rewrites, which drop the habit's index entries
+HISTORY_REWRITTEN = "history.rewritten"
+
+
+def record_change(
+    habit_id: str, event_type: str = HISTORY_REWRITTEN, day: date | None = None
+) -> int:
+    """Advance a habit's data version and invalidate what derives from it.
+
+    Cached responses are dropped. Indexed rate counts and streak trees are
+    updated in place for single-day events and dropped after rewrites.
+    Returns the new version.
+    """
+    tenant_id = current_tenant.get()
+    version = data_versions.bump(habit_id)
+    response_cache.invalidate(habit_id)
+    rate_index.record(tenant_id, habit_id, version, event_type, day)
+    streak_index.record(tenant_id, habit_id, version, event_type, day)
+    return version
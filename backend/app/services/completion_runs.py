@@ -0,0 +1,226 @@
+"""Run-length completion storage.
+
+With ``completion_storage = "runs"`` each habit's completed days are kept as
+non-overlapping ``(start_date, end_date)`` runs. Completing a day extends or
+joins the neighbouring runs and undoing a day shrinks or splits the run that
+contains it. These helpers only stage changes on the session; the caller
+commits, so every split or merge is applied in one transaction. Each one
+takes the database write lock before reading the runs it changes, so two
+concurrent changes to the same days are applied one after the other.
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.completion import Completion, utc_now
+from app.models.completion_run import CompletionRun
+from app.models.habit import Habit
+
+ONE_DAY = timedelta(days=1)
+
+
+def runs_enabled() -> bool:
+    """Return True if completions are stored as runs."""
+    return settings.completion_storage == "runs"
+
+
+async def _lock_runs(session: AsyncSession, habit_id: str) -> None:
+    """Take the write lock before the habit's runs are read.
+
+    SQLite only begins a transaction at its first write, so runs read
+    before it could be changed by another session's commit before this one
+    writes, leaving a day in two overlapping runs. A no-op write to the
+    habit row waits for the lock, and the runs read afterwards cannot
+    change until this transaction ends.
+
+    This is what ``BEGIN IMMEDIATE`` would do, but only for the sessions
+    that edit runs; beginning every transaction that way would also make
+    read-only requests queue for the write lock.
+    """
+    await session.execute(
+        update(Habit)
+        .where(Habit.id == habit_id)
+        .values(updated_at=Habit.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _runs_touching(
+    session: AsyncSession, habit_id: str, day: date
+) -> list[CompletionRun]:
+    """Return runs containing ``day`` or ending/starting right next to it."""
+    result = await session.execute(
+        select(CompletionRun).where(
+            CompletionRun.habit_id == habit_id,
+            CompletionRun.start_date <= day + ONE_DAY,
+            CompletionRun.end_date >= day - ONE_DAY,
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def add_day(session: AsyncSession, habit_id: str, day: date) -> bool:
+    """Mark a day completed; return False if it already was."""
+    await _lock_runs(session, habit_id)
+    before = after = None
+    for run in await _runs_touching(session, habit_id, day):
+        if run.start_date <= day <= run.end_date:
+            return False
+        if run.end_date == day - ONE_DAY:
+            before = run
+        elif run.start_date == day + ONE_DAY:
+            after = run
+
+    if before is not None and after is not None:
+        before.end_date = after.end_date
+        await session.delete(after)
+    elif before is not None:
+        before.end_date = day
+    elif after is not None:
+        after.start_date = day
+    else:
+        session.add(CompletionRun(habit_id=habit_id, start_date=day, end_date=day))
+    return True
+
+
+async def remove_day(session: AsyncSession, habit_id: str, day: date) -> bool:
+    """Mark a day not completed; return False if it was not completed."""
+    await _lock_runs(session, habit_id)
+    result = await session.execute(
+        select(CompletionRun).where(
+            CompletionRun.habit_id == habit_id,
+            CompletionRun.start_date <= day,
+            CompletionRun.end_date >= day,
+        )
+    )
+    run = result.scalar_one_or_none()
+    if run is None:
+        return False
+
+    if run.start_date == run.end_date:
+        await session.delete(run)
+    elif day == run.start_date:
+        run.start_date = day + ONE_DAY
+    elif day == run.end_date:
+        run.end_date = day - ONE_DAY
+    else:
+        session.add(
+            CompletionRun(
+                habit_id=habit_id, start_date=day + ONE_DAY, end_date=run.end_date
+            )
+        )
+        run.end_date = day - ONE_DAY
+    return True
+
+
+async def get_runs(
+    session: AsyncSession,
+    habit_id: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[tuple[date, date]]:
+    """Return runs overlapping the range, clipped to it, in date order."""
+    query = select(CompletionRun.start_date, CompletionRun.end_date).where(
+        CompletionRun.habit_id == habit_id
+    )
+    if start_date:
+        query = query.where(CompletionRun.end_date >= start_date)
+    if end_date:
+        query = query.where(CompletionRun.start_date <= end_date)
+    result = await session.execute(query.order_by(CompletionRun.start_date))
+    return [
+        (
+            max(start, start_date) if start_date else start,
+            min(end, end_date) if end_date else end,
+        )
+        for start, end in result.all()
+    ]
+
+
+def expand_runs(runs: list[tuple[date, date]]) -> list[date]:
+    """Return every day covered by the runs, in order."""
+    days = []
+    for start, end in runs:
+        day = start
+        while day <= end:
+            days.append(day)
+            day += ONE_DAY
+    return days
+
+
+def count_days(runs: list[tuple[date, date]]) -> int:
+    """Return the number of days covered by the runs."""
+    return sum((end - start).days + 1 for start, end in runs)
+
+
+async def is_completed(session: AsyncSession, habit_id: str, day: date) -> bool:
+    """Return True if a run covers the day."""
+    return bool(await get_runs(session, habit_id, day, day))
+
+
+async def convert_rows_to_runs(session: AsyncSession) -> int:
+    """Rebuild all runs from per-day completion rows; return the run count.
+
+    The completion rows are removed. The caller commits, then calls
+    ``record_change`` for every habit, or restarts the server.
+    """
+    result = await session.execute(
+        select(Habit.id, Completion.completed_date)
+        .join_from(Completion, Habit)
+        .order_by(Habit.id, Completion.completed_date)
+    )
+    runs: list[dict[str, object]] = []
+    current: dict[str, object] | None = None
+    for habit_id, day in result.all():
+        if (
+            current is not None
+            and current["habit_id"] == habit_id
+            and current["end_date"] == day - ONE_DAY
+        ):
+            current["end_date"] = day
+            continue
+        current = {"habit_id": habit_id, "start_date": day, "end_date": day}
+        runs.append(current)
+
+    await session.execute(delete(CompletionRun))
+    if runs:
+        await session.execute(insert(CompletionRun), runs)
+    await session.execute(delete(Completion))
+    return len(runs)
+
+
+async def convert_runs_to_rows(session: AsyncSession, batch_size: int = 5000) -> int:
+    """Expand all runs back into per-day completion rows; return the row count.
+
+    The runs are removed. The caller commits, then calls
+    ``record_change`` for every habit, or restarts the server.
+    """
+    await session.execute(delete(Completion))
+    result = await session.execute(
+        select(Habit.pk, CompletionRun.start_date, CompletionRun.end_date).join_from(
+            CompletionRun, Habit
+        )
+    )
+    total = 0
+    batch: list[dict[str, object]] = []
+    for habit_pk, start, end in result.all():
+        for day in expand_runs([(start, end)]):
+            batch.append(
+                {
+                    "habit_pk": habit_pk,
+                    "completed_date": day,
+                    "created_at": utc_now(),
+                }
+            )
+        if len(batch) >= batch_size:
+            await session.execute(insert(Completion), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Completion), batch)
+        total += len(batch)
+    await session.execute(delete(CompletionRun))
+    return total
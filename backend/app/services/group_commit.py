@@ -0,0 +1,164 @@
+"""Group commit: coalesce concurrent writes into shared transactions."""
+
+import asyncio
+import contextlib
+import contextvars
+import weakref
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+WriteOp = Callable[[AsyncSession], Awaitable[T]]
+
+
+@dataclass(slots=True)
+class _PendingWrite:
+    """A queued write, its commit hook, and the future its caller awaits.
+
+    ``context`` is the caller's context, in which the hook runs.
+    """
+
+    op: WriteOp[Any]
+    future: asyncio.Future[Any]
+    on_commit: Callable[[Any], object] | None
+    context: contextvars.Context
+
+
+@dataclass(slots=True)
+class GroupCommitStats:
+    """Counters describing how writes were batched."""
+
+    batches: int = 0
+    writes: int = 0
+    fallbacks: int = 0
+
+
+class GroupCommitter:
+    """Runs queued write operations together in one transaction.
+
+    Writes are collected for up to ``window`` seconds, or until ``max_batch``
+    are queued, then applied in order on a single session and committed once,
+    so the whole batch pays for one flush and one fsync. If any operation or
+    the commit fails, the batch is rolled back and each operation is retried
+    in its own transaction, so callers always get their own result or error.
+
+    A write's ``on_commit`` hook runs as soon as its transaction commits, in
+    the committer's task, so it runs even if the caller was cancelled while
+    waiting for the result.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        window: float = 0.005,
+        max_batch: int = 64,
+    ) -> None:
+        """Initialize committer with batching limits."""
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.stats = GroupCommitStats()
+        self._pending: list[_PendingWrite] = []
+        self._batch_full = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+
+    async def submit(
+        self, op: WriteOp[T], on_commit: Callable[[T], object] | None = None
+    ) -> T:
+        """Queue a write and wait for its individual result.
+
+        ``on_commit`` is called with the result once the write has committed.
+        """
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._pending.append(
+            _PendingWrite(op, future, on_commit, contextvars.copy_context())
+        )
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return await future
+
+    async def _flush_loop(self) -> None:
+        """Flush batches until the queue is empty."""
+        while self._pending:
+            if len(self._pending) < self.max_batch:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._batch_full.wait(), self.window)
+            self._batch_full.clear()
+            batch = self._pending[: self.max_batch]
+            self._pending = self._pending[self.max_batch :]
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_PendingWrite]) -> None:
+        """Apply a batch in one transaction, falling back to one-by-one."""
+        self.stats.batches += 1
+        self.stats.writes += len(batch)
+        results: list[Any] = []
+        try:
+            async with self.session_factory() as session:
+                for item in batch:
+                    results.append(await item.op(session))
+                await session.commit()
+        except Exception:
+            self.stats.fallbacks += 1
+            logger.warning("group_commit_fallback", batch_size=len(batch))
+            for item in batch:
+                await self._run_alone(item)
+            return
+
+        for item, result in zip(batch, results, strict=True):
+            self._committed(item, result)
+
+    async def _run_alone(self, item: _PendingWrite) -> None:
+        """Apply a single write in its own transaction."""
+        try:
+            async with self.session_factory() as session:
+                result = await item.op(session)
+                await session.commit()
+        except Exception as exc:
+            if not item.future.done():
+                item.future.set_exception(exc)
+        else:
+            self._committed(item, result)
+
+    def _committed(self, item: _PendingWrite, result: Any) -> None:
+        """Run a committed write's hook and hand the result to its caller."""
+        if item.on_commit is not None:
+            try:
+                item.context.run(item.on_commit, result)
+            except Exception:
+                logger.exception("group_commit_hook_failed")
+        if not item.future.done():
+            item.future.set_result(result)
+
+
+_committers: weakref.WeakKeyDictionary[AsyncEngine, GroupCommitter] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def group_committer_for(session: AsyncSession) -> GroupCommitter | None:
+    """Return the committer for the session's database, if group commit is on."""
+    if not settings.group_commit_enabled:
+        return None
+    engine = session.bind
+    assert isinstance(engine, AsyncEngine)
+    committer = _committers.get(engine)
+    if committer is None:
+        committer = GroupCommitter(
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+            window=settings.group_commit_window_ms / 1000,
+            max_batch=settings.group_commit_max_batch,
+        )
+        _committers[engine] = committer
+    return committer
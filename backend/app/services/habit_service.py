@@ -1,6 +1,5 @@
 """Habit, Completion, and Absence service layer."""
 
-import uuid
 from datetime import date
 
 import structlog
@@ -8,14 +7,76 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.events import event_broker
+from app.core.tenancy import current_tenant
 from app.models.absence import Absence
 from app.models.completion import Completion
 from app.models.habit import Habit
+from app.models.habit_purge import HabitPurge
 from app.schemas.habit import HabitCreate, HabitUpdate
+from app.services import archive, completion_runs, rollups, statements
+from app.services.changes import record_change
+from app.services.group_commit import group_committer_for
+from app.services.purge import is_live
 
 logger = structlog.get_logger()
 
 
+async def _add_completion(
+    session: AsyncSession, habit_id: str, completion_date: date
+) -> tuple[Completion, bool]:
+    """Add a completion unless one exists; return it and whether it is new."""
+    if completion_runs.runs_enabled():
+        created = await completion_runs.add_day(session, habit_id, completion_date)
+        if created:
+            await rollups.adjust(session, habit_id, completion_date, completions=1)
+        return Completion(completed_date=completion_date), created
+
+    if await archive.covers(session, habit_id, completion_date):
+        created = await archive.set_completed(session, habit_id, completion_date, True)
+        if created:
+            await rollups.adjust(session, habit_id, completion_date, completions=1)
+        return Completion(completed_date=completion_date), created
+
+    # Pending inserts are left for the batch commit; a duplicate within one
+    # batch fails that commit and is resolved by the one-by-one retry
+    habit_pk = await statements.habit_pk(session, habit_id)
+    with session.no_autoflush:
+        result = await session.execute(
+            statements.COMPLETION_ON, {"habit_pk": habit_pk, "day": completion_date}
+        )
+    existing = result.scalar_one_or_none()
+    if existing:
+        return existing, False
+    completion = Completion(habit_pk=habit_pk, completed_date=completion_date)
+    session.add(completion)
+    await rollups.adjust(session, habit_id, completion_date, completions=1)
+    return completion, True
+
+
+async def _remove_completion(
+    session: AsyncSession, habit_id: str, completion_date: date
+) -> bool:
+    """Delete a completion if present; return whether one was deleted."""
+    if completion_runs.runs_enabled():
+        if not await completion_runs.remove_day(session, habit_id, completion_date):
+            return False
+    elif await archive.covers(session, habit_id, completion_date):
+        if not await archive.set_completed(session, habit_id, completion_date, False):
+            return False
+    else:
+        habit_pk = await statements.habit_pk(session, habit_id)
+        result = await session.execute(
+            statements.COMPLETION_ON, {"habit_pk": habit_pk, "day": completion_date}
+        )
+        completion = result.scalar_one_or_none()
+        if not completion:
+            return False
+        await session.delete(completion)
+    await rollups.adjust(session, habit_id, completion_date, completions=-1)
+    return True
+
+
 class HabitService:
     """Service for Habit, Completion, and Absence CRUD operations."""
 
@@ -23,6 +84,18 @@ class HabitService:
         """Initialize service with database session."""
         self.session = session
 
+    def _record_change(
+        self, event_type: str, habit_id: str, day: date | None = None
+    ) -> None:
+        """Advance the habit's data version and publish a committed change.
+
+        Indexed rate counts and streak trees are updated in place rather
+        than rebuilt.
+        """
+        tenant_id = current_tenant.get()
+        version = record_change(habit_id, event_type, day)
+        event_broker.publish(event_type, tenant_id, habit_id, version, day)
+
     async def create_habit(self, habit_data: HabitCreate) -> Habit:
         """Create a new habit."""
         habit = Habit(
@@ -32,17 +105,28 @@ class HabitService:
         self.session.add(habit)
         await self.session.commit()
         await self.session.refresh(habit)
+        self._record_change("habit.created", habit.id)
         logger.info("habit_created", habit_id=habit.id, name=habit.name)
         return habit
 
     async def get_habit(self, habit_id: str) -> Habit | None:
         """Get a habit by ID."""
-        result = await self.session.execute(select(Habit).where(Habit.id == habit_id))
+        result = await self.session.execute(
+            statements.LIVE_HABIT, {"habit_id": habit_id}
+        )
         return result.scalar_one_or_none()
 
+    async def habit_exists(self, habit_id: str) -> bool:
+        """Return True if a live habit exists.
+
+        Answered by the habit's key lookup, which the request's history
+        queries then reuse, so the check costs no query of its own.
+        """
+        return await statements.habit_pk(self.session, habit_id) is not None
+
     async def get_all_habits(self) -> list[Habit]:
         """Get all habits."""
-        result = await self.session.execute(select(Habit))
+        result = await self.session.execute(select(Habit).where(is_live()))
         return list(result.scalars().all())
 
     async def update_habit(
@@ -60,17 +144,28 @@ class HabitService:
 
         await self.session.commit()
         await self.session.refresh(habit)
+        self._record_change("habit.updated", habit.id)
         logger.info("habit_updated", habit_id=habit.id)
         return habit
 
-    async def delete_habit(self, habit_id: str) -> bool:
-        """Delete a habit by ID."""
+    async def delete_habit(self, habit_id: str, soft: bool = False) -> bool:
+        """Delete a habit by ID.
+
+        History is removed by the database's cascade or, with ``soft``, later
+        by the purge job, which runs when the application that owns the
+        database enables ``soft_delete_habits``.
+        """
         habit = await self.get_habit(habit_id)
         if not habit:
             return False
 
-        await self.session.delete(habit)
+        if soft:
+            self.session.add(HabitPurge(habit_id=habit_id))
+        else:
+            await self.session.delete(habit)
         await self.session.commit()
+        statements.forget_habit_pk(self.session, habit_id)
+        self._record_change("habit.deleted", habit_id)
         logger.info("habit_deleted", habit_id=habit_id)
         return True
 
@@ -84,64 +179,104 @@ class HabitService:
         Returns existing completion if already completed (idempotent).
         Returns None if habit doesn't exist.
         """
-        habit = await self.get_habit(habit_id)
-        if not habit:
+        if not await self.habit_exists(habit_id):
             return None
 
         if completion_date is None:
             completion_date = date.today()
 
-        # Check for existing completion
-        existing = await self.get_completion(habit_id, completion_date)
-        if existing:
+        committer = group_committer_for(self.session)
+        try:
+            if committer is not None:
+                # End the read transaction so the batch writer is never blocked
+                await self.session.commit()
+                day = completion_date
+
+                def added(result: tuple[Completion, bool]) -> None:
+                    if result[1]:
+                        self._record_change("completion.added", habit_id, day)
+
+                # Recorded by the committer, even if this caller is cancelled
+                completion, created = await committer.submit(
+                    lambda session: _add_completion(session, habit_id, day),
+                    on_commit=added,
+                )
+            else:
+                completion, created = await _add_completion(
+                    self.session, habit_id, completion_date
+                )
+                await self.session.commit()
+                if created:
+                    self._record_change("completion.added", habit_id, completion_date)
+        except IntegrityError:
+            await self.session.rollback()
+            # Race condition - completion was added by another request
+            return await self.get_completion(habit_id, completion_date)
+
+        if not created:
             logger.info(
                 "completion_already_exists",
                 habit_id=habit_id,
                 date=str(completion_date),
             )
-            return existing
+            return completion
 
-        completion = Completion(
-            id=str(uuid.uuid4()),
+        logger.info(
+            "habit_completed",
             habit_id=habit_id,
-            completed_date=completion_date,
+            date=str(completion_date),
         )
-
-        try:
-            self.session.add(completion)
-            await self.session.commit()
-            await self.session.refresh(completion)
-            logger.info(
-                "habit_completed",
-                habit_id=habit_id,
-                date=str(completion_date),
-            )
-            return completion
-        except IntegrityError:
-            await self.session.rollback()
-            # Race condition - completion was added by another request
-            return await self.get_completion(habit_id, completion_date)
+        return completion
 
     async def get_completion(
         self, habit_id: str, completion_date: date
     ) -> Completion | None:
         """Get a specific completion."""
-        result = await self.session.execute(
-            select(Completion).where(
-                Completion.habit_id == habit_id,
-                Completion.completed_date == completion_date,
+        if completion_runs.runs_enabled():
+            completed = await completion_runs.is_completed(
+                self.session, habit_id, completion_date
             )
+            if not completed:
+                return None
+            # Runs have no per-day row; return an unsaved stand-in
+            return Completion(completed_date=completion_date)
+
+        if await archive.covers(self.session, habit_id, completion_date):
+            archived = await archive.read_completions(
+                self.session, habit_id, completion_date, completion_date
+            )
+            if not archived:
+                return None
+            return Completion(completed_date=completion_date)
+
+        habit_pk = await statements.habit_pk(self.session, habit_id)
+        result = await self.session.execute(
+            statements.COMPLETION_ON, {"habit_pk": habit_pk, "day": completion_date}
         )
         return result.scalar_one_or_none()
 
     async def delete_completion(self, habit_id: str, completion_date: date) -> bool:
         """Delete a completion (undo)."""
-        completion = await self.get_completion(habit_id, completion_date)
-        if not completion:
+        committer = group_committer_for(self.session)
+        if committer is not None:
+            await self.session.commit()
+
+            def removed(result: bool) -> None:
+                if result:
+                    self._record_change("completion.removed", habit_id, completion_date)
+
+            deleted = await committer.submit(
+                lambda session: _remove_completion(session, habit_id, completion_date),
+                on_commit=removed,
+            )
+        else:
+            deleted = await _remove_completion(self.session, habit_id, completion_date)
+            await self.session.commit()
+            if deleted:
+                self._record_change("completion.removed", habit_id, completion_date)
+        if not deleted:
             return False
 
-        await self.session.delete(completion)
-        await self.session.commit()
         logger.info(
             "completion_deleted",
             habit_id=habit_id,
@@ -156,16 +291,26 @@ class HabitService:
         end_date: date | None = None,
     ) -> list[date]:
         """Get completion dates for a habit within a date range."""
-        query = select(Completion.completed_date).where(Completion.habit_id == habit_id)
-
-        if start_date:
-            query = query.where(Completion.completed_date >= start_date)
-        if end_date:
-            query = query.where(Completion.completed_date <= end_date)
+        if completion_runs.runs_enabled():
+            runs = await completion_runs.get_runs(
+                self.session, habit_id, start_date, end_date
+            )
+            return completion_runs.expand_runs(runs)
+
+        archived: list[date] = []
+        summary = await archive.get_summary(self.session, habit_id)
+        archived_range = archive.archived_part(summary, start_date, end_date)
+        if archived_range is not None:
+            archived = await archive.read_completions(
+                self.session, habit_id, *archived_range
+            )
 
-        query = query.order_by(Completion.completed_date)
-        result = await self.session.execute(query)
-        return list(result.scalars().all())
+        habit_pk = await statements.habit_pk(self.session, habit_id)
+        result = await self.session.execute(
+            statements.COMPLETION_DATES,
+            statements.date_range(habit_pk, start_date, end_date),
+        )
+        return archived + list(result.scalars().all())
 
     # Absence methods
 
@@ -180,13 +325,15 @@ class HabitService:
         Returns existing absence if already marked (idempotent).
         Returns None if habit doesn't exist.
         """
-        habit = await self.get_habit(habit_id)
-        if not habit:
+        if not await self.habit_exists(habit_id):
             return None
 
         if absence_date is None:
             absence_date = date.today()
 
+        if await archive.covers(self.session, habit_id, absence_date):
+            return await self._create_archived_absence(habit_id, absence_date, reason)
+
         # Check for existing absence
         existing = await self.get_absence(habit_id, absence_date)
         if existing:
@@ -198,16 +345,17 @@ class HabitService:
             return existing
 
         absence = Absence(
-            id=str(uuid.uuid4()),
-            habit_id=habit_id,
+            habit_pk=await statements.habit_pk(self.session, habit_id),
             absence_date=absence_date,
             reason=reason,
         )
 
         try:
             self.session.add(absence)
+            await rollups.adjust(self.session, habit_id, absence_date, absences=1)
             await self.session.commit()
             await self.session.refresh(absence)
+            self._record_change("absence.added", habit_id, absence_date)
             logger.info(
                 "absence_created",
                 habit_id=habit_id,
@@ -220,24 +368,63 @@ class HabitService:
             # Race condition - absence was added by another request
             return await self.get_absence(habit_id, absence_date)
 
+    async def _create_archived_absence(
+        self, habit_id: str, absence_date: date, reason: str | None
+    ) -> Absence:
+        """Mark an absence on a date that has already been archived."""
+        stored_reason, created = await archive.add_absence(
+            self.session, habit_id, absence_date, reason
+        )
+        if created:
+            await rollups.adjust(self.session, habit_id, absence_date, absences=1)
+        await self.session.commit()
+        if created:
+            self._record_change("absence.added", habit_id, absence_date)
+            logger.info(
+                "absence_created",
+                habit_id=habit_id,
+                date=str(absence_date),
+                reason=reason,
+            )
+        else:
+            logger.info(
+                "absence_already_exists",
+                habit_id=habit_id,
+                date=str(absence_date),
+            )
+        # Archived absences have no row; return an unsaved stand-in
+        return Absence(absence_date=absence_date, reason=stored_reason)
+
     async def get_absence(self, habit_id: str, absence_date: date) -> Absence | None:
         """Get a specific absence."""
-        result = await self.session.execute(
-            select(Absence).where(
-                Absence.habit_id == habit_id,
-                Absence.absence_date == absence_date,
+        if await archive.covers(self.session, habit_id, absence_date):
+            archived = await archive.read_absences(
+                self.session, habit_id, absence_date, absence_date
             )
+            if not archived:
+                return None
+            return Absence(absence_date=absence_date, reason=archived[0][1])
+
+        habit_pk = await statements.habit_pk(self.session, habit_id)
+        result = await self.session.execute(
+            statements.ABSENCE_ON, {"habit_pk": habit_pk, "day": absence_date}
         )
         return result.scalar_one_or_none()
 
     async def delete_absence(self, habit_id: str, absence_date: date) -> bool:
         """Delete an absence."""
-        absence = await self.get_absence(habit_id, absence_date)
-        if not absence:
-            return False
-
-        await self.session.delete(absence)
+        if await archive.covers(self.session, habit_id, absence_date):
+            if not await archive.remove_absence(self.session, habit_id, absence_date):
+                return False
+        else:
+            absence = await self.get_absence(habit_id, absence_date)
+            if not absence:
+                return False
+            await self.session.delete(absence)
+
+        await rollups.adjust(self.session, habit_id, absence_date, absences=-1)
         await self.session.commit()
+        self._record_change("absence.removed", habit_id, absence_date)
         logger.info(
             "absence_deleted",
             habit_id=habit_id,
@@ -252,15 +439,16 @@ class HabitService:
         end_date: date | None = None,
     ) -> list[tuple[date, str | None]]:
         """Get absences for a habit within a date range."""
-        query = select(Absence.absence_date, Absence.reason).where(
-            Absence.habit_id == habit_id
-        )
-
-        if start_date:
-            query = query.where(Absence.absence_date >= start_date)
-        if end_date:
-            query = query.where(Absence.absence_date <= end_date)
+        archived: list[tuple[date, str | None]] = []
+        summary = await archive.get_summary(self.session, habit_id)
+        archived_range = archive.archived_part(summary, start_date, end_date)
+        if archived_range is not None:
+            archived = await archive.read_absences(
+                self.session, habit_id, *archived_range
+            )
 
-        query = query.order_by(Absence.absence_date)
-        result = await self.session.execute(query)
-        return list(result.all())
+        habit_pk = await statements.habit_pk(self.session, habit_id)
+        result = await self.session.execute(
+            statements.ABSENCES, statements.date_range(habit_pk, start_date, end_date)
+        )
+        return archived + [(day, reason) for day, reason in result.all()]
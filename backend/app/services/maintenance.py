@@ -0,0 +1,168 @@
+"""Database maintenance jobs run by the background scheduler."""
+
+from collections.abc import Awaitable, Callable
+from functools import partial
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import Settings
+from app.core.scheduler import Scheduler
+from app.core.tenancy import TenantDatabase, TenantEngineCache, current_tenant
+from app.services.archive import archive_enabled, archive_history
+from app.services.purge import purge_deleted_habits
+from app.services.stats_service import StatsService
+
+logger = structlog.get_logger()
+
+
+async def checkpoint_wal(engine: AsyncEngine) -> None:
+    """Copy WAL frames into the database file and truncate the WAL."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        busy, wal_pages, checkpointed_pages = result.one()
+    logger.info(
+        "wal_checkpointed",
+        busy=bool(busy),
+        wal_pages=wal_pages,
+        checkpointed_pages=checkpointed_pages,
+    )
+
+
+async def optimize(engine: AsyncEngine) -> None:
+    """Refresh query planner statistics where SQLite thinks they are stale."""
+    async with engine.connect() as conn:
+        await conn.execute(text("PRAGMA optimize"))
+        await conn.commit()
+
+
+async def incremental_vacuum(engine: AsyncEngine, pages: int) -> None:
+    """Return up to ``pages`` free pages to the filesystem."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text("PRAGMA freelist_count"))
+        free_before = result.scalar_one()
+        await conn.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+        await conn.commit()
+        result = await conn.execute(text("PRAGMA freelist_count"))
+        free_after = result.scalar_one()
+    logger.info("incremental_vacuum", freed_pages=free_before - free_after)
+
+
+async def dispose_idle_tenants(
+    tenant_engines: TenantEngineCache, max_idle_seconds: float
+) -> None:
+    """Close tenant databases that have not served a request recently."""
+    disposed = await tenant_engines.dispose_idle(max_idle_seconds)
+    if disposed:
+        logger.info("idle_tenants_disposed", count=disposed, open=len(tenant_engines))
+
+
+async def refresh_daily_stats(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Load the history indexes of every habit ahead of the day's first reads.
+
+    Rates and streaks are read from the per-habit rate and streak indexes,
+    which stay valid across midnight, but entries evicted or dropped since
+    they were built would otherwise be reloaded from full history by the
+    first list request of the day. Does nothing when both indexes are
+    disabled.
+    """
+    async with session_factory() as session:
+        loaded = await StatsService(session).prime_history_indexes()
+    logger.info("history_indexes_primed", habits=loaded)
+
+
+def _for_each_database(
+    databases: Callable[[], list[TenantDatabase]],
+    job: Callable[[TenantDatabase], Awaitable[object]],
+) -> Callable[[], Awaitable[None]]:
+    """Wrap a per-database job so one run covers every open database.
+
+    Each job runs as its tenant, as a request for that tenant would, so
+    entries it loads into or invalidates in the in-memory caches are the
+    ones that tenant's requests use.
+    """
+
+    async def run() -> None:
+        for database in databases():
+            token = current_tenant.set(database.tenant_id)
+            try:
+                with structlog.contextvars.bound_contextvars(tenant=database.tenant_id):
+                    await job(database)
+            finally:
+                current_tenant.reset(token)
+
+    return run
+
+
+def build_maintenance_scheduler(
+    databases: Callable[[], list[TenantDatabase]],
+    settings: Settings,
+    tenant_engines: TenantEngineCache | None = None,
+) -> Scheduler:
+    """Create a scheduler with the standard maintenance jobs registered.
+
+    ``databases`` is called on every run, so tenant databases opened after
+    startup are maintained too. When ``tenant_engines`` is given, idle tenant
+    engines are disposed periodically.
+    """
+    scheduler = Scheduler()
+    jitter = settings.maintenance_jitter_seconds
+    pages = settings.incremental_vacuum_pages
+    scheduler.add_job(
+        "wal_checkpoint",
+        _for_each_database(databases, lambda db: checkpoint_wal(db.engine)),
+        interval=settings.wal_checkpoint_interval_seconds,
+        jitter=jitter,
+    )
+    scheduler.add_job(
+        "optimize",
+        _for_each_database(databases, lambda db: optimize(db.engine)),
+        interval=settings.optimize_interval_seconds,
+        jitter=jitter,
+    )
+    scheduler.add_job(
+        "incremental_vacuum",
+        _for_each_database(databases, lambda db: incremental_vacuum(db.engine, pages)),
+        interval=settings.incremental_vacuum_interval_seconds,
+        jitter=jitter,
+    )
+    scheduler.add_job(
+        "daily_stats_refresh",
+        _for_each_database(
+            databases, lambda db: refresh_daily_stats(db.session_factory)
+        ),
+        at=settings.daily_stats_refresh_at,
+        jitter=jitter,
+    )
+    # The storage layout is process-wide, so archival follows the global
+    # settings, as archive_history does
+    if archive_enabled():
+        scheduler.add_job(
+            "archive_history",
+            _for_each_database(
+                databases, lambda db: archive_history(db.session_factory)
+            ),
+            interval=settings.archive_interval_seconds,
+            jitter=jitter,
+        )
+    if settings.soft_delete_habits:
+        batch_size = settings.purge_batch_size
+        scheduler.add_job(
+            "purge_deleted_habits",
+            _for_each_database(
+                databases,
+                lambda db: purge_deleted_habits(db.session_factory, batch_size),
+            ),
+            interval=settings.purge_interval_seconds,
+            jitter=jitter,
+        )
+    if tenant_engines is not None:
+        scheduler.add_job(
+            "dispose_idle_tenants",
+            partial(dispose_idle_tenants, tenant_engines, settings.tenant_idle_seconds),
+            interval=min(60.0, settings.tenant_idle_seconds),
+        )
+    return scheduler
@@ -0,0 +1,87 @@
+"""Soft deletion of habits and chunked purging of their history.
+
+Deleting a habit normally removes it in one statement and lets SQLite's
+``ON DELETE CASCADE`` remove its history. For habits with years of history
+that single transaction can hold the write lock for a while, so with
+``soft_delete_habits`` a delete only records a ``habit_purges`` row, which
+hides the habit from every read. A background job then deletes the history
+in chunks of ``purge_batch_size`` rows, one transaction each, and finally
+the habit itself.
+"""
+
+import structlog
+from sqlalchemy import ColumnElement, delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
+from app.models.habit import Habit
+from app.models.habit_purge import HabitPurge
+from app.services.changes import record_change
+
+logger = structlog.get_logger()
+
+ChunkedModel = type[Completion] | type[Absence] | type[CompletionRun]
+
+
+def is_live() -> ColumnElement[bool]:
+    """Return a condition excluding habits that are awaiting purge."""
+    return ~exists().where(HabitPurge.habit_id == Habit.id)
+
+
+def _chunked_rows(
+    habit_id: str, habit_pk: int | None
+) -> list[tuple[ChunkedModel, ColumnElement[bool]]]:
+    """Return the tables purged in chunks, each with the habit's rows' condition.
+
+    These can hold many rows per habit. Rollups and archives hold a handful
+    of rows per habit and go with the habit's cascade.
+    """
+    return [
+        (Completion, Completion.habit_pk == habit_pk),
+        (Absence, Absence.habit_pk == habit_pk),
+        (CompletionRun, CompletionRun.habit_id == habit_id),
+    ]
+
+
+async def _purge_chunk(
+    session_factory: async_sessionmaker[AsyncSession],
+    habit_id: str,
+    batch_size: int,
+) -> int:
+    """Delete up to ``batch_size`` history rows of a habit; return the count."""
+    deleted = 0
+    async with session_factory() as session:
+        habit_pk = await session.scalar(select(Habit.pk).where(Habit.id == habit_id))
+        for model, of_habit in _chunked_rows(habit_id, habit_pk):
+            chunk = select(model.id).where(of_habit).limit(batch_size - deleted)
+            result = await session.execute(
+                delete(model).where(model.id.in_(chunk)).returning(model.id)
+            )
+            deleted += len(result.all())
+            if deleted >= batch_size:
+                break
+        await session.commit()
+    return deleted
+
+
+async def purge_deleted_habits(
+    session_factory: async_sessionmaker[AsyncSession], batch_size: int
+) -> int:
+    """Purge every soft-deleted habit; return the number of history rows deleted."""
+    async with session_factory() as session:
+        result = await session.execute(select(HabitPurge.habit_id))
+        habit_ids = list(result.scalars().all())
+
+    total = 0
+    for habit_id in habit_ids:
+        while deleted := await _purge_chunk(session_factory, habit_id, batch_size):
+            total += deleted
+        async with session_factory() as session:
+            await session.execute(delete(Habit).where(Habit.id == habit_id))
+            await session.commit()
+        record_change(habit_id)
+    if habit_ids:
+        logger.info("habits_purged", habits=len(habit_ids), rows=total)
+    return total
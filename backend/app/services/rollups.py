@@ -0,0 +1,179 @@
+"""Monthly completion and absence rollups.
+
+With ``monthly_rollups_enabled`` every completion and absence write also
+adjusts the habit's ``(year, month)`` counts in the same transaction, so
+long-range rates can add up whole months instead of scanning every day.
+Enabling it on a database with existing history requires a rebuild:
+
+    python -m app.cli.rollups
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import delete, extract, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
+from app.models.habit import Habit
+from app.models.habit_archive import HabitArchive
+from app.models.monthly_rollup import MonthlyRollup
+from app.services import archive, completion_runs
+
+ONE_DAY = timedelta(days=1)
+
+
+def rollups_enabled() -> bool:
+    """Return True if monthly rollups are maintained and read."""
+    return settings.monthly_rollups_enabled
+
+
+def _month_index(day: date) -> int:
+    """Return a month number that increases by one each calendar month."""
+    return day.year * 12 + day.month - 1
+
+
+def _next_month(day: date) -> date:
+    """Return the first day of the month after ``day``."""
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def whole_months(start_date: date, end_date: date) -> tuple[date, date] | None:
+    """Return the first and last day of the whole months inside a range."""
+    first = start_date if start_date.day == 1 else _next_month(start_date)
+    last = end_date.replace(day=1) - ONE_DAY
+    if _next_month(end_date) == end_date + ONE_DAY:
+        last = end_date
+    if first > last:
+        return None
+    return first, last
+
+
+def partial_ranges(
+    start_date: date, end_date: date, months: tuple[date, date]
+) -> list[tuple[date, date]]:
+    """Return the parts of a range outside its whole months."""
+    parts = []
+    if start_date < months[0]:
+        parts.append((start_date, months[0] - ONE_DAY))
+    if months[1] < end_date:
+        parts.append((months[1] + ONE_DAY, end_date))
+    return parts
+
+
+async def adjust(
+    session: AsyncSession,
+    habit_id: str,
+    day: date,
+    completions: int = 0,
+    absences: int = 0,
+) -> None:
+    """Add to the counts of the month containing ``day``."""
+    if not rollups_enabled():
+        return
+    stmt = sqlite_insert(MonthlyRollup).values(
+        habit_id=habit_id,
+        year=day.year,
+        month=day.month,
+        completions=completions,
+        absences=absences,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["habit_id", "year", "month"],
+        set_={
+            "completions": MonthlyRollup.completions + stmt.excluded.completions,
+            "absences": MonthlyRollup.absences + stmt.excluded.absences,
+        },
+    )
+    # The upsert does not depend on pending objects, so leave them for the commit
+    with session.no_autoflush:
+        await session.execute(stmt)
+
+
+async def sum_months(
+    session: AsyncSession, habit_id: str, first: date, last: date
+) -> tuple[int, int]:
+    """Return total completions and absences for the months from first to last."""
+    month = MonthlyRollup.year * 12 + MonthlyRollup.month - 1
+    result = await session.execute(
+        select(
+            func.coalesce(func.sum(MonthlyRollup.completions), 0),
+            func.coalesce(func.sum(MonthlyRollup.absences), 0),
+        ).where(
+            MonthlyRollup.habit_id == habit_id,
+            month.between(_month_index(first), _month_index(last)),
+        )
+    )
+    completions, absences = result.one()
+    return int(completions), int(absences)
+
+
+async def rebuild_rollups(session: AsyncSession) -> int:
+    """Recompute every rollup from raw history; return the number of rows.
+
+    The caller commits, then calls ``record_change`` for every habit, or
+    restarts the server.
+    """
+    counts: defaultdict[tuple[str, int, int], list[int]] = defaultdict(lambda: [0, 0])
+
+    if completion_runs.runs_enabled():
+        runs = await session.execute(
+            select(
+                CompletionRun.habit_id, CompletionRun.start_date, CompletionRun.end_date
+            )
+        )
+        for habit_id, start, end in runs.all():
+            while start <= end:
+                month_end = min(end, _next_month(start) - ONE_DAY)
+                key = (habit_id, start.year, start.month)
+                counts[key][0] += (month_end - start).days + 1
+                start = month_end + ONE_DAY
+    else:
+        year = extract("year", Completion.completed_date)
+        month = extract("month", Completion.completed_date)
+        rows = await session.execute(
+            select(Habit.id, year, month, func.count())
+            .join_from(Completion, Habit)
+            .group_by(Habit.id, year, month)
+        )
+        for habit_id, y, m, count in rows.all():
+            counts[(habit_id, int(y), int(m))][0] = count
+
+    year = extract("year", Absence.absence_date)
+    month = extract("month", Absence.absence_date)
+    rows = await session.execute(
+        select(Habit.id, year, month, func.count())
+        .join_from(Absence, Habit)
+        .group_by(Habit.id, year, month)
+    )
+    for habit_id, y, m, count in rows.all():
+        counts[(habit_id, int(y), int(m))][1] = count
+
+    if archive.archive_enabled():
+        archives = await session.execute(select(HabitArchive))
+        for row in archives.scalars():
+            for day in archive.decode_days(row.year, row.completions):
+                counts[(row.habit_id, day.year, day.month)][0] += 1
+            for day in archive.decode_absences(row.year, row.absences):
+                counts[(row.habit_id, day.year, day.month)][1] += 1
+
+    await session.execute(delete(MonthlyRollup))
+    if counts:
+        await session.execute(
+            insert(MonthlyRollup),
+            [
+                {
+                    "habit_id": habit_id,
+                    "year": y,
+                    "month": m,
+                    "completions": completions,
+                    "absences": absences,
+                }
+                for (habit_id, y, m), (completions, absences) in counts.items()
+            ],
+        )
+    return len(counts)
@@ -0,0 +1,104 @@
+"""Prebuilt statements for the hot single-habit queries.
+
+Each statement is built once at import with named bound parameters, so a
+call neither rebuilds the ``select()`` nor recomputes its cache key: the
+key is memoized on the statement and the compiled form comes straight
+from SQLAlchemy's statement cache. Optional date bounds are always bound,
+defaulting to ``date.min`` and ``date.max``, so each query has one shape.
+"""
+
+from datetime import date
+from typing import Any
+
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.purge import is_live
+
+# Parameters: habit_id
+LIVE_HABIT = select(Habit).where(Habit.id == bindparam("habit_id"), is_live())
+HABIT_CREATED_AT = select(Habit.created_at).where(
+    Habit.id == bindparam("habit_id"), is_live()
+)
+HABIT_PK = select(Habit.pk).where(Habit.id == bindparam("habit_id"), is_live())
+
+# Completions and absences are keyed by the habit's integer key (see
+# ``habit_pk``). Parameters: habit_pk, day
+COMPLETION_ON = select(Completion).where(
+    Completion.habit_pk == bindparam("habit_pk"),
+    Completion.completed_date == bindparam("day"),
+)
+COMPLETED_COUNT_ON = (
+    select(func.count())
+    .select_from(Completion)
+    .where(
+        Completion.habit_pk == bindparam("habit_pk"),
+        Completion.completed_date == bindparam("day"),
+    )
+)
+ABSENCE_ON = select(Absence).where(
+    Absence.habit_pk == bindparam("habit_pk"),
+    Absence.absence_date == bindparam("day"),
+)
+
+# Parameters: habit_pk, start, end (see ``date_range``)
+COMPLETION_DATES = (
+    select(Completion.completed_date)
+    .where(
+        Completion.habit_pk == bindparam("habit_pk"),
+        Completion.completed_date.between(bindparam("start"), bindparam("end")),
+    )
+    .order_by(Completion.completed_date)
+)
+ABSENCE_DATES = (
+    select(Absence.absence_date)
+    .where(
+        Absence.habit_pk == bindparam("habit_pk"),
+        Absence.absence_date.between(bindparam("start"), bindparam("end")),
+    )
+    .order_by(Absence.absence_date)
+)
+ABSENCES = (
+    select(Absence.absence_date, Absence.reason)
+    .where(
+        Absence.habit_pk == bindparam("habit_pk"),
+        Absence.absence_date.between(bindparam("start"), bindparam("end")),
+    )
+    .order_by(Absence.absence_date)
+)
+
+
+async def habit_pk(session: AsyncSession, habit_id: str) -> int | None:
+    """Return a live habit's integer key, or None if there is no such habit.
+
+    Keys never change, so each habit's is looked up once per session, which
+    is once per request. The lookup also serves as the request's existence
+    check, so it always sees deletes made by other processes.
+    """
+    keys: dict[str, int] = session.info.setdefault("habit_pks", {})
+    if habit_id not in keys:
+        result = await session.execute(HABIT_PK, {"habit_id": habit_id})
+        pk = result.scalar_one_or_none()
+        if pk is None:
+            return None
+        keys[habit_id] = pk
+    return keys[habit_id]
+
+
+def forget_habit_pk(session: AsyncSession, habit_id: str) -> None:
+    """Drop a deleted habit's key from the session's lookups."""
+    session.info.get("habit_pks", {}).pop(habit_id, None)
+
+
+def date_range(
+    habit_pk: int | None, start_date: date | None, end_date: date | None
+) -> dict[str, Any]:
+    """Return parameters for a range query, with missing bounds left open."""
+    return {
+        "habit_pk": habit_pk,
+        "start": start_date or date.min,
+        "end": end_date or date.max,
+    }
@@ -0,0 +1,266 @@
+"""Offline recomputation of every habit's statistics from its full history.
+
+Live habits are split into chunks of consecutive ids. A chunk is rebuilt by
+streaming the history of its id range from a read-only connection, so it
+can run in its own process next to other chunks and a running application,
+and computing each ``HabitWithStatsResponse`` with the pure streak and rate
+functions rather than the archive checkpoints and rollups the API uses.
+
+A rebuild writes the recomputed stats of each chunk as JSON lines; a
+verification instead compares them with what ``StatsService`` serves and
+writes the differences. A checkpoint file records the chunks and which of
+them are finished, so an interrupted run resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Executable, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.compute_pool import compute_pool
+from app.core.database import build_read_only_engine
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
+from app.models.habit import Habit
+from app.models.habit_archive import HabitArchive
+from app.schemas.stats import HabitWithStatsResponse
+from app.services import archive, completion_runs
+from app.services.purge import is_live
+from app.services.stats_service import (
+    StatsService,
+    compute_best_streak,
+    compute_completion_rate,
+    compute_current_streak,
+)
+
+History = defaultdict[str, set[date]]
+
+# Rows fetched from SQLite per round trip while streaming history
+STREAM_BATCH = 10000
+
+
+async def chunk_bounds(session: AsyncSession, chunk_size: int) -> list[list[str]]:
+    """Return the first and last live habit id of each chunk, in id order."""
+    result = await session.stream_scalars(
+        select(Habit.id).where(is_live()).order_by(Habit.id)
+    )
+    bounds: list[list[str]] = []
+    count = 0
+    async for habit_id in result:
+        if count % chunk_size == 0:
+            bounds.append([habit_id, habit_id])
+        bounds[-1][1] = habit_id
+        count += 1
+    return bounds
+
+
+async def _stream(
+    session: AsyncSession, query: Executable
+) -> AsyncIterator[tuple[Any, ...]]:
+    """Yield a query's rows, fetched from the database in batches.
+
+    Runs on the session's connection, skipping ORM row processing.
+    """
+    connection = await session.connection()
+    result = await connection.stream(query.execution_options(yield_per=STREAM_BATCH))
+    async for rows in result.partitions():
+        for row in rows:
+            yield row
+
+
+async def _stream_history(
+    session: AsyncSession, first_id: str, last_id: str
+) -> tuple[History, History]:
+    """Return completion and absence dates of every habit in an id range."""
+    completions: History = defaultdict(set)
+    absences: History = defaultdict(set)
+
+    if completion_runs.runs_enabled():
+        runs = select(
+            CompletionRun.habit_id, CompletionRun.start_date, CompletionRun.end_date
+        ).where(CompletionRun.habit_id.between(first_id, last_id))
+        async for habit_id, start, end in _stream(session, runs):
+            completions[habit_id].update(completion_runs.expand_runs([(start, end)]))
+    else:
+        rows = (
+            select(Habit.id, Completion.completed_date)
+            .join_from(Completion, Habit)
+            .where(Habit.id.between(first_id, last_id))
+        )
+        async for habit_id, day in _stream(session, rows):
+            completions[habit_id].add(day)
+
+    rows = (
+        select(Habit.id, Absence.absence_date)
+        .join_from(Absence, Habit)
+        .where(Habit.id.between(first_id, last_id))
+    )
+    async for habit_id, day in _stream(session, rows):
+        absences[habit_id].add(day)
+
+    if archive.archive_enabled():
+        years = select(
+            HabitArchive.habit_id,
+            HabitArchive.year,
+            HabitArchive.completions,
+            HabitArchive.absences,
+        ).where(HabitArchive.habit_id.between(first_id, last_id))
+        async for habit_id, year, completed, absent in _stream(session, years):
+            completions[habit_id].update(archive.decode_days(year, completed))
+            absences[habit_id].update(archive.decode_absences(year, absent))
+    return completions, absences
+
+
+def rebuild_habit_stats(
+    habit: Habit, completions: set[date], absences: set[date], today: date
+) -> HabitWithStatsResponse:
+    """Compute a habit's statistics from its complete history."""
+    return HabitWithStatsResponse(
+        id=habit.id,
+        name=habit.name,
+        description=habit.description,
+        created_at=habit.created_at,
+        updated_at=habit.updated_at,
+        current_streak=compute_current_streak(completions, absences, today),
+        best_streak=(
+            compute_best_streak(completions, absences, min(completions), today)
+            if completions
+            else 0
+        ),
+        completion_rate=compute_completion_rate(
+            completions, absences, habit.created_at.date(), today
+        ),
+        completed_today=today in completions,
+    )
+
+
+def differences(
+    rebuilt: HabitWithStatsResponse, served: HabitWithStatsResponse | None
+) -> list[dict[str, Any]]:
+    """Return the fields where served stats differ from rebuilt ones."""
+    expected = rebuilt.model_dump(mode="json")
+    actual = served.model_dump(mode="json") if served else {}
+    return [
+        {
+            "id": rebuilt.id,
+            "field": field,
+            "rebuilt": value,
+            "served": actual.get(field),
+        }
+        for field, value in expected.items()
+        if actual.get(field) != value
+    ]
+
+
+async def rebuild_chunk(
+    database_url: str, first_id: str, last_id: str, today: date, verify: bool
+) -> tuple[int, list[dict[str, Any]]]:
+    """Rebuild one chunk's stats.
+
+    Returns the number of habits and either their stats or, when verifying,
+    their differences from the served stats. Served stats are always as of
+    the current day, so a verification must be for that day too.
+    """
+    if verify and today != date.today():
+        raise ValueError(
+            f"Cannot verify stats as of {today} against stats served for {date.today()}"
+        )
+    engine = build_read_only_engine(database_url)
+    try:
+        session_factory = async_sessionmaker(engine, class_=AsyncSession)
+        async with session_factory() as session:
+            result = await session.execute(
+                select(Habit)
+                .where(Habit.id.between(first_id, last_id), is_live())
+                .order_by(Habit.id)
+            )
+            habits = result.scalars().all()
+            completions, absences = await _stream_history(session, first_id, last_id)
+
+            records: list[dict[str, Any]] = []
+            service = StatsService(session)
+            for habit in habits:
+                stats = rebuild_habit_stats(
+                    habit, completions[habit.id], absences[habit.id], today
+                )
+                if not verify:
+                    records.append(stats.model_dump(mode="json"))
+                    continue
+                served = await service.get_habit_with_stats(habit.id)
+                records.extend(differences(stats, served))
+        return len(habits), records
+    finally:
+        await engine.dispose()
+
+
+def run_chunk(
+    database_url: str,
+    first_id: str,
+    last_id: str,
+    today: date,
+    verify: bool,
+    path: Path,
+) -> int:
+    """Rebuild a chunk in a worker process and write its records to a file.
+
+    The file is renamed into place once complete, so a chunk's output is
+    either whole or absent. Returns the number of habits in the chunk.
+    """
+    # The worker process is the parallelism; don't hand off again
+    compute_pool.threshold = 0
+    count, records = asyncio.run(
+        rebuild_chunk(database_url, first_id, last_id, today, verify)
+    )
+    partial = path.with_suffix(".partial")
+    with partial.open("w") as output:
+        output.writelines(json.dumps(record) + "\n" for record in records)
+    os.replace(partial, path)
+    return count
+
+
+class RebuildCheckpoint:
+    """The chunks of a rebuild and which of them are finished, on disk."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize an empty checkpoint stored at ``path``."""
+        self.path = path
+        self.today = date.today()
+        self.verify = False
+        self.chunks: list[list[str]] = []
+        self.done: set[int] = set()
+
+    def exists(self) -> bool:
+        """Return True if a checkpoint was saved by an earlier run."""
+        return self.path.exists()
+
+    def load(self) -> None:
+        """Read the saved checkpoint."""
+        state = json.loads(self.path.read_text())
+        self.today = date.fromisoformat(state["today"])
+        self.verify = state["verify"]
+        self.chunks = state["chunks"]
+        self.done = set(state["done"])
+
+    def save(self) -> None:
+        """Write the checkpoint, replacing the previous one atomically."""
+        state = {
+            "today": self.today.isoformat(),
+            "verify": self.verify,
+            "chunks": self.chunks,
+            "done": sorted(self.done),
+        }
+        partial = self.path.with_suffix(".partial")
+        partial.write_text(json.dumps(state))
+        os.replace(partial, self.path)
+
+    def pending(self) -> list[int]:
+        """Return the indexes of chunks not yet finished."""
+        return [index for index in range(len(self.chunks)) if index not in self.done]
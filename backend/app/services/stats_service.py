@@ -1,18 +1,183 @@
 """Statistics service for streak and completion rate calculations."""
 
+import re
+from collections.abc import Callable
 from datetime import date, timedelta
+from typing import TypeVar
 
 import structlog
-from sqlalchemy import func, select
+from sqlalchemy import exists, func, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import data_versions
+from app.core.compute_pool import compute_pool
+from app.core.history_index import DayIndex, HistoryIndex
+from app.core.rate_index import PrefixCounts, rate_index
+from app.core.streak_index import StreakTree, streak_index
+from app.core.tenancy import current_tenant
 from app.models.absence import Absence
 from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
 from app.models.habit import Habit
-from app.schemas.stats import CompletionRate, HabitWithStatsResponse
+from app.models.habit_archive import HabitArchiveSummary
+from app.schemas.stats import CompletionRate, DailyProgress, HabitWithStatsResponse
+from app.services import archive, completion_runs, rollups, statements
+from app.services.purge import is_live
 
 logger = structlog.get_logger()
 
+T = TypeVar("T", bound=DayIndex)
+
+# A rate window: a number of days ending today, "ytd", "all", or a date
+# range "START..END" with either side optionally left open
+WINDOW_PATTERN = re.compile(
+    r"(?P<days>\d{1,5})|ytd|all|(?P<start>[\d-]{10})?\.\.(?P<end>[\d-]{10})?"
+)
+
+
+def compute_current_streak(
+    completions: set[date],
+    absences: set[date],
+    today: date,
+    archived_until: date | None = None,
+    trailing_streak: int = 0,
+) -> int:
+    """Count the consecutive completed days up to today.
+
+    Rules:
+    - Streak counts consecutive days where completion exists
+    - Absences preserve streak but don't add to count
+    - Streak breaks when no completion AND no absence
+    - If today not completed, start counting from yesterday
+
+    Days before ``archived_until`` are not in the sets; a streak reaching it
+    continues with the archive's ``trailing_streak``.
+    """
+    if not completions and not trailing_streak:
+        return 0
+
+    # Determine starting point
+    current_day = today if today in completions else today - timedelta(days=1)
+
+    streak = 0
+    while True:
+        if archived_until and current_day < archived_until:
+            # The rest of the streak is in the archive
+            streak += trailing_streak
+            break
+        if current_day in completions:
+            streak += 1
+            current_day -= timedelta(days=1)
+        elif current_day in absences:
+            # Absence preserves streak but doesn't add to count
+            current_day -= timedelta(days=1)
+        else:
+            # Neither completion nor absence - streak breaks
+            break
+
+    return streak
+
+
+def compute_best_streak(
+    completions: set[date],
+    absences: set[date],
+    start: date,
+    today: date,
+    best_streak: int = 0,
+    current_streak: int = 0,
+) -> int:
+    """Return the longest streak, scanning every day from ``start`` to today.
+
+    ``best_streak`` and ``current_streak`` carry the state of the days
+    before ``start``, such as the checkpoints of archived history.
+    """
+    current_day = start
+    while current_day <= today:
+        if current_day in completions:
+            current_streak += 1
+            best_streak = max(best_streak, current_streak)
+        elif current_day in absences:
+            # Absence preserves streak but doesn't add
+            pass
+        else:
+            # Gap breaks the streak
+            current_streak = 0
+
+        current_day += timedelta(days=1)
+
+    return best_streak
+
+
+def completion_percentage(
+    completed: int, absent: int, start_date: date, end_date: date
+) -> float:
+    """Return completions as a percentage of the period's non-absent days."""
+    total_days = (end_date - start_date).days + 1
+    applicable_days = total_days - absent
+
+    if applicable_days <= 0:
+        return 0.0
+
+    return (completed / applicable_days) * 100
+
+
+def compute_completion_rate(
+    completions: set[date], absences: set[date], created: date, today: date
+) -> CompletionRate:
+    """Return the week, month and all-time rates from a habit's full history."""
+
+    def rate(start_date: date, completed: int, absent: int) -> float:
+        return round(completion_percentage(completed, absent, start_date, today), 1)
+
+    def window(days: int) -> float:
+        # Short windows look each day up rather than walking the history
+        start_date = today - timedelta(days=days - 1)
+        period = [start_date + timedelta(days=offset) for offset in range(days)]
+        completed = sum(day in completions for day in period)
+        absent = sum(day in absences for day in period)
+        return rate(start_date, completed, absent)
+
+    all_time = rate(
+        created,
+        sum(created <= day <= today for day in completions),
+        sum(created <= day <= today for day in absences),
+    )
+    return CompletionRate(week=window(7), month=window(30), all_time=all_time)
+
+
+def parse_windows(spec: str) -> list[str]:
+    """Split a comma-separated window list, raising ValueError if invalid."""
+    windows: list[str] = []
+    for window in (part.strip() for part in spec.split(",")):
+        match = WINDOW_PATTERN.fullmatch(window)
+        if match is None or (match["days"] and int(match["days"]) == 0):
+            raise ValueError(f"Invalid rate window: {window!r}")
+        try:
+            start = date.fromisoformat(match["start"]) if match["start"] else None
+            end = date.fromisoformat(match["end"]) if match["end"] else None
+        except ValueError as exc:
+            raise ValueError(f"Invalid rate window: {window!r}") from exc
+        if start and end and start > end:
+            raise ValueError(f"Rate window starts after it ends: {window!r}")
+        if window not in windows:
+            windows.append(window)
+    return windows
+
+
+def window_range(window: str, today: date, created: date) -> tuple[date, date]:
+    """Return the first and last day of a parsed window for a habit."""
+    if window == "ytd":
+        return date(today.year, 1, 1), today
+    if window == "all":
+        return created, today
+    start, separator, end = window.partition("..")
+    if not separator:
+        return today - timedelta(days=int(window) - 1), today
+    return (
+        date.fromisoformat(start) if start else created,
+        date.fromisoformat(end) if end else today,
+    )
+
 
 class StatsService:
     """Service for calculating habit statistics."""
@@ -28,13 +193,27 @@ class StatsService:
         end_date: date | None = None,
     ) -> set[date]:
         """Get set of completion dates for a habit."""
-        query = select(Completion.completed_date).where(Completion.habit_id == habit_id)
-        if start_date:
-            query = query.where(Completion.completed_date >= start_date)
-        if end_date:
-            query = query.where(Completion.completed_date <= end_date)
-        result = await self.session.execute(query)
-        return set(result.scalars().all())
+        if completion_runs.runs_enabled():
+            runs = await completion_runs.get_runs(
+                self.session, habit_id, start_date, end_date
+            )
+            return set(completion_runs.expand_runs(runs))
+
+        dates: set[date] = set()
+        summary = await archive.get_summary(self.session, habit_id)
+        archived_range = archive.archived_part(summary, start_date, end_date)
+        if archived_range is not None:
+            dates.update(
+                await archive.read_completions(self.session, habit_id, *archived_range)
+            )
+
+        habit_pk = await statements.habit_pk(self.session, habit_id)
+        result = await self.session.execute(
+            statements.COMPLETION_DATES,
+            statements.date_range(habit_pk, start_date, end_date),
+        )
+        dates.update(result.scalars().all())
+        return dates
 
     async def _get_absence_dates(
         self,
@@ -43,18 +222,27 @@ class StatsService:
         end_date: date | None = None,
     ) -> set[date]:
         """Get set of absence dates for a habit."""
-        query = select(Absence.absence_date).where(Absence.habit_id == habit_id)
-        if start_date:
-            query = query.where(Absence.absence_date >= start_date)
-        if end_date:
-            query = query.where(Absence.absence_date <= end_date)
-        result = await self.session.execute(query)
-        return set(result.scalars().all())
+        dates: set[date] = set()
+        summary = await archive.get_summary(self.session, habit_id)
+        archived_range = archive.archived_part(summary, start_date, end_date)
+        if archived_range is not None:
+            archived = await archive.read_absences(
+                self.session, habit_id, *archived_range
+            )
+            dates.update(day for day, _ in archived)
+
+        habit_pk = await statements.habit_pk(self.session, habit_id)
+        result = await self.session.execute(
+            statements.ABSENCE_DATES,
+            statements.date_range(habit_pk, start_date, end_date),
+        )
+        dates.update(result.scalars().all())
+        return dates
 
     async def _get_habit_created_date(self, habit_id: str) -> date | None:
         """Get the creation date of a habit."""
         result = await self.session.execute(
-            select(Habit.created_at).where(Habit.id == habit_id)
+            statements.HABIT_CREATED_AT, {"habit_id": habit_id}
         )
         created_at = result.scalar_one_or_none()
         if created_at:
@@ -64,69 +252,63 @@ class StatsService:
     async def calculate_current_streak(self, habit_id: str) -> int:
         """Calculate current consecutive streak for a habit.
 
-        Rules:
-        - Streak counts consecutive days where completion exists
-        - Absences preserve streak but don't add to count
-        - Streak breaks when no completion AND no absence
-        - If today not completed, start counting from yesterday
+        With the streak index the streak is read from the habit's segment
+        tree. Otherwise, with archived history only hot days are scanned; a
+        streak reaching the archive boundary continues with the archived
+        trailing streak.
         """
-        today = date.today()
-        completions = await self._get_completion_dates(habit_id)
-        absences = await self._get_absence_dates(habit_id)
-
-        if not completions:
-            return 0
-
-        # Determine starting point
-        current_day = today if today in completions else today - timedelta(days=1)
-
-        streak = 0
-        while True:
-            if current_day in completions:
-                streak += 1
-                current_day -= timedelta(days=1)
-            elif current_day in absences:
-                # Absence preserves streak but doesn't add to count
-                current_day -= timedelta(days=1)
-            else:
-                # Neither completion nor absence - streak breaks
-                break
-
-        return streak
+        if streak_index.enabled:
+            tree = await self._indexed_history(streak_index, StreakTree, habit_id)
+            return tree.current_streak(date.today())
+
+        summary = await archive.get_summary(self.session, habit_id)
+        hot_start = summary.archived_until if summary else None
+        completions = await self._get_completion_dates(habit_id, hot_start)
+        absences = await self._get_absence_dates(habit_id, hot_start)
+        return await compute_pool.run(
+            compute_current_streak,
+            completions,
+            absences,
+            date.today(),
+            hot_start,
+            summary.trailing_streak if summary else 0,
+            size=len(completions) + len(absences),
+        )
 
     async def calculate_best_streak(self, habit_id: str) -> int:
         """Calculate the longest streak ever achieved for a habit.
 
-        Scans all days from first completion to today and tracks max streak.
+        With the streak index the streak is read from the habit's segment
+        tree, so backfilling or undoing any past day needs no rescan.
+        Otherwise, with archived history the scan starts at the archive
+        boundary from the archived best and trailing streak checkpoints.
         """
-        completions = await self._get_completion_dates(habit_id)
-        absences = await self._get_absence_dates(habit_id)
-
-        if not completions:
-            return 0
-
-        # Find the earliest completion date
-        first_completion = min(completions)
+        if streak_index.enabled:
+            tree = await self._indexed_history(streak_index, StreakTree, habit_id)
+            return tree.best_streak(date.today())
+
+        summary = await archive.get_summary(self.session, habit_id)
+        hot_start = summary.archived_until if summary else None
+        completions = await self._get_completion_dates(habit_id, hot_start)
+        absences = await self._get_absence_dates(habit_id, hot_start)
         today = date.today()
-
-        best_streak = 0
-        current_streak = 0
-        current_day = first_completion
-
-        while current_day <= today:
-            if current_day in completions:
-                current_streak += 1
-                best_streak = max(best_streak, current_streak)
-            elif current_day in absences:
-                # Absence preserves streak but doesn't add
-                pass
-            else:
-                # Gap breaks the streak
-                current_streak = 0
-
-            current_day += timedelta(days=1)
-
-        return best_streak
+        if summary:
+            start = summary.archived_until
+            best, trailing = summary.best_streak, summary.trailing_streak
+        elif completions:
+            start, best, trailing = min(completions), 0, 0
+        else:
+            return 0
+        return await compute_pool.run(
+            compute_best_streak,
+            completions,
+            absences,
+            start,
+            today,
+            best,
+            trailing,
+            size=(today - start).days,
+        )
 
     async def calculate_completion_rate(self, habit_id: str) -> CompletionRate:
         """Calculate completion rates excluding absence days.
@@ -167,36 +349,173 @@ class StatsService:
         """Calculate completion rate for a specific period.
 
         Rate = completions / (total_days - absence_days)
+
+        With the rate index the counts are two prefix lookups per history.
+        Otherwise, with monthly rollups, whole months are read from the rollup
+        table and only the partial months at either end are counted day by day.
         """
-        completions = await self._get_completion_dates(habit_id, start_date, end_date)
-        absences = await self._get_absence_dates(habit_id, start_date, end_date)
+        if rate_index.enabled:
+            counts = await self._indexed_history(rate_index, PrefixCounts, habit_id)
+            return completion_percentage(
+                *counts.counts(start_date, end_date), start_date, end_date
+            )
+
+        months = None
+        if rollups.rollups_enabled():
+            months = rollups.whole_months(start_date, end_date)
+
+        if months is None:
+            completion_count, absence_days = await self._count_days(
+                habit_id, start_date, end_date
+            )
+        else:
+            completion_count, absence_days = await rollups.sum_months(
+                self.session, habit_id, *months
+            )
+            for part_start, part_end in rollups.partial_ranges(
+                start_date, end_date, months
+            ):
+                completed, absent = await self._count_days(
+                    habit_id, part_start, part_end
+                )
+                completion_count += completed
+                absence_days += absent
+
+        return completion_percentage(
+            completion_count, absence_days, start_date, end_date
+        )
+
+    async def _indexed_history(
+        self,
+        index: HistoryIndex[T],
+        build: Callable[[date, date, set[date], set[date]], T],
+        habit_id: str,
+    ) -> T:
+        """Return the habit's entry in a history index, loading it if needed.
 
-        total_days = (end_date - start_date).days + 1
-        absence_days = len(absences)
-        applicable_days = total_days - absence_days
+        A new entry spans the habit's creation or first recorded day,
+        whichever is earlier, through today or its last recorded day, and
+        is built in the compute pool when that span is long.
+        """
+        tenant_id = current_tenant.get()
+        version = data_versions.get(habit_id)
+        entry = index.get(tenant_id, habit_id, version)
+        if entry is not None:
+            return entry
 
-        if applicable_days <= 0:
-            return 0.0
+        completions = await self._get_completion_dates(habit_id)
+        absences = await self._get_absence_dates(habit_id)
+        today = date.today()
+        created = await self._get_habit_created_date(habit_id) or today
+        history = completions | absences
+        first_day = min(created, *history) if history else created
+        last_day = max(today, *history) if history else today
+        entry = await compute_pool.run(
+            build,
+            first_day,
+            last_day,
+            completions,
+            absences,
+            size=(last_day - first_day).days,
+        )
+        # Stored as of the version read before loading, so a write committed
+        # meanwhile leaves it stale rather than serving it
+        index.put(tenant_id, habit_id, version, entry)
+        return entry
 
-        completion_count = len(completions)
-        return (completion_count / applicable_days) * 100
+    async def prime_history_indexes(self) -> int:
+        """Load the rate and streak index entries of every live habit.
+
+        Entries already current are kept. Returns the number of habits whose
+        entries had to be loaded.
+        """
+        if not (rate_index.enabled or streak_index.enabled):
+            return 0
+        tenant_id = current_tenant.get()
+        result = await self.session.execute(select(Habit.id).where(is_live()))
+        loaded = 0
+        for habit_id in result.scalars().all():
+            version = data_versions.get(habit_id)
+            missing = False
+            if rate_index.enabled and not rate_index.get(tenant_id, habit_id, version):
+                await self._indexed_history(rate_index, PrefixCounts, habit_id)
+                missing = True
+            if streak_index.enabled and not streak_index.get(
+                tenant_id, habit_id, version
+            ):
+                await self._indexed_history(streak_index, StreakTree, habit_id)
+                missing = True
+            loaded += missing
+        return loaded
+
+    async def calculate_window_rates(
+        self, habit_id: str, windows: list[str]
+    ) -> dict[str, float]:
+        """Calculate completion rates over windows accepted by ``parse_windows``."""
+        today = date.today()
+        created = await self._get_habit_created_date(habit_id) or today
+        rates = {}
+        for window in windows:
+            start_date, end_date = window_range(window, today, created)
+            rate = await self._calculate_rate_for_period(habit_id, start_date, end_date)
+            rates[window] = round(rate, 1)
+        return rates
+
+    async def _count_days(
+        self, habit_id: str, start_date: date, end_date: date
+    ) -> tuple[int, int]:
+        """Count completed and absent days in a range from raw history."""
+        summary = await archive.get_summary(self.session, habit_id)
+        archived_range = archive.archived_part(summary, start_date, end_date)
+        if summary is not None and archived_range is not None:
+            # Archived years are counted from their stored totals
+            archived_counts = await archive.count_days(
+                self.session, habit_id, *archived_range
+            )
+            start_date = summary.archived_until
+            if start_date > end_date:
+                return archived_counts
+            hot_counts = await self._count_days(habit_id, start_date, end_date)
+            return (
+                archived_counts[0] + hot_counts[0],
+                archived_counts[1] + hot_counts[1],
+            )
+
+        if completion_runs.runs_enabled():
+            runs = await completion_runs.get_runs(
+                self.session, habit_id, start_date, end_date
+            )
+            completion_count = completion_runs.count_days(runs)
+        else:
+            completions = await self._get_completion_dates(
+                habit_id, start_date, end_date
+            )
+            completion_count = len(completions)
+        absences = await self._get_absence_dates(habit_id, start_date, end_date)
+        return completion_count, len(absences)
 
     async def is_completed_today(self, habit_id: str) -> bool:
         """Check if habit is completed for today."""
         today = date.today()
+        if completion_runs.runs_enabled():
+            return await completion_runs.is_completed(self.session, habit_id, today)
+        habit_pk = await statements.habit_pk(self.session, habit_id)
         result = await self.session.execute(
-            select(func.count())
-            .select_from(Completion)
-            .where(Completion.habit_id == habit_id, Completion.completed_date == today)
+            statements.COMPLETED_COUNT_ON, {"habit_pk": habit_pk, "day": today}
         )
         count = result.scalar_one()
         return count > 0
 
     async def get_habit_with_stats(
-        self, habit_id: str
+        self, habit_id: str, windows: list[str] | None = None
     ) -> HabitWithStatsResponse | None:
-        """Get a habit with all computed statistics."""
-        result = await self.session.execute(select(Habit).where(Habit.id == habit_id))
+        """Get a habit with all computed statistics.
+
+        Rates over any extra ``windows`` are added to the completion rate.
+        """
+        result = await self.session.execute(
+            statements.LIVE_HABIT, {"habit_id": habit_id}
+        )
         habit = result.scalar_one_or_none()
 
         if not habit:
@@ -205,6 +524,10 @@ class StatsService:
         current_streak = await self.calculate_current_streak(habit_id)
         best_streak = await self.calculate_best_streak(habit_id)
         completion_rate = await self.calculate_completion_rate(habit_id)
+        if windows:
+            completion_rate.windows = await self.calculate_window_rates(
+                habit_id, windows
+            )
         completed_today = await self.is_completed_today(habit_id)
 
         return HabitWithStatsResponse(
@@ -219,15 +542,121 @@ class StatsService:
             completed_today=completed_today,
         )
 
-    async def get_all_habits_with_stats(self) -> list[HabitWithStatsResponse]:
+    async def get_all_habits_with_stats(
+        self, windows: list[str] | None = None
+    ) -> list[HabitWithStatsResponse]:
         """Get all habits with computed statistics."""
-        result = await self.session.execute(select(Habit))
+        result = await self.session.execute(select(Habit).where(is_live()))
         habits = result.scalars().all()
 
         habits_with_stats = []
         for habit in habits:
-            stats = await self.get_habit_with_stats(habit.id)
+            stats = await self.get_habit_with_stats(habit.id, windows)
             if stats:
                 habits_with_stats.append(stats)
 
         return habits_with_stats
+
+    async def get_daily_progress(
+        self, start_date: date, end_date: date
+    ) -> list[DailyProgress]:
+        """Get completed and applicable habit counts for each day in a range.
+
+        A habit is applicable on a day from the date it was created, unless it
+        has an absence and no completion that day. Computed in one query over
+        a generated calendar rather than per habit.
+        """
+        days = select(literal(start_date.isoformat()).label("day")).cte(
+            "days", recursive=True
+        )
+        days = days.union_all(
+            select(func.date(days.c.day, "+1 day")).where(
+                days.c.day < end_date.isoformat()
+            )
+        )
+
+        # Live habits and their creation day, computed once for the range
+        habits = (
+            select(Habit.id, Habit.pk, func.date(Habit.created_at).label("created_on"))
+            .where(is_live())
+            .cte("live_habits")
+        )
+        if completion_runs.runs_enabled():
+            completed_on_day = (
+                exists()
+                .where(
+                    CompletionRun.habit_id == habits.c.id,
+                    days.c.day.between(
+                        CompletionRun.start_date, CompletionRun.end_date
+                    ),
+                )
+                .correlate_except(CompletionRun)
+            )
+        else:
+            completed_on_day = (
+                exists()
+                .where(
+                    Completion.habit_pk == habits.c.pk,
+                    Completion.completed_date == days.c.day,
+                )
+                .correlate_except(Completion)
+            )
+        absent_on_day = (
+            exists()
+            .where(Absence.habit_pk == habits.c.pk, Absence.absence_date == days.c.day)
+            .correlate_except(Absence)
+        )
+
+        # Two correlated counts per calendar day: habits drive each count and
+        # look their day up in the history indexes, so nothing is grouped in a
+        # temporary B-tree and no history table is scanned
+        habits_on_day = select(func.count()).where(habits.c.created_on <= days.c.day)
+        query = select(
+            days.c.day,
+            habits_on_day.where(completed_on_day).scalar_subquery(),
+            habits_on_day.where(
+                or_(~absent_on_day, completed_on_day)
+            ).scalar_subquery(),
+        )
+        result = await self.session.execute(query)
+        progress = [
+            DailyProgress(
+                date=date.fromisoformat(day), completed=completed, applicable=applicable
+            )
+            for day, completed, applicable in sorted(result.all())
+        ]
+        if archive.archive_enabled():
+            await self._add_archived_progress(progress, start_date, end_date)
+        return progress
+
+    async def _add_archived_progress(
+        self, progress: list[DailyProgress], start_date: date, end_date: date
+    ) -> None:
+        """Fold archived history into progress counted from hot rows only.
+
+        The calendar query sees an archived day as applicable but missed, so
+        archived completions are added and archived absences made inapplicable.
+        """
+        result = await self.session.execute(
+            select(HabitArchiveSummary, Habit.created_at)
+            .join(Habit, Habit.id == HabitArchiveSummary.habit_id)
+            .where(HabitArchiveSummary.archived_until > start_date, is_live())
+        )
+        for summary, created_at in result.all():
+            first = max(start_date, created_at.date())
+            archived_range = archive.archived_part(summary, first, end_date)
+            if archived_range is None:
+                continue
+            completed = set(
+                await archive.read_completions(
+                    self.session, summary.habit_id, *archived_range
+                )
+            )
+            absent = await archive.read_absences(
+                self.session, summary.habit_id, *archived_range
+            )
+            for day in completed:
+                progress[(day - start_date).days].completed += 1
+            for day, _ in absent:
+                if day not in completed:
+                    progress[(day - start_date).days].applicable -= 1
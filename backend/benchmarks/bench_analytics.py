@@ -0,0 +1,59 @@
+"""Benchmark single-pass habit analytics.
+
+Times ``compute_analytics`` plus JSON encoding for a habit with one or more
+years of synthetic history (about 80% completed, 5% absent).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_analytics --days 365 1825
+"""
+
+import argparse
+import random
+import timeit
+from datetime import date, timedelta
+
+from app.core.serialization import dump_json
+from app.schemas.analytics import HabitAnalyticsResponse
+from app.services.analytics_service import compute_analytics
+
+
+def make_history(days: int, end: date) -> tuple[date, set[date], set[date]]:
+    """Return a start date and random completion and absence sets."""
+    rng = random.Random(days)
+    start = end - timedelta(days=days - 1)
+    completions, absences = set(), set()
+    for offset in range(days):
+        roll = rng.random()
+        if roll < 0.8:
+            completions.add(start + timedelta(days=offset))
+        elif roll < 0.85:
+            absences.add(start + timedelta(days=offset))
+    return start, completions, absences
+
+
+def main() -> None:
+    """Run the benchmark and print the best time per history length."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[365, 1825])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    end = date(2026, 1, 1)
+    for days in args.days:
+        start, completions, absences = make_history(days, end)
+
+        def run(
+            start: date = start,
+            completions: set[date] = completions,
+            absences: set[date] = absences,
+        ) -> bytes:
+            result = compute_analytics("h", start, end, start, completions, absences)
+            return dump_json(result, HabitAnalyticsResponse)
+
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat)) * 1000
+        print(f"{days:>6} days: {best:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark cold start: launching the server until /health first answers.
+
+Starts ``uvicorn app.main:app`` in a fresh process against a new database
+``--runs`` times and reports the time from launch to the first successful
+``GET /health``, plus the time to import ``app.main`` alone.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+
+def free_port() -> int:
+    """Return a TCP port that is free right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def time_to_health(directory: Path) -> float:
+    """Return seconds from launching the server to its first /health reply."""
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{directory / f'{port}.db'}",
+        "MAINTENANCE_ENABLED": "false",
+    }
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/health", timeout=1
+                ) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("server exited before serving /health") from None
+                time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def time_to_import() -> float:
+    """Return seconds for a fresh interpreter to import app.main."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Measure cold starts and print the medians."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        health = [time_to_health(Path(tmp)) for _ in range(args.runs)]
+    imports = [time_to_import() for _ in range(args.runs)]
+    print(f"median of {args.runs} runs")
+    print(f"  launch to first /health: {statistics.median(health) * 1000:7.0f} ms")
+    print(f"  import app.main:         {statistics.median(imports) * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark event loop stalls while all-time stats run for long histories.
+
+Seeds ``--habits`` habits with ``--years`` years of daily history, then
+computes every habit's best streak and analytics concurrently while a probe
+task measures
+how late the event loop wakes it, which is how long a check-in arriving at
+that moment would have waited. Runs once inline, once with a thread pool
+and once with a process pool.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_compute_pool --habits 8 --years 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import UTC, date, datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.compute_pool import compute_pool
+from app.core.database import build_engine, prepare_database
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.analytics_service import AnalyticsService
+from app.services.stats_service import StatsService
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how late each short sleep wakes up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def run(habits: int, years: int) -> None:
+    """Seed the database and time each pool configuration."""
+    engine = build_engine("sqlite+aiosqlite:///:memory:")
+    await prepare_database(engine)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    today = date.today()
+    days = [today - timedelta(days=offset) for offset in range(365 * years)]
+    habit_ids = []
+    async with session_factory() as session:
+        for _ in range(habits):
+            habit = Habit(
+                name="Benchmark",
+                created_at=datetime.combine(days[-1], datetime.min.time(), UTC),
+            )
+            session.add(habit)
+            await session.flush()
+            await session.execute(
+                insert(Completion),
+                [
+                    {"habit_pk": habit.pk, "completed_date": day}
+                    for day in days
+                    if day.toordinal() % 9
+                ],
+            )
+            habit_ids.append(habit.id)
+        await session.commit()
+
+    print(f"{habits} habits x {years} years, all-time stats for each concurrently")
+
+    async def all_time(habit_id: str) -> None:
+        async with session_factory() as session:
+            await StatsService(session).calculate_best_streak(habit_id)
+            await AnalyticsService(session).get_habit_analytics(habit_id)
+
+    kinds: list[tuple[str, Literal["thread", "process"], int]] = [
+        ("inline", "thread", 0),
+        ("thread pool", "thread", 2000),
+        ("process pool", "process", 2000),
+    ]
+    for label, kind, threshold in kinds:
+        compute_pool.shutdown()
+        compute_pool.kind, compute_pool.threshold = kind, threshold
+        # Start the workers outside the measurement
+        await all_time(habit_ids[0])
+        lags: list[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(lags, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(all_time(habit_id) for habit_id in habit_ids))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+        compute_pool.shutdown()
+        print(
+            f"  {label:<13} total {elapsed * 1000:6.0f} ms"
+            f"   loop lag p50 {statistics.median(lags) * 1000:5.1f} ms"
+            f"   max {max(lags) * 1000:6.1f} ms"
+        )
+    await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--habits", type=int, default=8)
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.habits, args.years))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark concurrent check-ins with and without group commit.
+
+Runs ``--writes`` concurrent completions against a fresh WAL database file,
+once committing each write in its own transaction and once through a
+``GroupCommitter``, and reports writes per second for each.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_group_commit --writes 2000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import Base, build_engine
+from app.models.habit import Habit
+from app.services.group_commit import GroupCommitter
+from app.services.habit_service import _add_completion
+
+
+async def run(writes: int, grouped: bool, directory: Path) -> float:
+    """Return writes per second for one mode."""
+    engine = build_engine(f"sqlite+aiosqlite:///{directory / f'{grouped}.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as session:
+        habit = Habit(name="Benchmark")
+        session.add(habit)
+        await session.commit()
+    days = [date(2000, 1, 1) + timedelta(days=i) for i in range(writes)]
+    committer = GroupCommitter(session_factory)
+
+    async def write_alone(day: date) -> None:
+        async with session_factory() as session:
+            await _add_completion(session, habit.id, day)
+            await session.commit()
+
+    async def write_grouped(day: date) -> None:
+        await committer.submit(lambda s: _add_completion(s, habit.id, day))
+
+    write = write_grouped if grouped else write_alone
+    start = time.perf_counter()
+    await asyncio.gather(*(write(day) for day in days))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return writes / elapsed
+
+
+async def main() -> None:
+    """Run both modes and print throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        alone = await run(args.writes, grouped=False, directory=Path(tmp))
+        grouped = await run(args.writes, grouped=True, directory=Path(tmp))
+    print(f"{args.writes} concurrent writes")
+    print(f"  per-request commit: {alone:8.0f} writes/s")
+    print(f"  group commit:       {grouped:8.0f} writes/s ({grouped / alone:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
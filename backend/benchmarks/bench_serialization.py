@@ -0,0 +1,121 @@
+"""Benchmark response serialization for large habit lists.
+
+Compares three ways of turning service results into a JSON body:
+
+* ``default``: what a ``response_model`` route does on the stdlib encoder
+  path: build models, revalidate them against the response model, dump to
+  Python and encode with ``json.dumps``.
+* ``construct``: build with ``model_construct`` and encode once. Skipping
+  validation at build time is *slower* on pydantic v2, because validation
+  runs in pydantic-core while ``model_construct`` runs in Python.
+* ``fast``: build validated models and encode once with pydantic-core's
+  ``dump_json``. This is what the API routes use.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization --habits 1000 5000
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.core.serialization import dump_json
+from app.schemas.stats import CompletionRate, HabitWithStatsResponse
+
+ResponseList = list[HabitWithStatsResponse]
+
+
+def make_rows(count: int) -> list[dict[str, Any]]:
+    """Build raw stats values as the service layer produces them."""
+    now = datetime.now(UTC)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Habit {i}",
+            "description": "Benchmark habit",
+            "created_at": now,
+            "updated_at": now,
+            "current_streak": i % 30,
+            "best_streak": i % 90,
+            "completion_rate": {"week": 71.4, "month": 63.3, "all_time": 58.2},
+            "completed_today": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def build(rows: list[dict[str, Any]]) -> ResponseList:
+    """Build response models the way StatsService does."""
+    return [
+        HabitWithStatsResponse(
+            **{**row, "completion_rate": CompletionRate(**row["completion_rate"])}
+        )
+        for row in rows
+    ]
+
+
+def default_path(rows: list[dict[str, Any]], adapter: TypeAdapter[Any]) -> bytes:
+    """Build, revalidate against the response model, then json.dumps."""
+    revalidated = adapter.validate_python(build(rows), from_attributes=True)
+    payload = adapter.dump_python(revalidated, mode="json")
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def construct_path(rows: list[dict[str, Any]]) -> bytes:
+    """Build without validation and serialize once."""
+    models = [
+        HabitWithStatsResponse.model_construct(
+            **{
+                **row,
+                "completion_rate": CompletionRate.model_construct(
+                    **row["completion_rate"]
+                ),
+            }
+        )
+        for row in rows
+    ]
+    return dump_json(models, ResponseList)
+
+
+def fast_path(rows: list[dict[str, Any]]) -> bytes:
+    """Build validated models and serialize once."""
+    return dump_json(build(rows), ResponseList)
+
+
+def best_of(func: Callable[[], bytes], repeat: int) -> float:
+    """Return the fastest of ``repeat`` single calls, in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print per-call timings."""
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--habits", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    adapter: TypeAdapter[Any] = TypeAdapter(ResponseList)
+    for count in args.habits:
+        rows = make_rows(count)
+        assert json.loads(default_path(rows, adapter)) == json.loads(fast_path(rows))
+
+        default = best_of(partial(default_path, rows, adapter), args.repeat)
+        construct = best_of(partial(construct_path, rows), args.repeat)
+        fast = best_of(partial(fast_path, rows), args.repeat)
+        print(
+            f"{count:>7} habits  default={default:8.2f} ms  "
+            f"construct={construct:8.2f} ms  fast={fast:8.2f} ms  "
+            f"speedup={default / fast:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
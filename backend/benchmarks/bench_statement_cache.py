@@ -0,0 +1,167 @@
+"""Benchmark per-call overhead of the hot single-habit service queries.
+
+Runs each query ``--calls`` times, once built with ``select()`` on every
+call as the services used to, once as a lambda statement and once as the
+prebuilt statement from ``app.services.statements``. A
+synchronous in-memory database is used so the time is the Python work of
+building, caching and executing the statement rather than SQLite's or the
+async driver's thread hand-off. Reports microseconds per call and the
+share of executions whose compiled form came from SQLAlchemy's cache.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_statement_cache --calls 10000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import Engine, Executable, create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.query_plans import QueryRecorder
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services import statements
+from app.services.purge import is_live
+
+TODAY = date.today()
+WEEK_AGO = TODAY - timedelta(days=6)
+
+Factory = Callable[[], Executable]
+
+
+def rebuilt_completion_dates(
+    habit_pk: int, start_date: date | None, end_date: date | None
+) -> Executable:
+    """Build the completion range query with optional bounds, per call."""
+    query = select(Completion.completed_date).where(Completion.habit_pk == habit_pk)
+    if start_date:
+        query = query.where(Completion.completed_date >= start_date)
+    if end_date:
+        query = query.where(Completion.completed_date <= end_date)
+    return query.order_by(Completion.completed_date)
+
+
+def queries(
+    habit_id: str,
+    habit_pk: int,
+) -> dict[str, tuple[Factory, Factory, Factory, dict[str, Any] | None]]:
+    """Return rebuilt, lambda and prebuilt statement factories per query.
+
+    The last item holds the parameters the prebuilt statement is run with.
+    """
+    day = {"habit_pk": habit_pk, "day": WEEK_AGO}
+    return {
+        "live habit": (
+            lambda: select(Habit).where(Habit.id == habit_id, is_live()),
+            lambda: lambda_stmt(
+                lambda: select(Habit).where(Habit.id == habit_id, is_live())
+            ),
+            lambda: statements.LIVE_HABIT,
+            {"habit_id": habit_id},
+        ),
+        "completion on day": (
+            lambda: select(Completion).where(
+                Completion.habit_pk == habit_pk, Completion.completed_date == WEEK_AGO
+            ),
+            lambda: lambda_stmt(
+                lambda: select(Completion).where(
+                    Completion.habit_pk == habit_pk,
+                    Completion.completed_date == WEEK_AGO,
+                )
+            ),
+            lambda: statements.COMPLETION_ON,
+            day,
+        ),
+        "absence on day": (
+            lambda: select(Absence).where(
+                Absence.habit_pk == habit_pk, Absence.absence_date == WEEK_AGO
+            ),
+            lambda: lambda_stmt(
+                lambda: select(Absence).where(
+                    Absence.habit_pk == habit_pk, Absence.absence_date == WEEK_AGO
+                )
+            ),
+            lambda: statements.ABSENCE_ON,
+            day,
+        ),
+        "completion dates": (
+            lambda: rebuilt_completion_dates(habit_pk, WEEK_AGO, TODAY),
+            lambda: lambda_stmt(
+                lambda: (
+                    select(Completion.completed_date)
+                    .where(
+                        Completion.habit_pk == habit_pk,
+                        Completion.completed_date.between(WEEK_AGO, TODAY),
+                    )
+                    .order_by(Completion.completed_date)
+                )
+            ),
+            lambda: statements.COMPLETION_DATES,
+            statements.date_range(habit_pk, WEEK_AGO, TODAY),
+        ),
+    }
+
+
+def time_calls(
+    engine: Engine,
+    session: Session,
+    build: Factory,
+    parameters: dict[str, Any] | None,
+    calls: int,
+) -> tuple[float, float]:
+    """Return microseconds per call and the share of cache hits."""
+    session.execute(build(), parameters).all()
+    with QueryRecorder(engine) as recorder:
+        start = time.perf_counter()
+        for _ in range(calls):
+            session.execute(build(), parameters).all()
+        elapsed = time.perf_counter() - start
+    return elapsed / calls * 1e6, recorder.cache_hits / max(recorder.executed, 1)
+
+
+def main() -> None:
+    """Parse arguments, time every query and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        habit = Habit(name="Benchmark")
+        session.add(habit)
+        session.flush()
+        for offset in range(365):
+            day = TODAY - timedelta(days=offset)
+            if offset % 10:
+                session.add(Completion(habit_pk=habit.pk, completed_date=day))
+            else:
+                session.add(Absence(habit_pk=habit.pk, absence_date=day))
+        session.commit()
+
+        print(f"{args.calls} calls per query, us/call (share served from cache)")
+        print(f"  {'query':<18} {'rebuilt':>13} {'lambda':>13} {'prebuilt':>13}")
+        for name, (rebuilt, lambda_built, prebuilt, parameters) in queries(
+            habit.id, habit.pk
+        ).items():
+            results = [
+                time_calls(engine, session, rebuilt, None, args.calls),
+                time_calls(engine, session, lambda_built, None, args.calls),
+                time_calls(engine, session, prebuilt, parameters, args.calls),
+            ]
+            print(
+                f"  {name:<18}"
+                + "".join(f" {us:6.1f} ({hits:4.0%})" for us, hits in results)
+            )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
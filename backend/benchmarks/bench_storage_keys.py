@@ -0,0 +1,84 @@
+"""Benchmark completion and absence storage size and insert throughput.
+
+Fills a fresh database file with ``--habits`` habits of ``--days`` days of
+history each, one day in ten an absence and the rest completions, inserting
+one habit per transaction, and reports rows per second and the file size.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_storage_keys --habits 100 --days 3650
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import Base, build_engine
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+
+
+async def run(habits: int, days: int, path: Path) -> float:
+    """Fill the database and return rows inserted per second."""
+    engine = build_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    dates = [date(2016, 1, 1) + timedelta(days=i) for i in range(days)]
+
+    elapsed = 0.0
+    for _ in range(habits):
+        async with session_factory() as session:
+            habit = Habit(name="Benchmark")
+            session.add(habit)
+            await session.commit()
+            start = time.perf_counter()
+            await session.execute(
+                insert(Completion),
+                [
+                    {"habit_pk": habit.pk, "completed_date": day}
+                    for i, day in enumerate(dates)
+                    if i % 10
+                ],
+            )
+            await session.execute(
+                insert(Absence),
+                [
+                    {"habit_pk": habit.pk, "absence_date": day}
+                    for i, day in enumerate(dates)
+                    if not i % 10
+                ],
+            )
+            await session.commit()
+            elapsed += time.perf_counter() - start
+    await engine.dispose()
+    return habits * days / elapsed
+
+
+async def main() -> None:
+    """Fill a database and print throughput and size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--habits", type=int, default=100)
+    parser.add_argument("--days", type=int, default=3650)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "keys.db"
+        rate = await run(args.habits, args.days, path)
+        size = path.stat().st_size
+    print(f"{args.habits} habits x {args.days} days")
+    print(f"  insert: {rate:8.0f} rows/s")
+    print(f"  size:   {size / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
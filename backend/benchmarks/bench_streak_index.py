@@ -0,0 +1,65 @@
+"""Benchmark best streak updates after backfilling or undoing past days.
+
+For each history length, toggles ``--toggles`` random past days and after
+each one recomputes the best streak twice: by rescanning every day with
+``compute_best_streak`` and by updating a ``StreakTree`` and reading its
+root. Reports microseconds per toggle for both.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_streak_index --days 365 3650 36500
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.core.history_index import COMPLETED
+from app.core.streak_index import StreakTree
+from app.services.stats_service import compute_best_streak
+from benchmarks.bench_analytics import make_history
+
+
+def main() -> None:
+    """Run the benchmark and print the time per toggle for each length."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[365, 3650, 36500])
+    parser.add_argument("--toggles", type=int, default=200)
+    args = parser.parse_args()
+
+    end = date(2026, 1, 1)
+    print(f"{args.toggles} toggles per history, us/toggle")
+    print(f"  {'days':>6} {'rescan':>10} {'tree':>8}")
+    for days in args.days:
+        start, completions, absences = make_history(days, end)
+        rng = random.Random(days)
+        toggled = [
+            start + timedelta(days=rng.randrange(days)) for _ in range(args.toggles)
+        ]
+        tree = StreakTree(start, end, completions, absences)
+
+        rescans = updates = 0.0
+        for day in toggled:
+            value = day not in completions
+            if value:
+                completions.add(day)
+            else:
+                completions.discard(day)
+
+            started = time.perf_counter()
+            scanned = compute_best_streak(completions, absences, start, end)
+            rescans += time.perf_counter() - started
+
+            started = time.perf_counter()
+            tree.set_flag(day, COMPLETED, value)
+            indexed = tree.best_streak(end)
+            updates += time.perf_counter() - started
+            assert scanned == indexed
+
+        rescan_us, tree_us = rescans / args.toggles * 1e6, updates / args.toggles * 1e6
+        print(f"  {days:>6} {rescan_us:>10.1f} {tree_us:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
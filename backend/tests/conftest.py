@@ -4,18 +4,16 @@ from collections.abc import AsyncGenerator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import Base, get_db
+from app.core.database import Base, build_engine, get_db, get_session_factory
 from app.main import app
 
 # Use in-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-test_engine = create_async_engine(
-    TEST_DATABASE_URL,
-    echo=False,
-)
+# Built like the app's engine so foreign keys are enforced
+test_engine = build_engine(TEST_DATABASE_URL)
 
 TestAsyncSessionLocal = async_sessionmaker(
     test_engine,
@@ -45,6 +43,8 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Shared computations open their own sessions on the test database
+    app.dependency_overrides[get_session_factory] = lambda: TestAsyncSessionLocal
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
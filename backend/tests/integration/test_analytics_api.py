@@ -0,0 +1,79 @@
+"""Integration tests for the habit analytics endpoint."""
+
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.fixture
+async def habit_id(client: AsyncClient) -> str:
+    """Create a habit and return its ID."""
+    response = await client.post("/api/habits", json={"name": "Stretch"})
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_get_analytics(client: AsyncClient, habit_id: str) -> None:
+    """Test analytics default to the habit's life so far."""
+    today = date.today()
+    await client.post(f"/api/habits/{habit_id}/complete", json={"date": str(today)})
+
+    response = await client.get(f"/api/habits/{habit_id}/analytics")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["start_date"] == str(today)
+    assert data["end_date"] == str(today)
+    assert data["completed"] == 1
+    assert data["rate"] == 100.0
+    assert data["streaks"] == [{"length": 1, "count": 1}]
+    assert data["heatmap"][0]["days"] == [1]
+
+
+@pytest.mark.asyncio
+async def test_analytics_reflect_new_writes(client: AsyncClient, habit_id: str) -> None:
+    """Test a cached analytics body is replaced after a write."""
+    url = f"/api/habits/{habit_id}/analytics"
+    assert (await client.get(url)).json()["completed"] == 0
+
+    await client.post(f"/api/habits/{habit_id}/complete", json={})
+    assert (await client.get(url)).json()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analytics_invalid_range(client: AsyncClient, habit_id: str) -> None:
+    """Test a start after the end is rejected."""
+    today = date.today()
+    response = await client.get(
+        f"/api/habits/{habit_id}/analytics",
+        params={"start_date": str(today), "end_date": str(today - timedelta(1))},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_analytics_bounds_are_limited(client: AsyncClient, habit_id: str) -> None:
+    """Test long ranges are rejected and ends past today are clamped."""
+    url = f"/api/habits/{habit_id}/analytics"
+    today = date.today()
+
+    response = await client.get(url, params={"start_date": "0001-01-02"})
+    assert response.status_code == 400
+
+    response = await client.get(url, params={"end_date": "2126-01-01"})
+    assert response.status_code == 200
+    assert response.json()["end_date"] == str(today)
+    assert len(response.json()["rolling"]) == 1
+
+    response = await client.get(
+        url, params={"start_date": "0001-01-02", "end_date": "0001-01-05"}
+    )
+    assert response.status_code == 200
+    assert response.json()["rolling"] == []
+
+
+@pytest.mark.asyncio
+async def test_analytics_not_found(client: AsyncClient) -> None:
+    """Test analytics for a missing habit."""
+    response = await client.get("/api/habits/missing/analytics")
+    assert response.status_code == 404
@@ -0,0 +1,97 @@
+"""Integration tests for the application factory."""
+
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, text
+
+from app.core.compute_pool import compute_pool
+from app.core.config import Settings
+from app.main import create_app
+from app.models.habit_purge import HabitPurge
+
+
+@pytest.mark.asyncio
+async def test_app_opens_its_database_lazily(tmp_path: Path) -> None:
+    """Test creating an app opens nothing until startup, then serves requests."""
+    database = tmp_path / "factory.db"
+    app = create_app(
+        Settings(
+            database_url=f"sqlite+aiosqlite:///{database}", maintenance_enabled=False
+        )
+    )
+    assert not database.exists()
+
+    async with app.router.lifespan_context(app):
+        assert database.exists()
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/health")).status_code == 200
+            response = await client.post("/api/habits", json={"name": "Factory"})
+            assert response.status_code == 201
+            assert len((await client.get("/api/habits")).json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_apps_with_different_settings_are_independent(tmp_path: Path) -> None:
+    """Test two apps in one process each use their own database."""
+    apps = [
+        create_app(
+            Settings(
+                database_url=f"sqlite+aiosqlite:///{tmp_path / name}.db",
+                maintenance_enabled=False,
+            )
+        )
+        for name in ("first", "second")
+    ]
+    for index, app in enumerate(apps):
+        async with app.router.lifespan_context(app):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as ac:
+                for _ in range(index + 1):
+                    await ac.post("/api/habits", json={"name": "Habit"})
+                assert len((await ac.get("/api/habits")).json()) == index + 1
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_follows_the_app_settings(tmp_path: Path) -> None:
+    """Test deletes are soft when the app, not the global settings, says so."""
+    app = create_app(
+        Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'soft.db'}",
+            maintenance_enabled=False,
+            soft_delete_habits=True,
+        )
+    )
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            habit = (await ac.post("/api/habits", json={"name": "Soft"})).json()
+            assert (await ac.delete(f"/api/habits/{habit['id']}")).status_code == 204
+            assert (await ac.get(f"/api/habits/{habit['id']}")).status_code == 404
+        async with app.state.databases.session_factory() as session:
+            purges = await session.scalar(select(func.count()).select_from(HabitPurge))
+        assert purges == 1
+
+
+@pytest.mark.asyncio
+async def test_app_settings_reach_engine_and_leave_shared_pool(
+    tmp_path: Path,
+) -> None:
+    """Test connection pragmas follow the app and its shutdown spares the pool."""
+    app = create_app(
+        Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'rollback.db'}",
+            maintenance_enabled=False,
+            sqlite_wal=False,
+        )
+    )
+    executor = compute_pool._get_executor()
+
+    async with app.router.lifespan_context(app):
+        async with app.state.databases.engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        assert journal_mode == "delete"
+
+    assert compute_pool._executor is executor
@@ -0,0 +1,54 @@
+"""Integration tests for the API with run-length completion storage."""
+
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def runs_storage(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Store completions as runs for every test in this module."""
+    monkeypatch.setattr(settings, "completion_storage", "runs")
+
+
+@pytest.fixture
+async def habit_id(client: AsyncClient) -> str:
+    """Create a habit and return its ID."""
+    response = await client.post("/api/habits", json={"name": "Run"})
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_history_and_stats_read_runs(client: AsyncClient, habit_id: str) -> None:
+    """Test completions, undo, history and stats all work on runs."""
+    today = date.today()
+    days = [today - timedelta(days=offset) for offset in range(5)]
+    for day in days:
+        response = await client.post(
+            f"/api/habits/{habit_id}/complete", json={"date": str(day)}
+        )
+        assert response.status_code == 201
+        assert response.json()["date"] == str(day)
+
+    response = await client.post(
+        f"/api/habits/{habit_id}/complete", json={"date": str(today)}
+    )
+    assert response.status_code == 201
+
+    response = await client.delete(
+        f"/api/habits/{habit_id}/completions/{today - timedelta(days=2)}"
+    )
+    assert response.status_code == 204
+
+    response = await client.get(f"/api/habits/{habit_id}/completions")
+    expected = sorted(str(day) for day in days if day != today - timedelta(days=2))
+    assert response.json()["completions"] == expected
+
+    response = await client.get("/api/habits")
+    (data,) = response.json()
+    assert data["current_streak"] == 2
+    assert data["best_streak"] == 2
+    assert data["completed_today"] is True
@@ -0,0 +1,37 @@
+"""Integration tests for change events published by API writes."""
+
+import asyncio
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.events import event_broker
+
+
+@pytest.mark.asyncio
+async def test_service_writes_publish_events(client: AsyncClient) -> None:
+    """Test committed API writes publish change events with versions."""
+    with event_broker.subscribe("default") as subscription:
+        response = await client.post("/api/habits", json={"name": "Evented"})
+        habit_id = response.json()["id"]
+        await client.post(
+            f"/api/habits/{habit_id}/complete", json={"date": "2024-03-01"}
+        )
+        # Idempotent repeat does not publish
+        await client.post(
+            f"/api/habits/{habit_id}/complete", json={"date": "2024-03-01"}
+        )
+        await client.delete(f"/api/habits/{habit_id}/completions/2024-03-01")
+        await asyncio.sleep(0)
+
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+
+    assert [(e.type, e.version) for e in events] == [
+        ("habit.created", 1),
+        ("completion.added", 2),
+        ("completion.removed", 3),
+    ]
+    assert events[1].date == date(2024, 3, 1)
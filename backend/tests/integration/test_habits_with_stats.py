@@ -1,9 +1,14 @@
 """Integration tests for enhanced habits endpoint with statistics."""
 
+import asyncio
 from datetime import date, timedelta
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.stats import HabitWithStatsResponse
+from app.services.stats_service import StatsService
 
 
 @pytest.mark.asyncio
@@ -175,3 +180,71 @@ async def test_list_multiple_habits_with_stats(client: AsyncClient) -> None:
 
     assert habit1["current_streak"] == 3
     assert habit2["current_streak"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_list_requests_share_one_computation(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a refresh storm of identical list requests computes stats once."""
+    await client.post("/api/habits", json={"name": "Storm"})
+    computed = StatsService.get_all_habits_with_stats
+    calls = 0
+
+    async def counted(
+        self: StatsService, windows: list[str] | None = None
+    ) -> list[HabitWithStatsResponse]:
+        nonlocal calls
+        calls += 1
+        # The shared computation must not borrow one request's session
+        assert self.session is not db_session
+        await asyncio.sleep(0.05)
+        return await computed(self, windows)
+
+    monkeypatch.setattr(StatsService, "get_all_habits_with_stats", counted)
+    responses = await asyncio.gather(*(client.get("/api/habits") for _ in range(8)))
+
+    assert calls == 1
+    assert all(response.json() == responses[0].json() for response in responses)
+    assert responses[0].json()[0]["name"] == "Storm"
+
+    # A write changes the data version, so the next read computes again
+    await client.post("/api/habits", json={"name": "After"})
+    assert len((await client.get("/api/habits")).json()) == 2
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_list_habits_with_rate_windows(client: AsyncClient) -> None:
+    """Test extra rate windows and a custom start/end window are returned."""
+    create_response = await client.post("/api/habits", json={"name": "Windowed"})
+    habit_id = create_response.json()["id"]
+    today = date.today()
+    for offset in range(4):
+        await client.post(
+            f"/api/habits/{habit_id}/complete",
+            json={"date": str(today - timedelta(days=offset))},
+        )
+    start = (today - timedelta(days=7)).isoformat()
+
+    response = await client.get(
+        "/api/habits", params={"windows": "2,ytd", "start": start}
+    )
+
+    assert response.status_code == 200
+    windows = response.json()[0]["completion_rate"]["windows"]
+    assert list(windows) == ["2", "ytd", f"{start}.."]
+    assert windows["2"] == 100.0
+    assert windows[f"{start}.."] == 50.0
+    assert (await client.get("/api/habits")).json()[0]["completion_rate"][
+        "windows"
+    ] is None
+
+
+@pytest.mark.asyncio
+async def test_list_habits_rejects_invalid_windows(client: AsyncClient) -> None:
+    """Test an unparseable window is a bad request."""
+    response = await client.get("/api/habits", params={"windows": "fortnight"})
+
+    assert response.status_code == 400
+    assert "fortnight" in response.json()["detail"]
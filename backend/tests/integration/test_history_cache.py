@@ -0,0 +1,67 @@
+"""Integration tests for cached history responses."""
+
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.fixture
+async def habit_id(client: AsyncClient) -> str:
+    """Create a habit with enough history to be precompressed."""
+    response = await client.post("/api/habits", json={"name": "Cached Habit"})
+    habit_id: str = response.json()["id"]
+    start = date(2024, 1, 1)
+    for i in range(100):
+        await client.post(
+            f"/api/habits/{habit_id}/complete",
+            json={"date": str(start + timedelta(days=i))},
+        )
+    return habit_id
+
+
+@pytest.mark.asyncio
+async def test_history_served_gzipped(client: AsyncClient, habit_id: str) -> None:
+    """Test large history bodies are served gzip-encoded when accepted."""
+    response = await client.get(
+        f"/api/habits/{habit_id}/completions",
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["completions"]) == 100
+
+    response = await client.get(
+        f"/api/habits/{habit_id}/completions",
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["completions"]) == 100
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_history(
+    client: AsyncClient, habit_id: str
+) -> None:
+    """Test completions and deletes are visible after a cached read."""
+    url = f"/api/habits/{habit_id}/completions"
+    params = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+    assert len((await client.get(url, params=params)).json()["completions"]) == 100
+
+    await client.post(f"/api/habits/{habit_id}/complete", json={"date": "2024-06-01"})
+    assert len((await client.get(url, params=params)).json()["completions"]) == 101
+
+    await client.delete(f"/api/habits/{habit_id}/completions/2024-06-01")
+    assert len((await client.get(url, params=params)).json()["completions"]) == 100
+
+
+@pytest.mark.asyncio
+async def test_deleted_habit_history_not_served(
+    client: AsyncClient, habit_id: str
+) -> None:
+    """Test cached history disappears when the habit is deleted."""
+    url = f"/api/habits/{habit_id}/absences"
+    assert (await client.get(url)).status_code == 200
+
+    await client.delete(f"/api/habits/{habit_id}")
+    assert (await client.get(url)).status_code == 404
@@ -0,0 +1,79 @@
+"""Integration tests for the cross-habit daily progress endpoint."""
+
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.habit import Habit
+
+
+async def create_habit(
+    client: AsyncClient, db_session: AsyncSession, name: str, created: date
+) -> str:
+    """Create a habit and backdate its creation."""
+    response = await client.post("/api/habits", json={"name": name})
+    habit_id: str = response.json()["id"]
+    await db_session.execute(
+        update(Habit)
+        .where(Habit.id == habit_id)
+        .values(created_at=datetime.combine(created, datetime.min.time(), UTC))
+    )
+    await db_session.commit()
+    return habit_id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["rows", "runs"])
+async def test_daily_progress(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    storage: str,
+) -> None:
+    """Test per-day counts exclude absences and habits not yet created."""
+    monkeypatch.setattr(settings, "completion_storage", storage)
+    d1, d2, d3 = date(2026, 5, 1), date(2026, 5, 2), date(2026, 5, 3)
+    first = await create_habit(client, db_session, "First", d1)
+    second = await create_habit(client, db_session, "Second", d2)
+
+    for habit_id, day in [(first, d1), (first, d2), (second, d2), (second, d3)]:
+        await client.post(f"/api/habits/{habit_id}/complete", json={"date": str(day)})
+    await client.post(f"/api/habits/{first}/absences", json={"date": str(d3)})
+
+    response = await client.get(
+        "/api/progress",
+        params={"start_date": str(d1 - timedelta(days=1)), "end_date": str(d3)},
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"date": "2026-04-30", "completed": 0, "applicable": 0},
+        {"date": "2026-05-01", "completed": 1, "applicable": 1},
+        {"date": "2026-05-02", "completed": 2, "applicable": 2},
+        {"date": "2026-05-03", "completed": 1, "applicable": 1},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_daily_progress_defaults_to_last_30_days(client: AsyncClient) -> None:
+    """Test the default range ends today."""
+    response = await client.get("/api/progress")
+    data = response.json()
+    assert len(data) == 30
+    assert data[-1]["date"] == str(date.today())
+
+
+@pytest.mark.asyncio
+async def test_daily_progress_invalid_range(client: AsyncClient) -> None:
+    """Test inverted and oversized ranges are rejected."""
+    response = await client.get(
+        "/api/progress", params={"start_date": "2026-02-01", "end_date": "2026-01-01"}
+    )
+    assert response.status_code == 400
+    response = await client.get(
+        "/api/progress", params={"start_date": "2000-01-01", "end_date": "2026-01-01"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,57 @@
+"""Integration tests for tenant routing through the API."""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import Settings
+from app.main import create_app
+
+
+@pytest.fixture
+async def tenant_client(tmp_path: Path) -> AsyncGenerator[AsyncClient, None]:
+    """Create a client against the real get_db in multi-tenant mode."""
+    app = create_app(
+        Settings(
+            multi_tenant=True,
+            tenant_database_url_template=f"sqlite+aiosqlite:///{tmp_path}/{{tenant}}.db",
+            maintenance_enabled=False,
+        )
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+    await app.state.databases.dispose()
+
+
+@pytest.mark.asyncio
+async def test_tenants_see_only_their_habits(tenant_client: AsyncClient) -> None:
+    """Test each tenant reads and writes its own database."""
+    alice = {"X-Tenant-ID": "alice"}
+    bob = {"X-Tenant-ID": "bob"}
+
+    response = await tenant_client.post(
+        "/api/habits", json={"name": "Alice Habit"}, headers=alice
+    )
+    assert response.status_code == 201
+    habit_id = response.json()["id"]
+
+    assert len((await tenant_client.get("/api/habits", headers=alice)).json()) == 1
+    assert (await tenant_client.get("/api/habits", headers=bob)).json() == []
+
+    response = await tenant_client.get(
+        f"/api/habits/{habit_id}/completions", headers=bob
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_missing_tenant_rejected(tenant_client: AsyncClient) -> None:
+    """Test requests without a valid tenant header are rejected."""
+    assert (await tenant_client.get("/api/habits")).status_code == 400
+    response = await tenant_client.get(
+        "/api/habits", headers={"X-Tenant-ID": "../escape"}
+    )
+    assert response.status_code == 400
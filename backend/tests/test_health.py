@@ -12,6 +12,16 @@ async def test_health_check(client: AsyncClient) -> None:
     assert response.json() == {"status": "healthy"}
 
 
+@pytest.mark.asyncio
+async def test_compute_pool_health(client: AsyncClient) -> None:
+    """Test the compute pool's saturation and queue wait are reported."""
+    response = await client.get("/health/compute")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["in_flight"] == 0
+    assert {"saturated", "max_queue_wait_ms", "mean_queue_wait_ms"} <= set(report)
+
+
 @pytest.mark.asyncio
 async def test_api_root(client: AsyncClient) -> None:
     """Test the API root endpoint."""
@@ -0,0 +1,99 @@
+"""Unit tests for single-pass habit analytics."""
+
+from datetime import date, timedelta
+
+from app.services.analytics_service import compute_analytics
+from app.services.stats_service import completion_percentage
+
+START = date(2026, 1, 5)  # a Monday
+
+
+def day(offset: int) -> date:
+    """Return a date relative to the start of the range."""
+    return START + timedelta(days=offset)
+
+
+def test_streaks_gaps_and_absences() -> None:
+    """Test absences bridge streaks and gaps without counting."""
+    # done done absent done | miss miss absent miss | done
+    completions = {day(0), day(1), day(3), day(8)}
+    absences = {day(2), day(6)}
+
+    result = compute_analytics("h", START, day(8), START, completions, absences)
+
+    assert result.completed == 4
+    assert result.applicable == 7
+    assert result.rate == 57.1
+    assert result.longest_gap == 3
+    assert [(b.length, b.count) for b in result.streaks] == [(1, 1), (3, 1)]
+    assert result.heatmap[0].days == [1, 1, -1, 1, 0, 0, -1, 0, 1]
+
+
+def test_weekday_profile() -> None:
+    """Test completions are grouped by day of the week."""
+    completions = {day(offset) for offset in range(0, 28, 7)}  # every Monday
+
+    result = compute_analytics("h", START, day(27), START, completions, set())
+
+    monday, tuesday = result.weekdays[0], result.weekdays[1]
+    assert (monday.completed, monday.applicable, monday.rate) == (4, 4, 100.0)
+    assert (tuesday.completed, tuesday.applicable, tuesday.rate) == (0, 4, 0.0)
+
+
+def test_rolling_rates_use_history_before_range() -> None:
+    """Test trailing windows include days before the range but not creation."""
+    created = day(-40)
+    completions = {day(offset) for offset in range(-40, 0)}
+
+    result = compute_analytics("h", START, day(1), created, completions, set())
+
+    first = result.rolling[0]
+    assert first.date == START
+    assert first.week == round(6 / 7 * 100, 1)
+    assert first.month == round(29 / 30 * 100, 1)
+
+    fresh = compute_analytics("h", START, START, START, {START}, set())
+    assert fresh.rolling[0].week == 100.0
+
+
+def test_absent_only_window_has_no_rate() -> None:
+    """Test a window made only of absences has an undefined rate."""
+    result = compute_analytics("h", START, START, START, set(), {START})
+
+    assert result.rolling[0].week is None
+    assert result.rate == 0.0
+    assert result.heatmap[0].days == [-1]
+
+
+def test_heatmap_splits_by_year() -> None:
+    """Test the heatmap starts a new row at each calendar year."""
+    start = date(2025, 12, 30)
+    result = compute_analytics("h", start, date(2026, 1, 2), start, set(), set())
+
+    assert [(row.year, row.start, len(row.days)) for row in result.heatmap] == [
+        (2025, date(2025, 12, 30), 2),
+        (2026, date(2026, 1, 1), 2),
+    ]
+
+
+def test_range_is_clamped_to_creation() -> None:
+    """Test days before the habit existed are not reported."""
+    result = compute_analytics("h", day(-10), day(1), START, {START}, set())
+
+    assert result.start_date == START
+    assert len(result.rolling) == 2
+    assert result.applicable == 2
+
+
+def test_completed_absence_day_matches_stats_rates() -> None:
+    """Test a day with a completion and an absence is rated like StatsService."""
+    completions = {day(0), day(1), day(2)}
+    absences = {day(1), day(3)}
+
+    result = compute_analytics("h", START, day(4), START, completions, absences)
+
+    assert (result.completed, result.applicable) == (3, 3)
+    assert result.rate == round(completion_percentage(3, 2, START, day(4)), 1)
+    assert result.rolling[-1].week == result.rate
+    assert result.heatmap[0].days == [1, 1, 1, -1, 0]
+    assert [(b.length, b.count) for b in result.streaks] == [(3, 1)]
@@ -0,0 +1,185 @@
+"""Unit tests for archival of old history."""
+
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import data_versions
+from app.core.config import settings
+from app.core.rate_index import rate_index
+from app.core.tenancy import DEFAULT_TENANT
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.archive import (
+    archive_cutoff,
+    archive_habit,
+    archive_history,
+    decode_absences,
+    decode_days,
+    encode_absences,
+    encode_days,
+)
+from app.services.habit_service import HabitService
+from app.services.stats_service import StatsService
+
+TODAY = date.today()
+CUTOFF = archive_cutoff(TODAY, 730)
+FIRST_DAY = CUTOFF - timedelta(days=800)
+
+
+@pytest.fixture(autouse=True)
+def enable_archive(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Archive and read through archives for every test in this module."""
+    monkeypatch.setattr(settings, "archive_enabled", True)
+
+
+async def add_history(session: AsyncSession, name: str) -> str:
+    """Create a habit with an irregular history reaching today."""
+    habit = Habit(
+        name=name, created_at=datetime.combine(FIRST_DAY, datetime.min.time(), UTC)
+    )
+    session.add(habit)
+    await session.flush()
+    day, index = FIRST_DAY, 0
+    while day <= TODAY:
+        long_streak = CUTOFF - timedelta(days=20) <= day <= CUTOFF + timedelta(days=5)
+        if long_streak or TODAY - day < timedelta(days=10) or index % 7 not in (3, 5):
+            session.add(Completion(habit_pk=habit.pk, completed_date=day))
+        elif index % 13 == 0:
+            session.add(
+                Absence(
+                    habit_pk=habit.pk,
+                    absence_date=day,
+                    reason="away",
+                )
+            )
+        day += timedelta(days=1)
+        index += 1
+    await session.commit()
+    return habit.id
+
+
+async def snapshot(session: AsyncSession, habit_id: str) -> tuple[object, ...]:
+    """Return everything the API derives from a habit's history."""
+    habits = HabitService(session)
+    stats = StatsService(session)
+    return (
+        await habits.get_completions(habit_id),
+        await habits.get_completions(habit_id, CUTOFF - timedelta(days=3), CUTOFF),
+        await habits.get_absences(habit_id),
+        await stats.calculate_current_streak(habit_id),
+        await stats.calculate_best_streak(habit_id),
+        await stats.calculate_completion_rate(habit_id),
+        await stats.get_daily_progress(FIRST_DAY, TODAY),
+    )
+
+
+def test_encode_round_trip() -> None:
+    """Test bitmaps and absence blobs decode to what was encoded."""
+    days = {date(2024, 1, 1), date(2024, 2, 29), date(2024, 12, 31)}
+    assert decode_days(2024, encode_days(2024, days)) == days
+    assert decode_days(2023, encode_days(2023, set())) == set()
+
+    absences = {date(2023, 3, 1): "sick", date(2023, 12, 31): None}
+    assert decode_absences(2023, encode_absences(2023, absences)) == absences
+
+
+@pytest.mark.asyncio
+async def test_archival_preserves_history_and_stats(db_session: AsyncSession) -> None:
+    """Test archiving moves old rows without changing any derived value."""
+    habit_id = await add_history(db_session, "Read")
+    before = await snapshot(db_session, habit_id)
+
+    session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    moved = await archive_history(session_factory, TODAY)
+    db_session.expire_all()
+
+    assert moved > 0
+    result = await db_session.execute(
+        select(func.min(Completion.completed_date))
+        .join(Habit)
+        .where(Habit.id == habit_id)
+    )
+    assert result.scalar_one() >= CUTOFF
+    assert await snapshot(db_session, habit_id) == before
+    assert await archive_history(session_factory, TODAY) == 0
+
+
+@pytest.mark.asyncio
+async def test_archival_rebuilds_indexed_rates(db_session: AsyncSession) -> None:
+    """Test archiving drops a habit's rate index entry and rates still match."""
+    habit_id = await add_history(db_session, "Read")
+    stats = StatsService(db_session)
+    windows = ["30", "ytd", "all", f"{FIRST_DAY}..{CUTOFF}"]
+    before = await stats.calculate_window_rates(habit_id, windows)
+    indexed = rate_index.get(DEFAULT_TENANT, habit_id, data_versions.get(habit_id))
+    assert indexed is not None
+
+    session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    assert await archive_history(session_factory, TODAY) > 0
+    db_session.expire_all()
+
+    version = data_versions.get(habit_id)
+    assert rate_index.get(DEFAULT_TENANT, habit_id, version) is None
+    assert await stats.calculate_window_rates(habit_id, windows) == before
+    rebuilt = rate_index.get(DEFAULT_TENANT, habit_id, version)
+    assert rebuilt is not None and rebuilt is not indexed
+
+
+@pytest.mark.asyncio
+async def test_current_streak_continues_into_archive(
+    db_session: AsyncSession,
+) -> None:
+    """Test a streak running across the archive boundary is counted in full."""
+    habit = Habit(name="Walk")
+    db_session.add(habit)
+    await db_session.flush()
+    day = CUTOFF - timedelta(days=10)
+    while day <= TODAY:
+        db_session.add(Completion(habit_pk=habit.pk, completed_date=day))
+        day += timedelta(days=1)
+    await db_session.commit()
+
+    await archive_habit(db_session, habit.id, CUTOFF)
+    await db_session.commit()
+
+    stats = StatsService(db_session)
+    expected = (TODAY - CUTOFF).days + 11
+    assert await stats.calculate_current_streak(habit.id) == expected
+    assert await stats.calculate_best_streak(habit.id) == expected
+
+
+@pytest.mark.asyncio
+async def test_writes_to_archived_dates_match_hot_writes(
+    db_session: AsyncSession,
+) -> None:
+    """Test edits to archived days behave like edits to hot rows."""
+    archived_id = await add_history(db_session, "Archived")
+    hot_id = await add_history(db_session, "Hot")
+    await archive_habit(db_session, archived_id, CUTOFF)
+    await db_session.commit()
+
+    service = HabitService(db_session)
+    missed = CUTOFF - timedelta(days=200)
+    while missed in await service.get_completions(hot_id, missed, missed):
+        missed += timedelta(days=1)
+    done = CUTOFF - timedelta(days=1)
+    for habit_id in (archived_id, hot_id):
+        completion = await service.complete_habit(habit_id, missed)
+        assert completion is not None and completion.completed_date == missed
+        again = await service.complete_habit(habit_id, missed)
+        assert again is not None and again.completed_date == missed
+        assert await service.delete_completion(habit_id, done)
+        assert not await service.delete_completion(habit_id, done)
+        assert await service.get_completion(habit_id, done) is None
+
+        await service.create_absence(habit_id, done, "trip")
+        absence = await service.get_absence(habit_id, done)
+        assert absence is not None and absence.reason == "trip"
+        assert await service.delete_absence(habit_id, done)
+        await service.create_absence(habit_id, done, "trip")
+
+    assert await snapshot(db_session, archived_id) == await snapshot(db_session, hot_id)
@@ -0,0 +1,200 @@
+"""Unit tests for run-length completion storage."""
+
+import asyncio
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import Base, build_engine
+from app.models.completion import Completion
+from app.models.completion_run import CompletionRun
+from app.models.habit import Habit
+from app.services.completion_runs import (
+    add_day,
+    convert_rows_to_runs,
+    convert_runs_to_rows,
+    count_days,
+    expand_runs,
+    get_runs,
+    remove_day,
+)
+from app.services.statements import habit_pk
+
+D = date(2026, 3, 10)
+
+
+def day(offset: int) -> date:
+    """Return a date relative to the fixed test date."""
+    return D + timedelta(days=offset)
+
+
+@pytest.fixture
+async def habit_id(db_session: AsyncSession) -> str:
+    """Create a habit and return its id."""
+    habit = Habit(name="Meditate")
+    db_session.add(habit)
+    await db_session.commit()
+    return habit.id
+
+
+async def runs_of(session: AsyncSession, habit_id: str) -> list[tuple[int, int]]:
+    """Return stored runs as day offsets."""
+    return [
+        ((start - D).days, (end - D).days)
+        for start, end in await get_runs(session, habit_id)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_add_day_extends_and_merges_runs(
+    db_session: AsyncSession, habit_id: str
+) -> None:
+    """Test completing days grows runs and joins neighbours."""
+    for offset in (0, 1, 3, 4):
+        assert await add_day(db_session, habit_id, day(offset)) is True
+        await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(0, 1), (3, 4)]
+
+    assert await add_day(db_session, habit_id, day(2)) is True
+    await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(0, 4)]
+
+    assert await add_day(db_session, habit_id, day(2)) is False
+    assert await add_day(db_session, habit_id, day(-1)) is True
+    await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(-1, 4)]
+
+
+@pytest.mark.asyncio
+async def test_remove_day_shrinks_and_splits_runs(
+    db_session: AsyncSession, habit_id: str
+) -> None:
+    """Test undoing days trims run ends and splits runs in the middle."""
+    for offset in range(7):
+        await add_day(db_session, habit_id, day(offset))
+    await db_session.commit()
+
+    assert await remove_day(db_session, habit_id, day(3)) is True
+    await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(0, 2), (4, 6)]
+
+    assert await remove_day(db_session, habit_id, day(0)) is True
+    assert await remove_day(db_session, habit_id, day(6)) is True
+    await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(1, 2), (4, 5)]
+
+    assert await remove_day(db_session, habit_id, day(3)) is False
+    await remove_day(db_session, habit_id, day(1))
+    await remove_day(db_session, habit_id, day(2))
+    await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(4, 5)]
+
+
+@pytest.mark.asyncio
+async def test_get_runs_clips_to_range(db_session: AsyncSession, habit_id: str) -> None:
+    """Test range queries return overlapping runs clipped to the range."""
+    for offset in (*range(0, 10), *range(20, 25)):
+        await add_day(db_session, habit_id, day(offset))
+    await db_session.commit()
+
+    runs = await get_runs(db_session, habit_id, day(5), day(21))
+    assert runs == [(day(5), day(9)), (day(20), day(21))]
+    assert count_days(runs) == 7
+    assert expand_runs(runs)[:2] == [day(5), day(6)]
+
+
+@pytest.mark.asyncio
+async def test_conversion_round_trip(db_session: AsyncSession, habit_id: str) -> None:
+    """Test rows convert to runs and back without losing days."""
+    offsets = [0, 1, 2, 5, 6, 9]
+    pk = await habit_pk(db_session, habit_id)
+    assert pk is not None
+    for offset in offsets:
+        db_session.add(Completion(habit_pk=pk, completed_date=day(offset)))
+    await db_session.commit()
+
+    assert await convert_rows_to_runs(db_session) == 3
+    await db_session.commit()
+    assert await runs_of(db_session, habit_id) == [(0, 2), (5, 6), (9, 9)]
+    count = select(func.count()).select_from(Completion)
+    assert (await db_session.execute(count)).scalar_one() == 0
+
+    assert await convert_runs_to_rows(db_session, batch_size=2) == len(offsets)
+    await db_session.commit()
+    result = await db_session.execute(
+        select(Completion.completed_date).order_by(Completion.completed_date)
+    )
+    assert list(result.scalars()) == [day(offset) for offset in offsets]
+    runs = select(func.count()).select_from(CompletionRun)
+    assert (await db_session.execute(runs)).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_of_one_day_do_not_overlap(tmp_path: Path) -> None:
+    """Test a second session completing the same day waits for the first."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        habit = Habit(name="Meditate")
+        session.add(habit)
+        await session.flush()
+        session.add(
+            CompletionRun(habit_id=habit.id, start_date=day(-3), end_date=day(-1))
+        )
+        session.add(
+            CompletionRun(habit_id=habit.id, start_date=day(1), end_date=day(3))
+        )
+        await session.commit()
+        habit_id = habit.id
+
+    async with sessions() as first, sessions() as second:
+        assert await add_day(first, habit_id, day(0)) is True
+        waiting = asyncio.create_task(add_day(second, habit_id, day(0)))
+        await asyncio.sleep(0.2)
+        assert not waiting.done()
+        await first.commit()
+        assert await waiting is False
+        await second.commit()
+
+        assert await runs_of(second, habit_id) == [(-3, 3)]
+        assert await remove_day(second, habit_id, day(0)) is True
+        await second.commit()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_split_and_merge_do_not_overlap(tmp_path: Path) -> None:
+    """Test a merge waits for a split of the run it would extend."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        habit = Habit(name="Meditate")
+        session.add(habit)
+        await session.flush()
+        session.add(
+            CompletionRun(habit_id=habit.id, start_date=day(-3), end_date=day(3))
+        )
+        session.add(
+            CompletionRun(habit_id=habit.id, start_date=day(5), end_date=day(7))
+        )
+        await session.commit()
+        habit_id = habit.id
+
+    async with sessions() as first, sessions() as second:
+        assert await remove_day(first, habit_id, day(0)) is True
+        waiting = asyncio.create_task(add_day(second, habit_id, day(4)))
+        await asyncio.sleep(0.2)
+        assert not waiting.done()
+        await first.commit()
+        assert await waiting is True
+        await second.commit()
+
+        assert await runs_of(second, habit_id) == [(-3, -1), (1, 7)]
+    await engine.dispose()
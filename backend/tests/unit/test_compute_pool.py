@@ -0,0 +1,135 @@
+"""Unit tests for running CPU-bound stats work in a worker pool."""
+
+import asyncio
+import threading
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.compute_pool import ComputePool, compute_pool
+from app.core.streak_index import streak_index
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.stats_service import StatsService, compute_best_streak
+
+TODAY = date.today()
+
+
+@pytest.mark.asyncio
+async def test_small_jobs_run_inline() -> None:
+    """Test jobs below the threshold run on the calling thread."""
+    pool = ComputePool(threshold=100)
+
+    assert await pool.run(threading.get_ident, size=99) == threading.get_ident()
+    assert pool.stats.inline == 1
+    assert pool.stats.submitted == 0
+
+
+@pytest.mark.asyncio
+async def test_large_jobs_run_in_the_pool() -> None:
+    """Test jobs at the threshold run on a worker thread."""
+    pool = ComputePool(threshold=100)
+    try:
+        worker = await pool.run(threading.get_ident, size=100)
+    finally:
+        pool.shutdown()
+
+    assert worker != threading.get_ident()
+    assert pool.stats.submitted == pool.stats.completed == 1
+    assert pool.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_saturation_is_counted() -> None:
+    """Test jobs submitted while every worker is busy are counted."""
+    pool = ComputePool(workers=1, threshold=1)
+    release = threading.Event()
+    try:
+        jobs = [
+            asyncio.create_task(pool.run(release.wait, 5, size=1)) for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        assert await asyncio.gather(*jobs) == [True, True, True]
+    finally:
+        pool.shutdown()
+
+    assert pool.stats.saturated == 2
+    assert pool.stats.peak_in_flight == 3
+    assert pool.stats.max_queue_wait_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_process_pool_runs_module_level_functions() -> None:
+    """Test a streak computation can be sent to another process."""
+    pool = ComputePool(kind="process", workers=1, threshold=1)
+    completions = {TODAY - timedelta(days=offset) for offset in (0, 1, 2, 5)}
+    try:
+        best = await pool.run(
+            compute_best_streak,
+            completions,
+            set(),
+            TODAY - timedelta(days=5),
+            TODAY,
+            size=6,
+        )
+    finally:
+        pool.shutdown()
+
+    assert best == 3
+
+
+@pytest.mark.asyncio
+async def test_stats_match_when_computed_in_the_pool(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test streaks are the same whether computed inline or in the pool."""
+    monkeypatch.setattr(streak_index, "max_habits", 0)
+    habit = Habit(name="Run")
+    db_session.add(habit)
+    await db_session.flush()
+    for offset in range(40):
+        day = TODAY - timedelta(days=offset)
+        if offset % 11 == 4:
+            db_session.add(Absence(habit_pk=habit.pk, absence_date=day))
+        elif offset % 13 != 7:
+            db_session.add(Completion(habit_pk=habit.pk, completed_date=day))
+    await db_session.commit()
+    service = StatsService(db_session)
+
+    inline = (
+        await service.calculate_current_streak(habit.id),
+        await service.calculate_best_streak(habit.id),
+    )
+    monkeypatch.setattr(compute_pool, "threshold", 1)
+    submitted = compute_pool.stats.submitted
+    pooled = (
+        await service.calculate_current_streak(habit.id),
+        await service.calculate_best_streak(habit.id),
+    )
+
+    assert pooled == inline
+    assert min(inline) > 0
+    assert compute_pool.stats.submitted == submitted + 2
+
+
+@pytest.mark.asyncio
+async def test_long_index_entries_are_built_in_the_pool(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a streak tree over a long span is built off the event loop."""
+    habit = Habit(name="Swim")
+    db_session.add(habit)
+    await db_session.flush()
+    for offset in range(0, 60, 2):
+        day = TODAY - timedelta(days=offset)
+        db_session.add(Completion(habit_pk=habit.pk, completed_date=day))
+    await db_session.commit()
+    streak_index.clear()
+    monkeypatch.setattr(compute_pool, "threshold", 30)
+    submitted = compute_pool.stats.submitted
+
+    assert await StatsService(db_session).calculate_best_streak(habit.id) == 1
+    assert compute_pool.stats.submitted == submitted + 1
@@ -0,0 +1,96 @@
+"""Unit tests for the change event broker and SSE stream."""
+
+from datetime import date
+
+import pytest
+
+from app.core.events import (
+    HEARTBEAT_MESSAGE,
+    EventBroker,
+    event_stream,
+)
+
+
+def test_event_encoding() -> None:
+    """Test events encode as SSE messages with id, type and data."""
+    broker = EventBroker()
+    event = broker.publish("completion.added", "default", "h1", 3, date(2024, 1, 2))
+
+    assert (
+        event.encode()
+        == (
+            f"id: {event.id}\nevent: completion.added\n"
+            'data: {"habit_id": "h1", "version": 3, "date": "2024-01-02"}\n\n'
+        ).encode()
+    )
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_tenant_subscribers_only() -> None:
+    """Test subscribers only receive their own tenant's events."""
+    broker = EventBroker()
+    with (
+        broker.subscribe("alice") as alice,
+        broker.subscribe("bob") as bob,
+    ):
+        broker.publish("habit.created", "alice", "h1", 1)
+
+        assert alice.queue.get_nowait().habit_id == "h1"
+        assert bob.queue.empty()
+    assert broker.subscriber_count == 0
+
+
+def test_resume_replays_missed_events() -> None:
+    """Test Last-Event-ID resumes from the replay buffer."""
+    broker = EventBroker()
+    first = broker.publish("habit.created", "default", "h1", 1)
+    broker.publish("habit.updated", "default", "h1", 2)
+    broker.publish("habit.created", "other", "h2", 1)
+
+    with broker.subscribe("default", last_event_id=first.id) as subscription:
+        assert [e.type for e in subscription.backlog] == ["habit.updated"]
+        assert not subscription.needs_reset
+
+
+def test_resume_from_evicted_event_needs_reset() -> None:
+    """Test resuming from an id no longer buffered requires a reset."""
+    broker = EventBroker(replay_size=2)
+    first = broker.publish("habit.created", "default", "h1", 1)
+    for version in range(2, 5):
+        broker.publish("habit.updated", "default", "h1", version)
+
+    with broker.subscribe("default", last_event_id=first.id) as subscription:
+        assert subscription.needs_reset
+    with broker.subscribe("default", last_event_id=1) as subscription:
+        assert subscription.needs_reset
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats_and_events() -> None:
+    """Test the stream emits heartbeats while idle and then events."""
+    broker = EventBroker()
+    stream = event_stream(broker, "default", None, heartbeat_seconds=0.01)
+
+    assert await anext(stream) == HEARTBEAT_MESSAGE
+    event = broker.publish("habit.deleted", "default", "h1", 5)
+    assert await anext(stream) == event.encode()
+    await stream.aclose()
+    assert broker.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_resets_slow_subscriber() -> None:
+    """Test a subscriber whose queue overflows is told to reset."""
+    broker = EventBroker(queue_size=1)
+    stream = event_stream(broker, "default", None, heartbeat_seconds=0.01)
+    assert await anext(stream) == HEARTBEAT_MESSAGE
+
+    broker.publish("habit.updated", "default", "h1", 1)
+    broker.publish("habit.updated", "default", "h1", 2)
+    last = broker.publish("habit.updated", "default", "h1", 3)
+
+    message = await anext(stream)
+    assert message.startswith(f"id: {last.id}\nevent: reset".encode())
+    after = broker.publish("habit.updated", "default", "h1", 4)
+    assert await anext(stream) == after.encode()
+    await stream.aclose()
@@ -0,0 +1,193 @@
+"""Unit tests for group-commit write coalescing."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.cache import data_versions
+from app.core.config import settings
+from app.core.database import Base, build_engine
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.group_commit import GroupCommitter, group_committer_for
+from app.services.habit_service import HabitService, _add_completion
+
+
+@pytest.fixture
+async def file_engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine, None]:
+    """Create a file-backed database configured like production."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'group.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(file_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Create a session factory for the file database."""
+    return async_sessionmaker(file_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def make_habit(session_factory: async_sessionmaker[AsyncSession]) -> str:
+    """Insert a habit and return its id."""
+    async with session_factory() as session:
+        habit = Habit(name="Read")
+        session.add(habit)
+        await session.commit()
+        return habit.id
+
+
+async def count_completions(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    """Return the number of stored completions."""
+    async with session_factory() as session:
+        result = await session.execute(select(func.count()).select_from(Completion))
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_batch(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Test concurrent writes commit together and each gets its own result."""
+    habit_id = await make_habit(session_factory)
+    committer = GroupCommitter(session_factory, window=0.05)
+    days = [date(2026, 1, day) for day in range(1, 11)]
+
+    results = await asyncio.gather(
+        *(
+            committer.submit(lambda s, d=day: _add_completion(s, habit_id, d))
+            for day in days
+        )
+    )
+
+    assert [completion.completed_date for completion, _ in results] == days
+    assert all(created for _, created in results)
+    assert committer.stats.batches == 1
+    assert committer.stats.writes == 10
+    assert await count_completions(session_factory) == 10
+
+
+@pytest.mark.asyncio
+async def test_duplicate_writes_in_batch_are_idempotent(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Test the same check-in queued twice creates one row."""
+    habit_id = await make_habit(session_factory)
+    committer = GroupCommitter(session_factory, window=0.05)
+    day = date(2026, 1, 1)
+
+    results = await asyncio.gather(
+        committer.submit(lambda s: _add_completion(s, habit_id, day)),
+        committer.submit(lambda s: _add_completion(s, habit_id, day)),
+    )
+
+    assert [created for _, created in results] == [True, False]
+    assert await count_completions(session_factory) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_fail_others(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Test one failing write is isolated from the rest of its batch."""
+    habit_id = await make_habit(session_factory)
+    committer = GroupCommitter(session_factory, window=0.05)
+
+    async def fail(session: AsyncSession) -> None:
+        raise ValueError("bad write")
+
+    results = await asyncio.gather(
+        committer.submit(lambda s: _add_completion(s, habit_id, date(2026, 1, 1))),
+        committer.submit(fail),
+        committer.submit(lambda s: _add_completion(s, habit_id, date(2026, 1, 2))),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], ValueError)
+    assert not isinstance(results[0], BaseException)
+    assert not isinstance(results[2], BaseException)
+    assert committer.stats.fallbacks == 1
+    assert await count_completions(session_factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_before_window(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Test reaching max_batch flushes without waiting for the window."""
+    habit_id = await make_habit(session_factory)
+    committer = GroupCommitter(session_factory, window=10.0, max_batch=3)
+    days = [date(2026, 1, day) for day in range(1, 7)]
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(
+                committer.submit(lambda s, d=day: _add_completion(s, habit_id, d))
+                for day in days
+            )
+        ),
+        timeout=5,
+    )
+
+    assert committer.stats.batches == 2
+
+
+@pytest.mark.asyncio
+async def test_service_uses_group_commit_when_enabled(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test complete and undo go through the committer when enabled."""
+    monkeypatch.setattr(settings, "group_commit_enabled", True)
+    habit_id = await make_habit(session_factory)
+    day = date(2026, 1, 1)
+
+    async def complete() -> Completion | None:
+        async with session_factory() as session:
+            return await HabitService(session).complete_habit(habit_id, day)
+
+    completions = await asyncio.gather(*(complete() for _ in range(5)))
+    assert all(c is not None and c.completed_date == day for c in completions)
+    assert await count_completions(session_factory) == 1
+
+    async with session_factory() as session:
+        service = HabitService(session)
+        assert await service.delete_completion(habit_id, day) is True
+        assert await service.delete_completion(habit_id, day) is False
+        assert await service.complete_habit("missing", day) is None
+    assert await count_completions(session_factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_still_records_change(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a write committed after its caller was cancelled bumps the version."""
+    monkeypatch.setattr(settings, "group_commit_enabled", True)
+    monkeypatch.setattr(settings, "group_commit_window_ms", 50)
+    habit_id = await make_habit(session_factory)
+    version = data_versions.get(habit_id)
+
+    async with session_factory() as session:
+        committer = group_committer_for(session)
+        assert committer is not None
+        task = asyncio.create_task(
+            HabitService(session).complete_habit(habit_id, date(2026, 1, 1))
+        )
+        while not committer._pending:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        flusher = committer._flusher
+        assert flusher is not None
+        await flusher
+
+    assert task.cancelled()
+    assert await count_completions(session_factory) == 1
+    assert data_versions.get(habit_id) == version + 1
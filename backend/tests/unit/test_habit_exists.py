@@ -0,0 +1,63 @@
+"""Unit tests for habit existence checks."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.query_plans import QueryRecorder
+from app.models.habit_purge import HabitPurge
+from app.schemas.habit import HabitCreate
+from app.services.habit_service import HabitService
+
+
+@pytest.mark.asyncio
+async def test_existence_check_is_reused_by_history_reads(
+    db_session: AsyncSession,
+) -> None:
+    """Test checking a habit exists costs no query beyond its history read."""
+    habit = await HabitService(db_session).create_habit(
+        HabitCreate(name="Walk", description=None)
+    )
+    engine = db_session.bind
+    assert isinstance(engine, AsyncEngine)
+
+    async with async_sessionmaker(engine)() as session:
+        service = HabitService(session)
+        with QueryRecorder(engine) as recorder:
+            assert await service.habit_exists(habit.id)
+            assert await service.get_completions(habit.id) == []
+    assert recorder.executed == 2
+
+
+@pytest.mark.asyncio
+async def test_habit_deleted_elsewhere_is_missing(db_session: AsyncSession) -> None:
+    """Test a habit soft-deleted by another session refuses reads and writes."""
+    habit = await HabitService(db_session).create_habit(
+        HabitCreate(name="Walk", description=None)
+    )
+    session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    async with session_factory() as session:
+        assert await HabitService(session).habit_exists(habit.id)
+
+    # As another process would, without this process seeing the delete
+    db_session.add(HabitPurge(habit_id=habit.id))
+    await db_session.commit()
+
+    async with session_factory() as session:
+        service = HabitService(session)
+        assert not await service.habit_exists(habit.id)
+        assert await service.complete_habit(habit.id) is None
+        assert await service.create_absence(habit.id) is None
+
+
+@pytest.mark.asyncio
+async def test_deleted_habit_is_forgotten(db_session: AsyncSession) -> None:
+    """Test deleting a habit makes sub-resource writes report it missing."""
+    service = HabitService(db_session)
+    habit = await service.create_habit(HabitCreate(name="Walk", description=None))
+    assert await service.habit_exists(habit.id)
+
+    assert await service.delete_habit(habit.id)
+
+    assert not await service.habit_exists(habit.id)
+    assert await service.complete_habit(habit.id) is None
+    assert await service.create_absence(habit.id) is None
@@ -0,0 +1,85 @@
+"""Unit tests for logging configuration."""
+
+import json
+import logging
+import logging.handlers
+import threading
+from collections.abc import Generator
+
+import pytest
+import structlog
+from httpx import AsyncClient
+
+from app.core.logging import EventSampler, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def restore_logging() -> Generator[None, None, None]:
+    """Restore the default console logging after a test reconfigures it."""
+    root_handlers = logging.getLogger().handlers[:]
+    yield
+    shutdown_logging()
+    logging.getLogger().handlers = root_handlers
+    setup_logging()
+
+
+def test_sampler_drops_unselected_info_events() -> None:
+    """Test a zero keep rate drops info events but not errors."""
+    sampler = EventSampler({"habit_completed": 0.0})
+
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "habit_completed"})
+
+    assert sampler(None, "error", {"event": "habit_completed"}) == {
+        "event": "habit_completed"
+    }
+    assert sampler(None, "info", {"event": "habit_created"}) == {
+        "event": "habit_created"
+    }
+
+
+def test_json_logs_are_written_by_listener(
+    restore_logging: None, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test JSON mode renders events and sampling applies per event."""
+    setup_logging(json_logs=True, sample_rates={"noisy_event": 0.0})
+    logger = structlog.get_logger("test")
+
+    with structlog.contextvars.bound_contextvars(request_id="abc123"):
+        logger.info("habit_created", habit_id="h1")
+        logger.info("noisy_event")
+    shutdown_logging()
+
+    lines = [line for line in capsys.readouterr().out.splitlines() if line]
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["event"] == "habit_created"
+    assert entry["habit_id"] == "h1"
+    assert entry["request_id"] == "abc123"
+    assert entry["level"] == "info"
+
+
+def test_reconfiguring_keeps_one_listener(restore_logging: None) -> None:
+    """Test repeated setups replace the listener instead of adding threads."""
+    setup_logging(json_logs=True)
+    threads = threading.active_count()
+    for _ in range(3):
+        setup_logging(json_logs=True)
+    assert threading.active_count() == threads
+
+    setup_logging()
+    assert threading.active_count() == threads - 1
+    assert not any(
+        isinstance(handler, logging.handlers.QueueHandler)
+        for handler in logging.getLogger().handlers
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_echoed(client: AsyncClient) -> None:
+    """Test the request id header is reused or generated."""
+    response = await client.get("/health", headers={"X-Request-ID": "req-1"})
+    assert response.headers["x-request-id"] == "req-1"
+
+    response = await client.get("/health")
+    assert len(response.headers["x-request-id"]) == 32
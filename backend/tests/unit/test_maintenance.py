@@ -0,0 +1,141 @@
+"""Unit tests for database maintenance jobs."""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.cache import data_versions
+from app.core.config import Settings
+from app.core.database import Base, build_engine
+from app.core.rate_index import rate_index
+from app.core.streak_index import streak_index
+from app.core.tenancy import DEFAULT_TENANT, TenantDatabase, current_tenant
+from app.models.habit import Habit
+from app.services.maintenance import (
+    build_maintenance_scheduler,
+    checkpoint_wal,
+    incremental_vacuum,
+    optimize,
+    refresh_daily_stats,
+)
+from app.services.stats_service import StatsService
+
+
+@pytest.fixture
+async def file_engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine, None]:
+    """Create a file-backed database configured like production."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'maintenance.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_uses_wal_and_incremental_vacuum(
+    file_engine: AsyncEngine,
+) -> None:
+    """Test new connections enable WAL and incremental auto-vacuum."""
+    async with file_engine.connect() as conn:
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        auto_vacuum = (await conn.execute(text("PRAGMA auto_vacuum"))).scalar()
+    assert journal_mode == "wal"
+    assert auto_vacuum == 2
+
+
+@pytest.mark.asyncio
+async def test_maintenance_jobs_run(file_engine: AsyncEngine) -> None:
+    """Test each maintenance job runs against a real database file."""
+    session_factory = async_sessionmaker(
+        file_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as session:
+        session.add_all([Habit(name=f"Habit {i}") for i in range(20)])
+        await session.commit()
+
+    await checkpoint_wal(file_engine)
+    await optimize(file_engine)
+    await incremental_vacuum(file_engine, pages=10)
+
+
+@pytest.mark.asyncio
+async def test_daily_refresh_primes_history_indexes(file_engine: AsyncEngine) -> None:
+    """Test the daily refresh loads every habit's rate and streak entries."""
+    session_factory = async_sessionmaker(
+        file_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    habits = [Habit(name=f"Habit {i}") for i in range(3)]
+    async with session_factory() as session:
+        session.add_all(habits)
+        await session.commit()
+
+    await refresh_daily_stats(session_factory)
+
+    for habit in habits:
+        version = data_versions.get(habit.id)
+        assert rate_index.get(DEFAULT_TENANT, habit.id, version) is not None
+        assert streak_index.get(DEFAULT_TENANT, habit.id, version) is not None
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_per_database(file_engine: AsyncEngine) -> None:
+    """Test the maintenance scheduler registers and runs every job."""
+    session_factory = async_sessionmaker(file_engine, class_=AsyncSession)
+    database = TenantDatabase("default", file_engine, session_factory)
+    scheduler = build_maintenance_scheduler(lambda: [database], Settings())
+
+    assert set(scheduler.jobs) == {
+        "wal_checkpoint",
+        "optimize",
+        "incremental_vacuum",
+        "daily_stats_refresh",
+    }
+
+    for name in scheduler.jobs:
+        task = scheduler.run_now(name)
+        assert task is not None
+        await task
+        assert scheduler.jobs[name].stats.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduled_priming_serves_each_tenant(tmp_path: Path) -> None:
+    """Test entries primed by the scheduler are hit by the tenant's requests."""
+    databases = []
+    for tenant_id in ("alpha", "beta"):
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / tenant_id}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        databases.append(TenantDatabase(tenant_id, engine, session_factory))
+    habit = Habit(name="Read")
+    async with databases[1].session_factory() as session:
+        session.add(habit)
+        await session.commit()
+
+    try:
+        scheduler = build_maintenance_scheduler(lambda: databases, Settings())
+        task = scheduler.run_now("daily_stats_refresh")
+        assert task is not None
+        await task
+
+        version = data_versions.get(habit.id)
+        assert rate_index.get(DEFAULT_TENANT, habit.id, version) is None
+        primed = rate_index.get("beta", habit.id, version)
+        assert primed is not None
+
+        token = current_tenant.set("beta")
+        try:
+            async with databases[1].session_factory() as session:
+                await StatsService(session).calculate_window_rates(habit.id, ["7"])
+        finally:
+            current_tenant.reset(token)
+        assert rate_index.get("beta", habit.id, version) is primed
+    finally:
+        for database in databases:
+            await database.engine.dispose()
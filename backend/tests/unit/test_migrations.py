@@ -0,0 +1,152 @@
+"""Unit tests for versioned schema migrations."""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database import Base, build_engine
+from app.core.migrations import (
+    SchemaOutOfDateError,
+    current_version,
+    load_migrations,
+    upgrade_database,
+)
+from app.migrations.v0002_integer_keys import _move_aside
+
+HABIT_ID = "00000000-0000-0000-0000-000000000001"
+
+# Schema created by create_all before versioning, with UUID primary keys
+UUID_SCHEMA = [
+    """CREATE TABLE habits (
+        name VARCHAR(100) NOT NULL, description VARCHAR(500),
+        id VARCHAR(36) NOT NULL, created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL, PRIMARY KEY (id))""",
+    """CREATE TABLE completions (
+        id VARCHAR(36) NOT NULL, habit_id VARCHAR(36) NOT NULL,
+        completed_date DATE NOT NULL, created_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_habit_date UNIQUE (habit_id, completed_date),
+        FOREIGN KEY(habit_id) REFERENCES habits (id) ON DELETE CASCADE)""",
+    "CREATE INDEX idx_completions_habit_date ON completions (habit_id, completed_date)",
+    """CREATE TABLE absences (
+        id VARCHAR(36) NOT NULL, habit_id VARCHAR(36) NOT NULL,
+        absence_date DATE NOT NULL, reason VARCHAR(100),
+        created_at DATETIME NOT NULL, PRIMARY KEY (id),
+        CONSTRAINT uq_habit_absence_date UNIQUE (habit_id, absence_date),
+        FOREIGN KEY(habit_id) REFERENCES habits (id) ON DELETE CASCADE)""",
+    "CREATE INDEX idx_absences_habit_date ON absences (habit_id, absence_date)",
+    f"INSERT INTO habits VALUES ('Read', NULL, '{HABIT_ID}', '2026-01-01', "
+    "'2026-01-01')",
+    f"""INSERT INTO completions VALUES
+        ('c3', '{HABIT_ID}', '2026-01-04', '2026-01-04'),
+        ('c1', '{HABIT_ID}', '2026-01-02', '2026-01-02'),
+        ('c2', '{HABIT_ID}', '2026-01-03', '2026-01-03')""",
+    f"INSERT INTO absences VALUES ('a1', '{HABIT_ID}', '2026-01-05', 'trip', "
+    "'2026-01-05')",
+]
+
+
+@pytest.fixture
+async def legacy_engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine, None]:
+    """Create a database as built before versioning and integer keys."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        for statement in UUID_SCHEMA:
+            await conn.execute(text(statement))
+    yield engine
+    await engine.dispose()
+
+
+async def assert_current(engine: AsyncEngine) -> None:
+    """Assert the database has the current schema and the legacy rows."""
+    async with engine.connect() as conn:
+        assert await conn.run_sync(current_version) == load_migrations()[-1].version
+        for table in ("completions", "absences"):
+            id_type = await conn.execute(
+                text(f"SELECT type FROM pragma_table_info('{table}') WHERE name='id'")
+            )
+            assert id_type.scalar_one() == "INTEGER"
+        completions = await conn.execute(
+            text(
+                "SELECT c.id, h.id, c.completed_date FROM completions c "
+                "JOIN habits h ON h.pk = c.habit_pk ORDER BY c.id"
+            )
+        )
+        assert completions.all() == [
+            (1, HABIT_ID, "2026-01-02"),
+            (2, HABIT_ID, "2026-01-03"),
+            (3, HABIT_ID, "2026-01-04"),
+        ]
+        absences = await conn.execute(text("SELECT absence_date, reason FROM absences"))
+        assert absences.all() == [("2026-01-05", "trip")]
+        violations = await conn.execute(text("PRAGMA foreign_key_check"))
+        assert violations.all() == []
+        tables = await conn.execute(text("SELECT name FROM sqlite_master"))
+        names = set(tables.scalars().all())
+    assert set(Base.metadata.tables) <= names
+    assert not {"idx_completions_habit_date", "completions_uuid"} & names
+
+
+def test_migrations_are_numbered_in_order() -> None:
+    """Test migration versions are unique and start at 1."""
+    versions = [migration.version for migration in load_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+@pytest.mark.asyncio
+async def test_empty_database_created_and_stamped(tmp_path: Path) -> None:
+    """Test a new database gets the current schema without running migrations."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'new.db'}")
+    try:
+        assert await upgrade_database(engine, Base.metadata, batch_size=10) == []
+        async with engine.connect() as conn:
+            version = await conn.run_sync(current_version)
+        assert version == load_migrations()[-1].version
+        assert await upgrade_database(engine, Base.metadata, batch_size=10) == []
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_legacy_database_migrated_in_batches(
+    legacy_engine: AsyncEngine,
+) -> None:
+    """Test an unversioned database is brought forward, keeping every row."""
+    applied = await upgrade_database(legacy_engine, Base.metadata, batch_size=2)
+
+    assert [migration.version for migration in applied] == [1, 2, 3, 4]
+    await assert_current(legacy_engine)
+    assert await upgrade_database(legacy_engine, Base.metadata, batch_size=2) == []
+
+
+@pytest.mark.asyncio
+async def test_interrupted_copy_resumes(legacy_engine: AsyncEngine) -> None:
+    """Test a key rebuild stopped after one batch finishes without duplicates."""
+    async with legacy_engine.connect() as conn:
+        await conn.run_sync(_move_aside, "completions", "completions_uuid")
+        await conn.execute(
+            text(
+                "INSERT INTO completions (habit_id, completed_date, created_at) "
+                "SELECT habit_id, completed_date, created_at FROM completions_uuid "
+                "ORDER BY completed_date LIMIT 1"
+            )
+        )
+        await conn.commit()
+
+    await upgrade_database(legacy_engine, Base.metadata, batch_size=1)
+
+    await assert_current(legacy_engine)
+
+
+@pytest.mark.asyncio
+async def test_startup_refuses_pending_migrations_when_disabled(
+    legacy_engine: AsyncEngine,
+) -> None:
+    """Test an out-of-date database is reported rather than migrated."""
+    with pytest.raises(SchemaOutOfDateError, match="app.cli.migrate"):
+        await upgrade_database(
+            legacy_engine, Base.metadata, batch_size=10, allow_migrations=False
+        )
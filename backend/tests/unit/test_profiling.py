@@ -0,0 +1,85 @@
+"""Unit tests for the request profiling middleware."""
+
+import pstats
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.profiling import ProfilingMiddleware
+
+
+def build_app(
+    output_dir: Path, sample_rate: float = 0.0, max_files: int = 100
+) -> FastAPI:
+    """Build a minimal app wrapped in the profiling middleware."""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: str) -> dict[str, str]:
+        return {"id": item_id}
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=output_dir,
+        sample_rate=sample_rate,
+        header="X-Profile",
+        token="secret",
+        max_files=max_files,
+    )
+    return app
+
+
+async def get(app: FastAPI, path: str, headers: dict[str, str] | None = None) -> None:
+    """Issue a GET request against the app."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(path, headers=headers)
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_unsampled_request_writes_no_profile(tmp_path: Path) -> None:
+    """Test requests are not profiled without sampling or header."""
+    await get(build_app(tmp_path), "/items/1")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_header_triggers_profile(tmp_path: Path) -> None:
+    """Test the trigger header writes a loadable profile tagged with the route."""
+    await get(build_app(tmp_path), "/items/1", headers={"X-Profile": "secret"})
+
+    profiles = list(tmp_path.glob("*.prof"))
+    assert len(profiles) == 1
+    assert "_GET_items_item_id_" in profiles[0].name
+    assert profiles[0].name.endswith("ms.prof")
+    assert pstats.Stats(str(profiles[0])).total_calls > 0
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_one_profiles_every_request(tmp_path: Path) -> None:
+    """Test a sample rate of 1.0 profiles every request."""
+    app = build_app(tmp_path, sample_rate=1.0)
+    await get(app, "/items/1")
+    await get(app, "/items/2")
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_header_without_the_token_is_ignored(tmp_path: Path) -> None:
+    """Test clients cannot force a profile without knowing the token."""
+    app = build_app(tmp_path)
+    await get(app, "/items/1", headers={"X-Profile": "1"})
+    await get(app, "/items/1", headers={"X-Profile": "secre"})
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_profiling_stops_at_the_file_limit(tmp_path: Path) -> None:
+    """Test no more profiles are written once the limit is reached."""
+    app = build_app(tmp_path, sample_rate=1.0, max_files=2)
+    for item in range(4):
+        await get(app, f"/items/{item}")
+    assert len(list(tmp_path.glob("*.prof"))) == 2
@@ -0,0 +1,104 @@
+"""Unit tests for habit deletion and purging."""
+
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import data_versions, response_cache
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.models.habit_purge import HabitPurge
+from app.services.habit_service import HabitService
+from app.services.purge import purge_deleted_habits
+from app.services.stats_service import StatsService
+
+START = date(2026, 1, 1)
+
+
+async def add_habit(session: AsyncSession, days: int) -> str:
+    """Create a habit with a completion and an absence on alternating days."""
+    habit = Habit(name="Stretch", created_at=datetime(2025, 12, 1, tzinfo=UTC))
+    session.add(habit)
+    await session.flush()
+    for offset in range(days):
+        day = START + timedelta(days=offset)
+        if offset % 2:
+            session.add(Absence(habit_pk=habit.pk, absence_date=day))
+        else:
+            session.add(Completion(habit_pk=habit.pk, completed_date=day))
+    await session.commit()
+    return habit.id
+
+
+async def history_rows(session: AsyncSession) -> int:
+    """Return the number of completion and absence rows."""
+    completions = await session.execute(select(func.count()).select_from(Completion))
+    absences = await session.execute(select(func.count()).select_from(Absence))
+    return completions.scalar_one() + absences.scalar_one()
+
+
+async def get_habit(session: AsyncSession, habit_id: str) -> Habit | None:
+    """Return a habit by its public id."""
+    return await session.scalar(select(Habit).where(Habit.id == habit_id))
+
+
+@pytest.mark.asyncio
+async def test_delete_cascades_in_database(db_session: AsyncSession) -> None:
+    """Test deleting a habit removes its history without loading it."""
+    habit_id = await add_habit(db_session, 50)
+    kept_id = await add_habit(db_session, 4)
+    db_session.expunge_all()
+
+    assert await HabitService(db_session).delete_habit(habit_id)
+
+    assert not any(
+        isinstance(obj, Completion) for obj in db_session.identity_map.values()
+    )
+    assert await history_rows(db_session) == 4
+    assert await get_habit(db_session, kept_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_hides_habit_until_purged(db_session: AsyncSession) -> None:
+    """Test a soft-deleted habit disappears at once and is purged in chunks."""
+    habit_id = await add_habit(db_session, 25)
+    kept_id = await add_habit(db_session, 2)
+    service = HabitService(db_session)
+    stats = StatsService(db_session)
+
+    assert await service.delete_habit(habit_id, soft=True)
+    assert not await service.delete_habit(habit_id, soft=True)
+    assert await service.get_habit(habit_id) is None
+    assert [habit.id for habit in await service.get_all_habits()] == [kept_id]
+    assert await stats.get_habit_with_stats(habit_id) is None
+    progress = await stats.get_daily_progress(START, START)
+    assert progress[0].completed == 1
+    assert await history_rows(db_session) == 27
+
+    session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    assert await purge_deleted_habits(session_factory, batch_size=10) == 25
+    db_session.expire_all()
+
+    assert await history_rows(db_session) == 2
+    assert await get_habit(db_session, habit_id) is None
+    purges = await db_session.execute(select(func.count()).select_from(HabitPurge))
+    assert purges.scalar_one() == 0
+    assert await purge_deleted_habits(session_factory, batch_size=10) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_invalidates_cached_history(db_session: AsyncSession) -> None:
+    """Test purging a habit advances its version and drops its cached bodies."""
+    habit_id = await add_habit(db_session, 4)
+    assert await HabitService(db_session).delete_habit(habit_id, soft=True)
+    version = data_versions.get(habit_id)
+    response_cache.put(habit_id, ("completions", version), b"[]")
+
+    session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    assert await purge_deleted_habits(session_factory, batch_size=10) == 4
+
+    assert data_versions.get(habit_id) == version + 1
+    assert response_cache.get(habit_id, ("completions", version)) is None
@@ -0,0 +1,124 @@
+"""Unit tests for service query plans and the index advisor.
+
+No service statement may scan a history table or sort in a temporary
+B-tree, whichever storage options are enabled. The plans of every
+``HabitService`` and ``StatsService`` statement are also kept in
+``query_plans.json`` with the SQLite version that produced them; plan text
+changes between SQLite releases, so the comparison only runs on that
+version. After an intended change, regenerate it with:
+
+    UPDATE_QUERY_PLANS=1 python -m pytest tests/unit/test_query_plans.py
+"""
+
+import json
+import os
+import sqlite3
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.cli.index_advisor import capture_service_plans
+from app.core.config import settings
+from app.core.database import Base, build_engine, prepare_database
+from app.core.query_plans import QueryPlan, list_indexes, redundant_indexes
+
+SNAPSHOT = Path(__file__).with_name("query_plans.json")
+
+# Settings overrides for each way of storing and reading history
+STORAGE_OPTIONS: dict[str, dict[str, Any]] = {
+    "rows": {},
+    "rows_archive_rollups": {"archive_enabled": True, "monthly_rollups_enabled": True},
+    "runs_rollups": {"completion_storage": "runs", "monthly_rollups_enabled": True},
+}
+
+
+@pytest.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create an empty in-memory database with the current schema."""
+    database = build_engine("sqlite+aiosqlite:///:memory:")
+    await prepare_database(database)
+    yield database
+    await database.dispose()
+
+
+def as_snapshot(plans: dict[str, list[QueryPlan]]) -> dict[str, list[list[str]]]:
+    """Return the plan details of each method in a JSON-friendly form."""
+    return {
+        label: [list(plan.details) for plan in method_plans]
+        for label, method_plans in plans.items()
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", STORAGE_OPTIONS.values(), ids=STORAGE_OPTIONS)
+async def test_service_queries_never_scan_history_or_sort(
+    engine: AsyncEngine, options: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test no service statement scans a history table or sorts in a B-tree."""
+    for name, value in options.items():
+        monkeypatch.setattr(settings, name, value)
+    plans = await capture_service_plans(engine)
+
+    assert all(plans.values())
+    for label, method_plans in plans.items():
+        for plan in method_plans:
+            assert not plan.full_scans(), f"{label}: {plan.statement}"
+            assert not plan.temp_sorts(), f"{label}: {plan.statement}"
+
+
+@pytest.mark.asyncio
+async def test_service_query_plans_match_snapshot(engine: AsyncEngine) -> None:
+    """Test service query plans are unchanged from the stored snapshot."""
+    plans = as_snapshot(await capture_service_plans(engine))
+    if os.environ.get("UPDATE_QUERY_PLANS"):
+        snapshot = {"sqlite_version": sqlite3.sqlite_version, "plans": plans}
+        SNAPSHOT.write_text(json.dumps(snapshot, indent=2) + "\n")
+
+    snapshot = json.loads(SNAPSHOT.read_text())
+    if snapshot["sqlite_version"] != sqlite3.sqlite_version:
+        pytest.skip(f"plans were recorded with SQLite {snapshot['sqlite_version']}")
+    assert plans == snapshot["plans"]
+
+
+@pytest.mark.asyncio
+async def test_current_schema_has_no_redundant_indexes(engine: AsyncEngine) -> None:
+    """Test every index of the current schema is needed."""
+    async with engine.connect() as conn:
+        indexes = await conn.run_sync(list_indexes)
+
+    assert redundant_indexes(indexes) == []
+
+
+@pytest.mark.asyncio
+async def test_advisor_reports_duplicate_child_table_indexes() -> None:
+    """Test the pre-migration duplicate indexes are reported as redundant."""
+    database = build_engine("sqlite+aiosqlite:///:memory:")
+    async with database.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text(
+                "CREATE INDEX idx_completions_habit_date "
+                "ON completions (habit_pk, completed_date)"
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX idx_absences_habit_date "
+                "ON absences (habit_pk, absence_date)"
+            )
+        )
+        indexes = await conn.run_sync(list_indexes)
+    await database.dispose()
+
+    redundant = {
+        index.name: (covered_by.table, covered_by.unique)
+        for index, covered_by in redundant_indexes(indexes)
+    }
+    assert redundant == {
+        "idx_completions_habit_date": ("completions", True),
+        "idx_absences_habit_date": ("absences", True),
+    }
@@ -0,0 +1,144 @@
+"""Unit tests for the prefix-count rate index."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import data_versions
+from app.core.history_index import ABSENT, COMPLETED, HistoryIndex
+from app.core.query_plans import QueryRecorder
+from app.core.rate_index import PrefixCounts, rate_index
+from app.core.tenancy import DEFAULT_TENANT
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.habit_service import HabitService
+from app.services.stats_service import StatsService, parse_windows, window_range
+
+TODAY = date.today()
+FIRST_DAY = TODAY - timedelta(days=99)
+COMPLETIONS = {FIRST_DAY + timedelta(days=n) for n in range(100) if n % 3}
+ABSENCES = {FIRST_DAY + timedelta(days=n) for n in range(100) if n % 7 == 0}
+
+
+def brute_counts(start: date, end: date) -> tuple[int, int]:
+    """Count completed and absent days in a range the slow way."""
+    return (
+        sum(start <= day <= end for day in COMPLETIONS),
+        sum(start <= day <= end for day in ABSENCES),
+    )
+
+
+def test_counts_match_brute_force() -> None:
+    """Test range counts, including ranges reaching outside the span."""
+    counts = PrefixCounts(FIRST_DAY, TODAY, COMPLETIONS, ABSENCES)
+
+    for start_offset, end_offset in [(0, 99), (5, 5), (10, 40), (-30, 20), (90, 130)]:
+        start = FIRST_DAY + timedelta(days=start_offset)
+        end = FIRST_DAY + timedelta(days=end_offset)
+        assert counts.counts(start, end) == brute_counts(start, end)
+    assert counts.counts(TODAY + timedelta(days=1), TODAY + timedelta(days=9)) == (0, 0)
+
+
+def test_set_flag_is_idempotent_and_extends_span() -> None:
+    """Test marking a day twice counts once and later days extend the span."""
+    counts = PrefixCounts(FIRST_DAY, TODAY, set(), set())
+    tomorrow = TODAY + timedelta(days=1)
+
+    counts.set_flag(FIRST_DAY, COMPLETED, True)
+    counts.set_flag(FIRST_DAY, COMPLETED, True)
+    counts.set_flag(tomorrow, ABSENT, True)
+    assert counts.last_day == tomorrow
+    assert counts.counts(FIRST_DAY, tomorrow) == (1, 1)
+
+    counts.set_flag(FIRST_DAY, COMPLETED, False)
+    counts.set_flag(FIRST_DAY, COMPLETED, False)
+    assert counts.counts(FIRST_DAY, tomorrow) == (0, 1)
+
+
+def test_index_applies_only_consecutive_changes() -> None:
+    """Test changes apply to a current entry and drop one that missed a change."""
+    index = HistoryIndex[PrefixCounts](max_habits=2)
+    counts = PrefixCounts(FIRST_DAY, TODAY, set(), set())
+    index.put("t", "a", 4, counts)
+
+    index.record("t", "a", 5, "completion.added", TODAY)
+    assert index.get("t", "a", 5) is counts
+    assert counts.counts(TODAY, TODAY) == (1, 0)
+
+    index.record("t", "a", 7, "completion.removed", TODAY)
+    assert index.get("t", "a", 7) is None
+    assert len(index) == 0
+
+
+def test_index_drops_deleted_and_least_recent_habits() -> None:
+    """Test deleted habits are dropped and the size limit is kept."""
+    index = HistoryIndex[PrefixCounts](max_habits=2)
+    for habit_id in "abc":
+        index.put("t", habit_id, 1, PrefixCounts(TODAY, TODAY, set(), set()))
+    assert index.get("t", "a", 1) is None
+
+    index.record("t", "b", 2, "habit.deleted", None)
+    assert index.get("t", "b", 2) is None
+    assert len(index) == 1
+
+
+def test_parse_windows() -> None:
+    """Test window specs are validated and resolved to date ranges."""
+    windows = parse_windows("90, ytd,all,2026-01-01..2026-03-31,..2026-02-01,90")
+
+    assert windows == ["90", "ytd", "all", "2026-01-01..2026-03-31", "..2026-02-01"]
+    created = date(2025, 6, 1)
+    assert window_range("90", TODAY, created) == (TODAY - timedelta(days=89), TODAY)
+    assert window_range("ytd", TODAY, created) == (date(TODAY.year, 1, 1), TODAY)
+    assert window_range("..2026-02-01", TODAY, created) == (created, date(2026, 2, 1))
+    for invalid in ["0", "week", "2026-13-01..", "2026-03-01..2026-01-01", ""]:
+        with pytest.raises(ValueError, match="window"):
+            parse_windows(invalid)
+
+
+@pytest.mark.asyncio
+async def test_window_rates_match_range_queries(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test indexed rates match rates counted with range queries."""
+    habit = Habit(name="Read")
+    db_session.add(habit)
+    await db_session.flush()
+    db_session.add_all(
+        Completion(habit_pk=habit.pk, completed_date=day) for day in COMPLETIONS
+    )
+    db_session.add_all(Absence(habit_pk=habit.pk, absence_date=day) for day in ABSENCES)
+    await db_session.commit()
+    service = StatsService(db_session)
+    windows = parse_windows(
+        f"7,30,90,ytd,all,{FIRST_DAY}..{TODAY - timedelta(days=50)}"
+    )
+
+    indexed = await service.calculate_window_rates(habit.id, windows)
+    indexed_rate = await service.calculate_completion_rate(habit.id)
+    monkeypatch.setattr(rate_index, "max_habits", 0)
+    queried = await service.calculate_window_rates(habit.id, windows)
+
+    assert indexed == queried
+    assert indexed_rate == await service.calculate_completion_rate(habit.id)
+
+
+@pytest.mark.asyncio
+async def test_writes_update_indexed_counts_in_place(db_session: AsyncSession) -> None:
+    """Test a completion updates the indexed counts without reloading history."""
+    habit = Habit(name="Run")
+    db_session.add(habit)
+    await db_session.commit()
+    service = StatsService(db_session)
+    assert await service.calculate_window_rates(habit.id, ["1"]) == {"1": 0.0}
+
+    await HabitService(db_session).complete_habit(habit.id, TODAY)
+    assert rate_index.get(DEFAULT_TENANT, habit.id, data_versions.get(habit.id))
+
+    assert isinstance(db_session.bind, AsyncEngine)
+    with QueryRecorder(db_session.bind) as recorder:
+        rates = await service.calculate_window_rates(habit.id, ["1"])
+    assert rates == {"1": 100.0}
+    assert recorder.executed == 1
@@ -0,0 +1,78 @@
+"""Unit tests for the serialized response cache."""
+
+import gzip
+
+from app.core.cache import DataVersions, ResponseCache, accepts_gzip, cached_response
+
+
+def test_data_versions_bump() -> None:
+    """Test versions start at zero and increase per habit."""
+    versions = DataVersions()
+    assert versions.get("h1") == 0
+    assert versions.bump("h1") == 1
+    assert versions.bump("h1") == 2
+    assert versions.get("h2") == 0
+
+
+def test_put_precompresses_large_bodies() -> None:
+    """Test bodies above the threshold get a gzip variant."""
+    cache = ResponseCache(min_gzip_size=100)
+    small = cache.put("h1", "small", b"[]")
+    large = cache.put("h1", "large", b"[" + b'"2024-01-01",' * 50 + b"0]")
+
+    assert small.gzip_body is None
+    assert large.gzip_body is not None
+    assert gzip.decompress(large.gzip_body) == large.body
+
+
+def test_invalidate_drops_only_that_habit() -> None:
+    """Test invalidation removes every entry of one habit."""
+    cache = ResponseCache()
+    cache.put("h1", "a", b"1")
+    cache.put("h1", "b", b"2")
+    cache.put("h2", "a", b"3")
+
+    cache.invalidate("h1")
+
+    assert cache.get("h1", "a") is None
+    assert cache.get("h1", "b") is None
+    assert cache.get("h2", "a") is not None
+    assert len(cache) == 1
+
+
+def test_lru_eviction() -> None:
+    """Test the least recently used entry is evicted first."""
+    cache = ResponseCache(max_entries=2)
+    cache.put("h1", "a", b"1")
+    cache.put("h1", "b", b"2")
+    cache.get("h1", "a")
+    cache.put("h1", "c", b"3")
+
+    assert cache.get("h1", "b") is None
+    assert cache.get("h1", "a") is not None
+    assert cache.get("h1", "c") is not None
+
+
+def test_accepts_gzip() -> None:
+    """Test Accept-Encoding negotiation honours q-values."""
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("br")
+    assert not accepts_gzip(None)
+
+
+def test_cached_response_negotiates_encoding() -> None:
+    """Test the gzip variant is only served when accepted."""
+    cache = ResponseCache(min_gzip_size=0)
+    entry = cache.put("h1", "a", b'{"habit_id":"h1"}')
+
+    plain = cached_response(entry, None)
+    compressed = cached_response(entry, "gzip")
+
+    assert plain.body == entry.body
+    assert "content-encoding" not in plain.headers
+    assert compressed.body == entry.gzip_body
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
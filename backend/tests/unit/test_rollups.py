@@ -0,0 +1,94 @@
+"""Unit tests for monthly rollups."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.habit import Habit
+from app.models.monthly_rollup import MonthlyRollup
+from app.services.habit_service import HabitService
+from app.services.rollups import partial_ranges, rebuild_rollups, whole_months
+from app.services.stats_service import StatsService
+
+
+@pytest.fixture(autouse=True)
+def enable_rollups(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Maintain and read rollups for every test in this module."""
+    monkeypatch.setattr(settings, "monthly_rollups_enabled", True)
+
+
+async def stored_rollups(
+    session: AsyncSession,
+) -> dict[tuple[int, int], tuple[int, int]]:
+    """Return stored rollups keyed by (year, month)."""
+    result = await session.execute(select(MonthlyRollup))
+    return {(r.year, r.month): (r.completions, r.absences) for r in result.scalars()}
+
+
+def test_whole_months_and_partial_ranges() -> None:
+    """Test ranges split into whole months and partial ends."""
+    start, end = date(2026, 1, 15), date(2026, 4, 10)
+    months = whole_months(start, end)
+    assert months == (date(2026, 2, 1), date(2026, 3, 31))
+    assert partial_ranges(start, end, months) == [
+        (date(2026, 1, 15), date(2026, 1, 31)),
+        (date(2026, 4, 1), date(2026, 4, 10)),
+    ]
+    assert whole_months(date(2025, 12, 1), date(2025, 12, 31)) == (
+        date(2025, 12, 1),
+        date(2025, 12, 31),
+    )
+    assert whole_months(date(2026, 1, 2), date(2026, 1, 30)) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["rows", "runs"])
+async def test_writes_keep_rollups_in_step(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch, storage: str
+) -> None:
+    """Test completion and absence writes adjust the month's counts."""
+    monkeypatch.setattr(settings, "completion_storage", storage)
+    service = HabitService(db_session)
+    habit = Habit(name="Write")
+    db_session.add(habit)
+    await db_session.commit()
+
+    await service.complete_habit(habit.id, date(2026, 1, 31))
+    await service.complete_habit(habit.id, date(2026, 1, 31))
+    await service.complete_habit(habit.id, date(2026, 2, 1))
+    await service.complete_habit(habit.id, date(2026, 2, 2))
+    await service.create_absence(habit.id, date(2026, 2, 3))
+    await service.delete_completion(habit.id, date(2026, 2, 2))
+
+    assert await stored_rollups(db_session) == {(2026, 1): (1, 0), (2026, 2): (1, 1)}
+    incremental = await stored_rollups(db_session)
+    await rebuild_rollups(db_session)
+    await db_session.commit()
+    assert await stored_rollups(db_session) == incremental
+
+
+@pytest.mark.asyncio
+async def test_rate_from_rollups_matches_raw_scan(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test long-range rates are the same with and without rollups."""
+    service = HabitService(db_session)
+    habit = Habit(name="Walk")
+    db_session.add(habit)
+    await db_session.commit()
+    start = date(2025, 1, 20)
+    for offset in range(0, 400, 3):
+        await service.complete_habit(habit.id, start + timedelta(days=offset))
+    for offset in range(1, 400, 17):
+        await service.create_absence(habit.id, start + timedelta(days=offset))
+
+    stats = StatsService(db_session)
+    end = start + timedelta(days=399)
+    with_rollups = await stats._calculate_rate_for_period(habit.id, start, end)
+    monkeypatch.setattr(settings, "monthly_rollups_enabled", False)
+    raw = await stats._calculate_rate_for_period(habit.id, start, end)
+    assert with_rollups == pytest.approx(raw)
+    assert raw > 0
@@ -0,0 +1,116 @@
+"""Unit tests for the background job scheduler."""
+
+import asyncio
+from datetime import datetime
+from datetime import time as time_of_day
+
+import pytest
+
+from app.core.scheduler import Job, Scheduler
+
+
+async def noop() -> None:
+    """Job that does nothing."""
+
+
+def test_add_job_requires_one_schedule() -> None:
+    """Test a job needs exactly one of interval or at."""
+    scheduler = Scheduler()
+    with pytest.raises(ValueError):
+        scheduler.add_job("none", noop)
+    with pytest.raises(ValueError):
+        scheduler.add_job("both", noop, interval=1, at=time_of_day(0, 5))
+
+
+def test_daily_job_delay() -> None:
+    """Test a daily job waits until its time today or tomorrow."""
+    job = Job(name="daily", func=noop, at=time_of_day(0, 5))
+
+    assert job.next_delay(datetime(2024, 1, 1, 0, 0)) == 300
+    assert job.next_delay(datetime(2024, 1, 1, 0, 10)) == 24 * 3600 - 300
+
+
+def test_jitter_is_bounded() -> None:
+    """Test jitter adds at most the configured number of seconds."""
+    job = Job(name="jittered", func=noop, interval=10, jitter=5)
+    delays = [job.next_delay(datetime.now()) for _ in range(50)]
+    assert all(10 <= delay <= 15 for delay in delays)
+
+
+@pytest.mark.asyncio
+async def test_interval_job_runs_and_records_stats() -> None:
+    """Test an interval job runs repeatedly and records timing."""
+    calls = 0
+
+    async def count() -> None:
+        nonlocal calls
+        calls += 1
+
+    scheduler = Scheduler()
+    job = scheduler.add_job("count", count, interval=0.01)
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+
+    assert calls >= 2
+    assert job.stats.runs == calls
+    assert job.stats.last_duration_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_overlapping_run_is_skipped() -> None:
+    """Test a job is not started again while a run is in progress."""
+    release = asyncio.Event()
+
+    async def slow() -> None:
+        await release.wait()
+
+    scheduler = Scheduler()
+    job = scheduler.add_job("slow", slow, interval=3600)
+
+    first = scheduler.run_now("slow")
+    assert first is not None
+    assert scheduler.run_now("slow") is None
+    assert job.stats.skipped == 1
+
+    release.set()
+    await first
+    assert job.stats.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted() -> None:
+    """Test a failing job is recorded without crashing the scheduler."""
+
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler()
+    job = scheduler.add_job("fail", fail, interval=3600)
+
+    task = scheduler.run_now("fail")
+    assert task is not None
+    await task
+
+    assert job.stats.failures == 1
+    assert job.stats.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_in_flight_runs() -> None:
+    """Test stop cancels a running job and clears state."""
+    started = asyncio.Event()
+
+    async def forever() -> None:
+        started.set()
+        await asyncio.sleep(3600)
+
+    scheduler = Scheduler()
+    scheduler.add_job("forever", forever, interval=3600)
+    task = scheduler.run_now("forever")
+    await started.wait()
+
+    await scheduler.stop()
+
+    assert task is not None
+    assert task.cancelled()
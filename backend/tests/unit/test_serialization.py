@@ -0,0 +1,45 @@
+"""Unit tests for the fast JSON response path."""
+
+import json
+from datetime import UTC, date, datetime
+
+from app.core.serialization import json_response
+from app.schemas.completion import CompletionsListResponse
+from app.schemas.stats import CompletionRate, HabitWithStatsResponse
+
+
+def test_json_response_matches_model_serialization() -> None:
+    """Test the fast path produces the same JSON as the models themselves."""
+    now = datetime(2024, 1, 15, 8, 30, tzinfo=UTC)
+    habits = [
+        HabitWithStatsResponse(
+            id="h1",
+            name="Read",
+            description=None,
+            created_at=now,
+            updated_at=now,
+            current_streak=3,
+            best_streak=7,
+            completion_rate=CompletionRate(week=42.9, month=10.0, all_time=10.0),
+            completed_today=True,
+        )
+    ]
+
+    response = json_response(habits, list[HabitWithStatsResponse])
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [json.loads(habits[0].model_dump_json())]
+
+
+def test_json_response_serializes_dates() -> None:
+    """Test date lists are encoded as ISO strings."""
+    content = CompletionsListResponse(
+        habit_id="h1", completions=[date(2024, 1, 1), date(2024, 1, 2)]
+    )
+
+    response = json_response(content, CompletionsListResponse)
+
+    assert json.loads(response.body) == {
+        "habit_id": "h1",
+        "completions": ["2024-01-01", "2024-01-02"],
+    }
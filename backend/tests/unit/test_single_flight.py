@@ -0,0 +1,78 @@
+"""Unit tests for coalescing concurrent identical reads."""
+
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation() -> None:
+    """Test callers with the same key await one computation and its result."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute() -> list[int]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return [calls]
+
+    waiters = [asyncio.create_task(flight.run("habits", compute)) for _ in range(5)]
+    other = asyncio.create_task(flight.run("progress", compute))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 2
+    assert all(result is results[0] for result in results)
+    assert await other == [2]
+    assert flight.computations == 2
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_and_not_kept() -> None:
+    """Test waiters share an exception and the next call computes afresh."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fail() -> int:
+        await release.wait()
+        raise RuntimeError("database unavailable")
+
+    waiters = [asyncio.create_task(flight.run("habits", fail)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def succeed() -> int:
+        return 1
+
+    assert await flight.run("habits", succeed) == 1
+    assert flight.computations == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others() -> None:
+    """Test the computation outlives the caller that started it."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.run("habits", compute))
+    second = asyncio.create_task(flight.run("habits", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
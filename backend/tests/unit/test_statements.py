@@ -0,0 +1,69 @@
+"""Unit tests for the prebuilt hot-path statements."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.query_plans import QueryRecorder
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.habit_service import HabitService
+from app.services.stats_service import StatsService
+
+TODAY = date.today()
+
+
+async def add_habit(session: AsyncSession) -> str:
+    """Create a habit with a completion and an absence in the last week."""
+    habit = Habit(name="Read")
+    session.add(habit)
+    await session.flush()
+    session.add(Completion(habit_pk=habit.pk, completed_date=TODAY))
+    session.add(Absence(habit_pk=habit.pk, absence_date=TODAY - timedelta(days=2)))
+    await session.commit()
+    return habit.id
+
+
+async def hot_reads(session: AsyncSession, habit_id: str) -> list[object]:
+    """Run every read served by a prebuilt statement."""
+    habits, stats = HabitService(session), StatsService(session)
+    week_ago = TODAY - timedelta(days=6)
+    return [
+        await habits.get_habit(habit_id),
+        await habits.get_completion(habit_id, TODAY),
+        await habits.get_absence(habit_id, week_ago),
+        await habits.get_completions(habit_id, week_ago, TODAY),
+        await habits.get_completions(habit_id, week_ago),
+        await habits.get_absences(habit_id, end_date=TODAY),
+        await stats.is_completed_today(habit_id),
+        await stats.calculate_current_streak(habit_id),
+        await stats.calculate_completion_rate(habit_id),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hot_reads_are_compiled_once(db_session: AsyncSession) -> None:
+    """Test repeated hot reads, with or without bounds, hit the statement cache."""
+    habit_id = await add_habit(db_session)
+    await hot_reads(db_session, habit_id)
+    other_id = await add_habit(db_session)
+
+    assert isinstance(db_session.bind, AsyncEngine)
+    with QueryRecorder(db_session.bind) as recorder:
+        await hot_reads(db_session, other_id)
+
+    assert recorder.executed > 0
+    assert recorder.cache_hits == recorder.executed
+
+
+@pytest.mark.asyncio
+async def test_open_date_bounds_return_all_history(db_session: AsyncSession) -> None:
+    """Test omitted range bounds are open rather than filtering everything out."""
+    habit_id = await add_habit(db_session)
+    service = HabitService(db_session)
+
+    assert await service.get_completions(habit_id) == [TODAY]
+    assert await service.get_completions(habit_id, end_date=TODAY) == [TODAY]
+    assert await service.get_absences(habit_id) == [(TODAY - timedelta(days=2), None)]
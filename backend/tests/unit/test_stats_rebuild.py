@@ -0,0 +1,164 @@
+"""Unit tests for the offline stats rebuild."""
+
+import asyncio
+import json
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cli.rebuild_stats import chunk_path, rebuild
+from app.core.config import settings
+from app.core.database import build_engine, build_read_only_engine, prepare_database
+from app.core.streak_index import streak_index
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.models.habit_archive import HabitArchiveSummary
+from app.services.archive import archive_cutoff, archive_habit
+from app.services.stats_rebuild import RebuildCheckpoint, rebuild_chunk
+from app.services.stats_service import StatsService
+
+TODAY = date.today()
+FIRST_DAY = TODAY - timedelta(days=1200)
+
+
+async def seed(database_url: str) -> None:
+    """Create five habits of irregular history."""
+    engine = build_engine(database_url)
+    await prepare_database(engine)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        for number in range(5):
+            habit = Habit(
+                name=f"Habit {number}",
+                created_at=datetime.combine(FIRST_DAY, datetime.min.time(), UTC),
+            )
+            session.add(habit)
+            await session.flush()
+            for offset in range(0, 1200, number + 1):
+                day = TODAY - timedelta(days=offset)
+                if offset % 17 == number:
+                    session.add(Absence(habit_pk=habit.pk, absence_date=day))
+                elif offset % 23 != number:
+                    session.add(Completion(habit_pk=habit.pk, completed_date=day))
+        await session.commit()
+    await engine.dispose()
+
+
+@pytest.fixture
+def database_url(tmp_path: Path) -> str:
+    """Return the URL of a seeded database file."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'habits.db'}"
+    asyncio.run(seed(url))
+    return url
+
+
+async def served_stats(database_url: str) -> list[dict[str, object]]:
+    """Return the stats the API serves for every habit, in id order."""
+    engine = build_engine(database_url)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        habits = await StatsService(session).get_all_habits_with_stats()
+    await engine.dispose()
+    return sorted(
+        (habit.model_dump(mode="json") for habit in habits),
+        key=lambda habit: str(habit["id"]),
+    )
+
+
+def read_records(output: Path) -> list[dict[str, object]]:
+    """Return every record written by a rebuild, in chunk order."""
+    return [
+        json.loads(line)
+        for path in sorted(output.glob("chunk-*.jsonl"))
+        for line in path.read_text().splitlines()
+    ]
+
+
+def test_rebuild_matches_served_stats(database_url: str, tmp_path: Path) -> None:
+    """Test chunks rebuilt in worker processes match the served stats."""
+    output = tmp_path / "rebuild"
+
+    habits = rebuild(database_url, output, 2, 2, TODAY, verify=False, restart=False)
+
+    assert habits == 5
+    assert len(list(output.glob("chunk-*.jsonl"))) == 3
+    assert read_records(output) == asyncio.run(served_stats(database_url))
+
+
+def test_rebuild_resumes_from_checkpoint(database_url: str, tmp_path: Path) -> None:
+    """Test a restarted rebuild only runs the chunks not yet finished."""
+    output = tmp_path / "rebuild"
+    rebuild(database_url, output, 1, 2, TODAY, verify=False, restart=False)
+    checkpoint = RebuildCheckpoint(output / "checkpoint.json")
+    checkpoint.load()
+    checkpoint.done.discard(1)
+    checkpoint.save()
+    chunk_path(output, 1).unlink()
+
+    habits = rebuild(database_url, output, 1, 2, TODAY, verify=False, restart=False)
+
+    assert habits == 2
+    checkpoint.load()
+    assert checkpoint.pending() == []
+    assert read_records(output) == asyncio.run(served_stats(database_url))
+
+
+@pytest.mark.asyncio
+async def test_verify_reports_drifted_archive_checkpoints(
+    database_url: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test verification agrees with archived stats until a checkpoint drifts."""
+    monkeypatch.setattr(settings, "archive_enabled", True)
+    # Served streaks come from the archive checkpoints, not a streak tree
+    monkeypatch.setattr(streak_index, "max_habits", 0)
+    engine = build_engine(database_url)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        first_id = await session.scalar(select(func.min(Habit.id)))
+        assert first_id is not None
+        await archive_habit(session, first_id, archive_cutoff(TODAY, 730))
+        await session.commit()
+
+    count, records = await rebuild_chunk(
+        database_url, first_id, first_id, TODAY, verify=True
+    )
+    assert (count, records) == (1, [])
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(HabitArchiveSummary).values(
+                best_streak=HabitArchiveSummary.best_streak + 1000
+            )
+        )
+    await engine.dispose()
+    count, records = await rebuild_chunk(
+        database_url, first_id, first_id, TODAY, verify=True
+    )
+    assert [record["field"] for record in records] == ["best_streak"]
+
+
+def test_verify_only_resumes_on_the_day_it_started(
+    database_url: str, tmp_path: Path
+) -> None:
+    """Test a verification is not compared with a later day's served stats."""
+    output = tmp_path / "verify"
+    rebuild(database_url, output, 1, 2, TODAY, verify=True, restart=False)
+    checkpoint = RebuildCheckpoint(output / "checkpoint.json")
+    checkpoint.load()
+    checkpoint.today -= timedelta(days=1)
+    checkpoint.done.discard(1)
+    checkpoint.save()
+
+    with pytest.raises(ValueError, match="--restart"):
+        rebuild(database_url, output, 1, 2, TODAY, verify=True, restart=False)
+    with pytest.raises(ValueError, match="Cannot verify"):
+        asyncio.run(
+            rebuild_chunk(database_url, "0", "z", checkpoint.today, verify=True)
+        )
+
+
+def test_read_only_engine_needs_a_database_file() -> None:
+    """Test read-only engines refuse in-memory databases."""
+    with pytest.raises(ValueError, match="SQLite file"):
+        build_read_only_engine("sqlite+aiosqlite:///:memory:")
@@ -1,6 +1,5 @@
 """Unit tests for StatsService streak and rate calculations."""
 
-import uuid
 from datetime import date, timedelta
 
 import pytest
@@ -22,12 +21,11 @@ async def create_habit(session: AsyncSession, name: str = "Test Habit") -> Habit
 
 
 async def create_completion(
-    session: AsyncSession, habit_id: str, completion_date: date
+    session: AsyncSession, habit: Habit, completion_date: date
 ) -> Completion:
     """Helper to create a test completion."""
     completion = Completion(
-        id=str(uuid.uuid4()),
-        habit_id=habit_id,
+        habit_pk=habit.pk,
         completed_date=completion_date,
     )
     session.add(completion)
@@ -36,12 +34,11 @@ async def create_completion(
 
 
 async def create_absence(
-    session: AsyncSession, habit_id: str, absence_date: date, reason: str | None = None
+    session: AsyncSession, habit: Habit, absence_date: date, reason: str | None = None
 ) -> Absence:
     """Helper to create a test absence."""
     absence = Absence(
-        id=str(uuid.uuid4()),
-        habit_id=habit_id,
+        habit_pk=habit.pk,
         absence_date=absence_date,
         reason=reason,
     )
@@ -68,7 +65,7 @@ async def test_current_streak_consecutive_days(db_session: AsyncSession) -> None
 
     # Complete the last 5 days including today
     for i in range(5):
-        await create_completion(db_session, habit.id, today - timedelta(days=i))
+        await create_completion(db_session, habit, today - timedelta(days=i))
 
     service = StatsService(db_session)
     streak = await service.calculate_current_streak(habit.id)
@@ -82,13 +79,13 @@ async def test_current_streak_with_gap(db_session: AsyncSession) -> None:
     today = date.today()
 
     # Complete today and yesterday
-    await create_completion(db_session, habit.id, today)
-    await create_completion(db_session, habit.id, today - timedelta(days=1))
+    await create_completion(db_session, habit, today)
+    await create_completion(db_session, habit, today - timedelta(days=1))
     # Skip day 2
     # Complete days 3, 4, 5
-    await create_completion(db_session, habit.id, today - timedelta(days=3))
-    await create_completion(db_session, habit.id, today - timedelta(days=4))
-    await create_completion(db_session, habit.id, today - timedelta(days=5))
+    await create_completion(db_session, habit, today - timedelta(days=3))
+    await create_completion(db_session, habit, today - timedelta(days=4))
+    await create_completion(db_session, habit, today - timedelta(days=5))
 
     service = StatsService(db_session)
     streak = await service.calculate_current_streak(habit.id)
@@ -102,12 +99,12 @@ async def test_current_streak_with_absence(db_session: AsyncSession) -> None:
     today = date.today()
 
     # Complete today
-    await create_completion(db_session, habit.id, today)
+    await create_completion(db_session, habit, today)
     # Mark yesterday as absence
-    await create_absence(db_session, habit.id, today - timedelta(days=1))
+    await create_absence(db_session, habit, today - timedelta(days=1))
     # Complete day before that
-    await create_completion(db_session, habit.id, today - timedelta(days=2))
-    await create_completion(db_session, habit.id, today - timedelta(days=3))
+    await create_completion(db_session, habit, today - timedelta(days=2))
+    await create_completion(db_session, habit, today - timedelta(days=3))
 
     service = StatsService(db_session)
     streak = await service.calculate_current_streak(habit.id)
@@ -122,9 +119,9 @@ async def test_current_streak_today_not_completed(db_session: AsyncSession) -> N
     today = date.today()
 
     # Complete yesterday and day before, but not today
-    await create_completion(db_session, habit.id, today - timedelta(days=1))
-    await create_completion(db_session, habit.id, today - timedelta(days=2))
-    await create_completion(db_session, habit.id, today - timedelta(days=3))
+    await create_completion(db_session, habit, today - timedelta(days=1))
+    await create_completion(db_session, habit, today - timedelta(days=2))
+    await create_completion(db_session, habit, today - timedelta(days=3))
 
     service = StatsService(db_session)
     streak = await service.calculate_current_streak(habit.id)
@@ -138,16 +135,16 @@ async def test_best_streak_calculation(db_session: AsyncSession) -> None:
     today = date.today()
 
     # Create a 3-day streak ending today
-    await create_completion(db_session, habit.id, today)
-    await create_completion(db_session, habit.id, today - timedelta(days=1))
-    await create_completion(db_session, habit.id, today - timedelta(days=2))
+    await create_completion(db_session, habit, today)
+    await create_completion(db_session, habit, today - timedelta(days=1))
+    await create_completion(db_session, habit, today - timedelta(days=2))
     # Gap
     # Create a 5-day streak in the past
-    await create_completion(db_session, habit.id, today - timedelta(days=10))
-    await create_completion(db_session, habit.id, today - timedelta(days=11))
-    await create_completion(db_session, habit.id, today - timedelta(days=12))
-    await create_completion(db_session, habit.id, today - timedelta(days=13))
-    await create_completion(db_session, habit.id, today - timedelta(days=14))
+    await create_completion(db_session, habit, today - timedelta(days=10))
+    await create_completion(db_session, habit, today - timedelta(days=11))
+    await create_completion(db_session, habit, today - timedelta(days=12))
+    await create_completion(db_session, habit, today - timedelta(days=13))
+    await create_completion(db_session, habit, today - timedelta(days=14))
 
     service = StatsService(db_session)
     best = await service.calculate_best_streak(habit.id)
@@ -162,7 +159,7 @@ async def test_completion_rate_weekly(db_session: AsyncSession) -> None:
 
     # Complete 5 of the last 7 days
     for i in range(5):
-        await create_completion(db_session, habit.id, today - timedelta(days=i))
+        await create_completion(db_session, habit, today - timedelta(days=i))
 
     service = StatsService(db_session)
     rate = await service.calculate_completion_rate(habit.id)
@@ -178,12 +175,12 @@ async def test_completion_rate_excludes_absences(db_session: AsyncSession) -> No
     today = date.today()
 
     # Complete 3 days
-    await create_completion(db_session, habit.id, today)
-    await create_completion(db_session, habit.id, today - timedelta(days=1))
-    await create_completion(db_session, habit.id, today - timedelta(days=2))
+    await create_completion(db_session, habit, today)
+    await create_completion(db_session, habit, today - timedelta(days=1))
+    await create_completion(db_session, habit, today - timedelta(days=2))
     # Mark 2 days as absences
-    await create_absence(db_session, habit.id, today - timedelta(days=3))
-    await create_absence(db_session, habit.id, today - timedelta(days=4))
+    await create_absence(db_session, habit, today - timedelta(days=3))
+    await create_absence(db_session, habit, today - timedelta(days=4))
     # Leave days 5 and 6 as missed
 
     service = StatsService(db_session)
@@ -198,7 +195,7 @@ async def test_completion_rate_excludes_absences(db_session: AsyncSession) -> No
 async def test_completed_today_true(db_session: AsyncSession) -> None:
     """Test is_completed_today returns true when completed."""
     habit = await create_habit(db_session)
-    await create_completion(db_session, habit.id, date.today())
+    await create_completion(db_session, habit, date.today())
 
     service = StatsService(db_session)
     assert await service.is_completed_today(habit.id) is True
@@ -209,7 +206,7 @@ async def test_completed_today_false(db_session: AsyncSession) -> None:
     """Test is_completed_today returns false when not completed."""
     habit = await create_habit(db_session)
     # Complete yesterday, not today
-    await create_completion(db_session, habit.id, date.today() - timedelta(days=1))
+    await create_completion(db_session, habit, date.today() - timedelta(days=1))
 
     service = StatsService(db_session)
     assert await service.is_completed_today(habit.id) is False
@@ -222,8 +219,8 @@ async def test_get_habit_with_stats(db_session: AsyncSession) -> None:
     today = date.today()
 
     # Create some completions
-    await create_completion(db_session, habit.id, today)
-    await create_completion(db_session, habit.id, today - timedelta(days=1))
+    await create_completion(db_session, habit, today)
+    await create_completion(db_session, habit, today - timedelta(days=1))
 
     service = StatsService(db_session)
     stats = await service.get_habit_with_stats(habit.id)
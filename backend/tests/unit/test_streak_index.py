@@ -0,0 +1,139 @@
+"""Unit tests for the segment-tree streak index."""
+
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.history_index import ABSENT, COMPLETED
+from app.core.query_plans import QueryRecorder
+from app.core.streak_index import StreakTree, streak_index
+from app.models.absence import Absence
+from app.models.completion import Completion
+from app.models.habit import Habit
+from app.services.habit_service import HabitService
+from app.services.stats_service import (
+    StatsService,
+    compute_best_streak,
+    compute_current_streak,
+)
+
+TODAY = date.today()
+
+
+def scanned_streaks(
+    completions: set[date], absences: set[date], first_day: date
+) -> tuple[int, int]:
+    """Return current and best streaks computed by scanning every day."""
+    best = compute_best_streak(completions, absences, first_day, TODAY)
+    return compute_current_streak(completions, absences, TODAY), best
+
+
+def test_tree_matches_scans_through_random_toggles() -> None:
+    """Test streaks stay equal to full scans as days are toggled anywhere."""
+    generator = random.Random(50)
+    first_day = TODAY - timedelta(days=199)
+    completions = {
+        first_day + timedelta(days=n) for n in range(200) if generator.random() < 0.7
+    }
+    absences = {
+        first_day + timedelta(days=n) for n in range(200) if generator.random() < 0.1
+    }
+    tree = StreakTree(first_day, TODAY, completions, absences)
+
+    for _ in range(500):
+        # Days past today grow the tree without counting towards streaks
+        day = first_day + timedelta(days=generator.randrange(260))
+        days, flag = (
+            (completions, COMPLETED) if generator.random() < 0.8 else (absences, ABSENT)
+        )
+        value = day not in days
+        if value:
+            days.add(day)
+        else:
+            days.discard(day)
+        tree.set_flag(day, flag, value)
+
+        assert (
+            tree.current_streak(TODAY),
+            tree.best_streak(TODAY),
+        ) == scanned_streaks(completions, absences, first_day)
+
+
+def test_tree_over_three_years_stays_compact() -> None:
+    """Test a tree's nodes are stored in flat arrays, not objects per node."""
+    first_day = TODAY - timedelta(days=3 * 365)
+    completions = {first_day + timedelta(days=n) for n in range(0, 3 * 365, 2)}
+    tree = StreakTree(first_day, TODAY, completions, set())
+
+    storage = [tree._flags, tree._unbroken, tree._prefix, tree._suffix, tree._best]
+    assert sum(sys.getsizeof(part) for part in storage) < 64 * 1024
+    assert tree.best_streak(TODAY) == 1
+
+
+def test_current_streak_with_today_open_or_past_the_tree() -> None:
+    """Test an incomplete today continues yesterday's streak."""
+    first_day = TODAY - timedelta(days=3)
+    tree = StreakTree(
+        first_day, TODAY, {first_day, first_day + timedelta(days=2)}, set()
+    )
+
+    assert tree.current_streak(TODAY) == 1
+    tree.set_flag(first_day + timedelta(days=1), ABSENT, True)
+    assert tree.current_streak(TODAY) == 2
+    assert tree.current_streak(TODAY + timedelta(days=1)) == 0
+    assert tree.current_streak(first_day - timedelta(days=1)) == 0
+
+
+async def add_split_history(session: AsyncSession) -> str:
+    """Create a habit with two ten-day runs split by one missed day."""
+    habit = Habit(name="Write")
+    session.add(habit)
+    await session.flush()
+    for offset in range(21):
+        if offset != 10:
+            day = TODAY - timedelta(days=30 + offset)
+            session.add(Completion(habit_pk=habit.pk, completed_date=day))
+    session.add(Absence(habit_pk=habit.pk, absence_date=TODAY - timedelta(days=45)))
+    await session.commit()
+    return habit.id
+
+
+@pytest.mark.asyncio
+async def test_backfill_joins_runs_without_rescanning(db_session: AsyncSession) -> None:
+    """Test backfilling the missed day updates the indexed best streak."""
+    habit_id = await add_split_history(db_session)
+    stats = StatsService(db_session)
+    assert await stats.calculate_best_streak(habit_id) == 10
+
+    await HabitService(db_session).complete_habit(habit_id, TODAY - timedelta(days=40))
+    assert isinstance(db_session.bind, AsyncEngine)
+    with QueryRecorder(db_session.bind) as recorder:
+        best = await stats.calculate_best_streak(habit_id)
+
+    assert best == 21
+    assert recorder.executed == 0
+
+
+@pytest.mark.asyncio
+async def test_indexed_streaks_match_scans(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the service gives the same streaks with and without the index."""
+    habit_id = await add_split_history(db_session)
+    await HabitService(db_session).complete_habit(habit_id, TODAY)
+    stats = StatsService(db_session)
+
+    indexed = (
+        await stats.calculate_current_streak(habit_id),
+        await stats.calculate_best_streak(habit_id),
+    )
+    monkeypatch.setattr(streak_index, "max_habits", 0)
+    scanned = (
+        await stats.calculate_current_streak(habit_id),
+        await stats.calculate_best_streak(habit_id),
+    )
+
+    assert indexed == scanned == (1, 10)
@@ -0,0 +1,68 @@
+"""Unit tests for database-per-tenant engine routing."""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect
+
+from app.core.database import build_engine, prepare_database
+from app.core.tenancy import InvalidTenantError, TenantEngineCache, validate_tenant_id
+
+
+@pytest.fixture
+async def engines(tmp_path: Path) -> AsyncGenerator[TenantEngineCache, None]:
+    """Create a tenant engine cache rooted in a temporary directory."""
+    cache = TenantEngineCache(
+        url_template=f"sqlite+aiosqlite:///{tmp_path}/tenants/{{tenant}}.db",
+        engine_factory=build_engine,
+        prepare=prepare_database,
+        max_engines=2,
+    )
+    yield cache
+    await cache.dispose_all()
+
+
+@pytest.mark.parametrize("tenant_id", ["", "../etc", "a b", "x" * 65])
+def test_invalid_tenant_ids_rejected(tenant_id: str) -> None:
+    """Test tenant ids that are unsafe as file names are rejected."""
+    with pytest.raises(InvalidTenantError):
+        validate_tenant_id(tenant_id)
+
+
+@pytest.mark.asyncio
+async def test_tenant_database_created_with_schema(
+    engines: TenantEngineCache, tmp_path: Path
+) -> None:
+    """Test a tenant's database file and tables are created lazily."""
+    database = await engines.get("alice")
+
+    assert (tmp_path / "tenants" / "alice.db").exists()
+    async with database.engine.connect() as conn:
+        tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+    assert {"habits", "completions", "absences"} <= set(tables)
+    assert await engines.get("alice") is database
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_engine_evicted(engines: TenantEngineCache) -> None:
+    """Test only max_engines engines stay open, evicting the LRU one."""
+    await engines.get("alice")
+    await engines.get("bob")
+    await engines.get("alice")
+    await engines.get("carol")
+
+    open_tenants = {db.tenant_id for db in engines.open_databases()}
+    assert open_tenants == {"alice", "carol"}
+
+
+@pytest.mark.asyncio
+async def test_idle_engines_disposed(engines: TenantEngineCache) -> None:
+    """Test idle engines are disposed and reopened on demand."""
+    await engines.get("alice")
+
+    assert await engines.dispose_idle(max_idle_seconds=0) == 1
+    assert len(engines) == 0
+
+    await engines.get("alice")
+    assert len(engines) == 1
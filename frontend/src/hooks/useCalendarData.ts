@@ -1,6 +1,7 @@
 import { useState, useEffect, useCallback } from 'react'
 import { api } from '@/services/api'
-import type { AbsenceItem } from '@/types/habit'
+import { useChangeEvents } from '@/hooks/useChangeEvents'
+import type { AbsenceItem, ChangeEvent } from '@/types/habit'
 
 interface UseCalendarDataReturn {
   completions: Set<string>
@@ -59,6 +60,61 @@ export function useCalendarData(
     fetchData()
   }, [fetchData])
 
+  const setCompleted = useCallback((date: string, completed: boolean) => {
+    setCompletions((prev) => {
+      const next = new Set(prev)
+      if (completed) {
+        next.add(date)
+      } else {
+        next.delete(date)
+      }
+      return next
+    })
+  }, [])
+
+  const setAbsent = useCallback((date: string, reason: string | null | false) => {
+    setAbsences((prev) => {
+      const next = new Map(prev)
+      if (reason === false) {
+        next.delete(date)
+      } else {
+        next.set(date, reason)
+      }
+      return next
+    })
+  }, [])
+
+  // Apply changes pushed by the server (including other tabs) in place
+  const applyChange = useCallback(
+    (event: ChangeEvent) => {
+      if (event.type === 'reset') {
+        fetchData()
+        return
+      }
+      if (event.habit_id !== habitId || !event.date) return
+      if (event.date < startDate || event.date > endDate) return
+
+      switch (event.type) {
+        case 'completion.added':
+          setCompleted(event.date, true)
+          break
+        case 'completion.removed':
+          setCompleted(event.date, false)
+          break
+        case 'absence.added':
+          // The event carries no reason, so reload it
+          fetchData()
+          break
+        case 'absence.removed':
+          setAbsent(event.date, false)
+          break
+      }
+    },
+    [habitId, startDate, endDate, fetchData, setCompleted, setAbsent]
+  )
+
+  useChangeEvents(applyChange)
+
   const toggleCompletion = useCallback(
     async (date: string, isCompleted: boolean) => {
       if (isCompleted) {
@@ -66,25 +122,25 @@ export function useCalendarData(
       } else {
         await api.habits.complete(habitId, date)
       }
-      await fetchData()
+      setCompleted(date, !isCompleted)
     },
-    [habitId, fetchData]
+    [habitId, setCompleted]
   )
 
   const addAbsence = useCallback(
     async (date: string, reason?: string) => {
-      await api.absences.create(habitId, { date, reason })
-      await fetchData()
+      const absence = await api.absences.create(habitId, { date, reason })
+      setAbsent(date, absence.reason)
     },
-    [habitId, fetchData]
+    [habitId, setAbsent]
   )
 
   const removeAbsence = useCallback(
     async (date: string) => {
       await api.absences.delete(habitId, date)
-      await fetchData()
+      setAbsent(date, false)
     },
-    [habitId, fetchData]
+    [habitId, setAbsent]
   )
 
   return {
@@ -0,0 +1,17 @@
+import { useEffect, useRef } from 'react'
+import { subscribeToChanges } from '@/services/api'
+import type { ChangeEvent } from '@/types/habit'
+
+/**
+ * Call `onEvent` for every change pushed by the server.
+ * The stream stays open for the lifetime of the component.
+ */
+export function useChangeEvents(onEvent: (event: ChangeEvent) => void): void {
+  const handlerRef = useRef(onEvent)
+
+  useEffect(() => {
+    handlerRef.current = onEvent
+  }, [onEvent])
+
+  useEffect(() => subscribeToChanges((event) => handlerRef.current(event)), [])
+}
@@ -1,7 +1,11 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import { api } from '@/services/api'
+import { useChangeEvents } from '@/hooks/useChangeEvents'
 import type { HabitWithStats, HabitCreate, HabitUpdate } from '@/types/habit'
 
+// Bursts of change events are coalesced into one refetch
+const REFRESH_DELAY_MS = 100
+
 interface UseHabitsReturn {
   habits: HabitWithStats[]
   loading: boolean
@@ -18,9 +22,11 @@ export function useHabits(): UseHabitsReturn {
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
-  const fetchHabits = useCallback(async () => {
+  const refreshTimer = useRef<ReturnType<typeof setTimeout>>()
+
+  const fetchHabits = useCallback(async (showLoading = true) => {
     try {
-      setLoading(true)
+      if (showLoading) setLoading(true)
       setError(null)
       const data = await api.habits.list()
       setHabits(data)
@@ -35,28 +41,41 @@ export function useHabits(): UseHabitsReturn {
     fetchHabits()
   }, [fetchHabits])
 
+  // Stats are computed server-side, so any change triggers a quiet refetch.
+  // Our own writes schedule one too: their events may never reach this tab
+  // (stream down or reconnecting, or the write served by another worker),
+  // and the matching event then coalesces into the same refetch.
+  const scheduleRefresh = useCallback(() => {
+    clearTimeout(refreshTimer.current)
+    refreshTimer.current = setTimeout(() => fetchHabits(false), REFRESH_DELAY_MS)
+  }, [fetchHabits])
+
+  useChangeEvents(scheduleRefresh)
+
+  useEffect(() => () => clearTimeout(refreshTimer.current), [])
+
   const createHabit = useCallback(
     async (data: HabitCreate) => {
       await api.habits.create(data)
-      await fetchHabits()
+      scheduleRefresh()
     },
-    [fetchHabits]
+    [scheduleRefresh]
   )
 
   const updateHabit = useCallback(
     async (id: string, data: HabitUpdate) => {
       await api.habits.update(id, data)
-      await fetchHabits()
+      scheduleRefresh()
     },
-    [fetchHabits]
+    [scheduleRefresh]
   )
 
   const deleteHabit = useCallback(
     async (id: string) => {
       await api.habits.delete(id)
-      await fetchHabits()
+      scheduleRefresh()
     },
-    [fetchHabits]
+    [scheduleRefresh]
   )
 
   const toggleCompletion = useCallback(
@@ -67,9 +86,9 @@ export function useHabits(): UseHabitsReturn {
       } else {
         await api.habits.complete(habit.id)
       }
-      await fetchHabits()
+      scheduleRefresh()
     },
-    [fetchHabits]
+    [scheduleRefresh]
   )
 
   return {
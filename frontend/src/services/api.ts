@@ -12,6 +12,8 @@ import type {
   AbsencesListResponse,
   AbsenceCreate,
   AbsenceResponse,
+  ChangeEvent,
+  ChangeEventType,
 } from '@/types/habit'
 
 const API_BASE = '/api'
@@ -109,3 +111,33 @@ export const api = {
       api.delete<void>(`/habits/${habitId}/absences/${date}`),
   },
 }
+
+const CHANGE_EVENT_TYPES: ChangeEventType[] = [
+  'habit.created',
+  'habit.updated',
+  'habit.deleted',
+  'completion.added',
+  'completion.removed',
+  'absence.added',
+  'absence.removed',
+]
+
+/**
+ * Subscribe to the server's change stream.
+ * EventSource reconnects on its own and resumes via Last-Event-ID.
+ * Returns a function that closes the stream.
+ */
+export function subscribeToChanges(
+  onEvent: (event: ChangeEvent) => void
+): () => void {
+  const source = new EventSource(`${API_BASE}/events`)
+
+  for (const type of CHANGE_EVENT_TYPES) {
+    source.addEventListener(type, (message: MessageEvent<string>) => {
+      onEvent({ type, ...JSON.parse(message.data) })
+    })
+  }
+  source.addEventListener('reset', () => onEvent({ type: 'reset' }))
+
+  return () => source.close()
+}
@@ -81,3 +81,21 @@ export interface AbsenceResponse {
   date: string
   reason: string | null
 }
+
+// Change event types pushed by GET /api/events
+export type ChangeEventType =
+  | 'habit.created'
+  | 'habit.updated'
+  | 'habit.deleted'
+  | 'completion.added'
+  | 'completion.removed'
+  | 'absence.added'
+  | 'absence.removed'
+
+// Change event; 'reset' means events were missed and data should be refetched
+export interface ChangeEvent {
+  type: ChangeEventType | 'reset'
+  habit_id?: string
+  version?: number
+  date?: string // YYYY-MM-DD format, for completion and absence events
+}